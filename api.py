@@ -0,0 +1,398 @@
+"""Library API: searches and hotel scrapes from Python, with browsers, HTTP client and cache kept warm.
+
+    from api import Scraper
+
+    with Scraper(workers=4, engine="http") as scraper:
+        paris = scraper.search({"search": "Paris", "check_in": "2025-11-01", "check_out": "2025-11-03",
+                                "currency": "EUR", "propertyType": "Hotels", "maxitems": 20})
+        more = scraper.scrape_hotels(urls)
+
+``search``, ``scrape_hotels`` and their ``_async`` variants at module level do the
+same for a single call. Configuration uses the input.json keys; ``run`` is what
+``python main.py`` does with it.
+"""
+import asyncio
+import os
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from autoscaler import Autoscaler
+from driver_pool import DriverPool, make_driver
+from hotel_cache import HotelCache, cached
+from http_client import HttpClient
+from http_scraper import scrape_hotel_http
+from image_store import ImageDownloader, ImageStore
+from metrics import recorder, span
+from output_store import JsonlWriter, export_json, load_done_keys, open_stores, result_key
+from pipeline import run_pipeline
+from resilience import from_config as resilient_task
+from results_harvester import card_filter, harvest_cards, open_search_results, ui_search
+from scrape_worker import image_mode, scrape_hotel
+from selector_stats import selector_stats
+from waits import budget as waits_budget, configure as configure_waits, skipped_sleep
+
+# Selector hit rates persist here for the command-line runs (main.py, batch.py, queue_worker.py);
+# a library ``Scraper`` keeps them in memory unless ``selector_stats`` names a file
+CLI_SELECTOR_STATS = "selector_stats.json"
+
+ResultCallback = Callable[[str, Dict], None]
+ErrorCallback = Callable[[str, Exception], None]
+
+
+def _print_error(href: str, e: Exception) -> None:
+    print(f"ERROR scraping {href}: {e}")
+
+
+class Scraper:
+    """Scrapes hotels with the driver pool, HTTP client, cache and image store kept across calls.
+
+    ``config`` takes the input.json keys (``engine``, ``workers``, ``image_mode``,
+    ``cache``, ``hotel_deadline_s``, ...) and keyword arguments override them.
+    Worker browsers start in the background on creation (``prewarm_drivers``,
+    ``prewarm_url``). Searches and ``run_hotels`` calls on one ``Scraper`` run one
+    at a time; ``close`` (or leaving the ``with`` block) quits the browsers.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, **overrides):
+        self.created = time.monotonic()
+        c = self.config = dict(config or {}, **overrides)
+        self.images = image_mode(c.get("image_mode", c.get("fast_images", True)))
+        self.engine = c.get("engine", "selenium")
+        configure_waits(ceiling=c.get("wait_ceiling", 5))
+        if c.get("selector_stats"):
+            selector_stats.load(c["selector_stats"])
+
+        workers = c.get("workers", 4)
+        max_hedges = c.get("max_hedges", 1)
+        factory = partial(make_driver, c.get("browser_profile", "full"))
+        self.scaler = None
+        self.client = None
+        if self.engine == "http":
+            self.pool = DriverPool(
+                max_size=workers + max_hedges,
+                max_pages=c.get("max_pages_per_driver", 50),
+                max_rss_mb=c.get("max_driver_rss_mb", 1500),
+                factory=factory,
+            )
+            self.client = HttpClient(max_per_host=c.get("http_concurrency", 64))
+            self.max_workers = ceiling = c.get("http_concurrency", 64)
+
+            def task(href, images=self.images):
+                return scrape_hotel_http(href, self.client, images, self.pool)
+        else:
+            autoscale = c.get("autoscale", True)
+            pool_size = max(workers, c.get("max_workers", max(workers, os.cpu_count() or 4))) if autoscale else workers
+            self.pool = DriverPool(
+                max_size=pool_size + max_hedges,
+                max_pages=c.get("max_pages_per_driver", 50),
+                max_rss_mb=c.get("max_driver_rss_mb", 1500),
+                factory=factory,
+            )
+            self.max_workers = workers
+            # The autoscaler may raise concurrency up to the pool size
+            ceiling = pool_size
+            if autoscale:
+                self.scaler = Autoscaler(
+                    min_workers=c.get("min_workers", 1),
+                    max_workers=pool_size,
+                    initial=workers,
+                    interval=c.get("autoscale_interval_s", 10),
+                    max_load_per_cpu=c.get("autoscale_max_load", 1.0),
+                    max_rss_mb=c.get("max_chrome_rss_mb"),
+                    rss_fn=self.pool.rss,
+                    on_change=self.pool.trim,
+                )
+
+            def task(href, images=self.images):
+                # Each worker borrows a warm Chrome from the pool instead of launching its own
+                return scrape_hotel(href, images, self.pool)
+
+        # Per-hotel deadline, hedged second attempt and retries; cache hits below skip all of it
+        self.resilient = resilient_task(task, c, self.pool, threads=ceiling)
+        if self.resilient is not None:
+            task = self.resilient
+        self.cache = None
+        if c.get("cache"):
+            self.cache = HotelCache(
+                c["cache"],
+                ttls={name: hours * 3600 for name, hours in c.get("cache_ttl_hours", {}).items()},
+                max_entries=c.get("cache_max_entries", 50000),
+            )
+            full_task = task
+
+            def refresh(href, stale):
+                # While the cached image list is fresh, expired fields never need the gallery
+                return full_task(href) if "image_urls" in stale else full_task(href, "fast")
+
+            # Batches reuse a cached hotel across date windows (``cache_any_dates``)
+            task = cached(task, self.cache, any_dates=c.get("cache_any_dates", False), refresh=refresh)
+        self.downloader = None
+        if c.get("download_images", False):
+            self.downloader = ImageDownloader(
+                ImageStore(c.get("image_dir", "images")), concurrency=c.get("image_concurrency", 16)
+            )
+        # Start worker browsers now so they are ready when the search yields its first hotel
+        prewarm = c.get("prewarm_drivers", 0 if self.engine == "http" else workers)
+        if prewarm:
+            self.pool.prewarm(
+                prewarm, c.get("prewarm_url", "https://www.booking.com/"), c.get("prewarm_timeout_s", 10)
+            )
+        self._task = task
+        self._search_driver = None
+        self._run_lock = threading.Lock()
+        # Search-card fields (price, distance, thumbnail, ...) of the hotels scheduled by the last search
+        self.cards: Dict[str, Dict] = {}
+        self.last_run: Optional[Dict] = None
+
+    # ----- scraping -----
+
+    def _scrape(self, href: str, cards: Optional[Dict[str, Dict]]) -> Dict:
+        with recorder.hotel(href):
+            result = self._task(href)
+            if self.downloader is not None:
+                result["images"] = self.downloader.download(result.get("image_urls") or [])
+        if cards is not None:
+            result["search_card"] = cards.get(href)
+        return result
+
+    def scrape_hotel(self, href: str) -> Dict:
+        """Scrape one hotel page on the calling thread; several threads may call it at once."""
+        return self._scrape(href, None)
+
+    def _run(self, hrefs: Iterable[str], on_result, on_error, cards: Optional[Dict[str, Dict]], started: float) -> Dict:
+        # The first call counts from Scraper creation (browser start-up included), later ones from the call
+        if self.last_run is None:
+            started = self.created
+        first_result = []
+
+        def result(href, data):
+            if not first_result:
+                first_result.append(time.monotonic())
+            if on_result:
+                on_result(href, data)
+
+        with self._run_lock:
+            stats = run_pipeline(
+                hrefs,
+                partial(self._scrape, cards=cards),
+                workers=self.max_workers,
+                queue_size=self.config.get("queue_size"),
+                on_result=result,
+                on_error=on_error or _print_error,
+                scaler=self.scaler,
+            )
+        stats["startup_to_first_result_s"] = round(first_result[0] - started, 3) if first_result else None
+        self.last_run = stats
+        return stats
+
+    def run_hotels(self, urls: Iterable[str], on_result: ResultCallback, on_error: Optional[ErrorCallback] = None) -> Dict:
+        """Scrape ``urls`` (any iterable, consumed as workers free up), streaming results to ``on_result``."""
+        return self._run(urls, on_result, on_error, None, time.monotonic())
+
+    def scrape_hotels(self, urls: Iterable[str], on_error: Optional[ErrorCallback] = None) -> List[Dict]:
+        """Scrape hotel pages; results come back in completion order, failed hotels are left out."""
+        results: List[Dict] = []
+        self.run_hotels(urls, lambda href, data: results.append(data), on_error)
+        return results
+
+    # ----- searching -----
+
+    def search_driver(self):
+        if self._search_driver is None:
+            options = Options()
+            options.add_argument("--start-maximized")
+            with span("search_driver_start"):
+                self._search_driver = webdriver.Chrome(options=options)
+        return self._search_driver
+
+    def run_search(
+        self,
+        params: Optional[Dict] = None,
+        on_result: Optional[ResultCallback] = None,
+        on_error: Optional[ErrorCallback] = None,
+        skip=(),
+    ) -> Dict:
+        """Harvest the results of one search and scrape every hotel passing its filters.
+
+        ``params`` (search, check_in, check_out, currency, propertyType, maxitems,
+        filters) are merged over the config. Hotels whose ``result_key`` is in
+        ``skip`` are not scraped. Each result carries its ``search_card``.
+        """
+        started = time.monotonic()
+        params = dict(self.config, **(params or {}))
+        driver = self.search_driver()
+        with span("search"):
+            if params.get("search_mode", "direct") != "direct" or not open_search_results(driver, params):
+                ui_search(driver, params)
+        cards = self.cards = {}
+
+        def pending_hrefs():
+            for card in harvest_cards(driver, driver.current_url, params.get("maxitems", 10), keep=card_filter(params)):
+                href = card.pop("href")
+                if result_key(href) not in skip:
+                    cards[href] = card
+                    yield href
+
+        return self._run(pending_hrefs(), on_result, on_error, cards, started)
+
+    def search(self, params: Optional[Dict] = None, on_error: Optional[ErrorCallback] = None) -> List[Dict]:
+        results: List[Dict] = []
+        self.run_search(params, lambda href, data: results.append(data), on_error)
+        return results
+
+    # ----- asyncio -----
+
+    async def search_async(self, params: Optional[Dict] = None, on_error: Optional[ErrorCallback] = None) -> List[Dict]:
+        """``search`` on a helper thread so the event loop keeps running meanwhile."""
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self.search, params, on_error))
+
+    async def scrape_hotels_async(self, urls: Iterable[str], on_error: Optional[ErrorCallback] = None) -> List[Dict]:
+        return await asyncio.get_running_loop().run_in_executor(None, partial(self.scrape_hotels, list(urls), on_error))
+
+    # ----- lifecycle -----
+
+    def stats(self) -> Dict:
+        return {
+            "pipeline": self.last_run,
+            "driver_pool": self.pool.stats(),
+            "autoscaler": self.scaler.stats() if self.scaler is not None else None,
+            "hotel_cache": self.cache.stats() if self.cache is not None else None,
+            "images": self.downloader.stats() if self.downloader is not None else None,
+            "resilience": self.resilient.stats() if self.resilient is not None else None,
+        }
+
+    def close(self) -> None:
+        if self.downloader is not None:
+            self.downloader.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.client is not None:
+            self.client.close()
+        if self.resilient is not None:
+            self.resilient.close()
+        self.pool.close()
+        if self._search_driver is not None:
+            self._search_driver.quit()
+            self._search_driver = None
+        if self.config.get("selector_stats"):
+            selector_stats.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------- One-shot helpers ----------
+
+def search(params: Dict, **config) -> List[Dict]:
+    """Run one search with a throwaway ``Scraper``; ``config`` adds or overrides input.json keys."""
+    with Scraper(params, **config) as scraper:
+        return scraper.search()
+
+
+def scrape_hotels(urls: Iterable[str], **config) -> List[Dict]:
+    with Scraper(config) as scraper:
+        return scraper.scrape_hotels(urls)
+
+
+async def search_async(params: Dict, **config) -> List[Dict]:
+    return await asyncio.get_running_loop().run_in_executor(None, partial(search, params, **config))
+
+
+async def scrape_hotels_async(urls: Iterable[str], **config) -> List[Dict]:
+    return await asyncio.get_running_loop().run_in_executor(None, partial(scrape_hotels, list(urls), **config))
+
+
+# ---------- input.json run ----------
+
+def run(data: Dict) -> Dict:
+    """One search from an input.json dict, written to the configured output files with a run report."""
+    output_json = data.get("output", "output.json")
+    output_jsonl = data.get("output_jsonl", "output.jsonl")
+    failures_jsonl = data.get("failures_jsonl", "failures.jsonl")  # hotels that still failed after retries
+    resume = data.get("resume", False)  # skip hotels already recorded in output_jsonl
+    metrics_file = data.get("metrics_file", "run_metrics.json")
+    profile_file = data.get("profile")  # e.g. "run.prof" to write merged cProfile stats of all threads
+    if profile_file:
+        recorder.enable_profiling()
+
+    done_keys = load_done_keys(output_jsonl) if resume else set()
+    if done_keys:
+        print(f"Resuming: {len(done_keys)} hotels already in {output_jsonl}")
+    writer = JsonlWriter(output_jsonl, fsync_every=data.get("fsync_every", 10), append=resume)
+    stores = open_stores(data.get("output_sqlite"), data.get("output_parquet"), append=resume, city=data["search"])
+    failures = JsonlWriter(failures_jsonl, fsync_every=1, append=resume) if failures_jsonl else None
+
+    with Scraper(dict({"selector_stats": CLI_SELECTOR_STATS}, **data)) as scraper, writer:
+
+        def on_result(href, record):
+            writer.write(record)
+            for store in stores:
+                store.write(record)
+            print(f"✅ Scraped hotel #{writer.written}: {record.get('hotel_name') or href}")
+
+        def on_error(href, e):
+            _print_error(href, e)
+            if failures is not None:
+                failures.write({
+                    "url": href,
+                    "error": f"{type(e).__name__}: {e}",
+                    "failed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "search_card": scraper.cards.get(href),
+                })
+
+        run_stats = scraper.run_search(data, on_result, on_error, skip=done_keys)
+        stats = scraper.stats()
+
+    print(f"✅ Total collected: {run_stats['queued']} URLs")
+    print(
+        f"Pipeline: first result after {run_stats['first_result_s']}s "
+        f"({run_stats['startup_to_first_result_s']}s from start-up), "
+        f"finished in {run_stats['elapsed_s']}s ({run_stats['failed']} failed)"
+    )
+    print(f"Driver pool: {stats['driver_pool']}")
+    if stats["autoscaler"] is not None:
+        print(
+            f"Autoscaler: ended at {stats['autoscaler']['active']} workers, peak {stats['autoscaler']['peak']}, "
+            f"{len(stats['autoscaler']['decisions'])} changes"
+        )
+    if stats["images"] is not None:
+        print(f"Images: {stats['images']} (stored in {data.get('image_dir', 'images')})")
+    if stats["hotel_cache"] is not None:
+        print(f"Hotel cache: {stats['hotel_cache']}")
+    if stats["resilience"] is not None:
+        print(f"Resilience: {stats['resilience']}")
+    for store in stores:
+        store.close()
+        print(f"Added {store.written} hotels to {store.path}")
+    if failures is not None:
+        failures.close()
+        if failures.written:
+            print(f"{failures.written} failed hotels listed in {failures_jsonl}; a run with resume retries them")
+    selector_stats.print_drift()
+    # Export the JSONL records as the pretty output.json array
+    exported = export_json(output_jsonl, output_json)
+    print(f"Wrote {exported} hotels to {output_json}")
+
+    skipped_sleep("final_pause", 5.0)
+    sleep_report = waits_budget.report()
+    print(
+        f"Fixed sleeps removed: {sleep_report['replaced_s']}s replaced by {sleep_report['waited_s']}s of waiting "
+        f"(saved {sleep_report['saved_s']}s)"
+    )
+    report = recorder.write(
+        metrics_file,
+        extra=dict(stats, sleep_budget=sleep_report, selector_stats=selector_stats.report()),
+    )
+    print(f"Run metrics written to {metrics_file}")
+    if profile_file:
+        recorder.dump_profile(profile_file)
+        print(f"Profile written to {profile_file}")
+    return report
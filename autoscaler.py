@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from metrics import percentile
+
+
+def physical_memory_bytes() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def load_per_cpu() -> Optional[float]:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (OSError, AttributeError):
+        return None
+
+
+# ---------- Concurrency limit ----------
+
+class ConcurrencyLimiter:
+    """Counting gate whose limit can be changed while threads are waiting on it."""
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def set_limit(self, limit: int) -> None:
+        with self._cond:
+            self._limit = limit
+            self._cond.notify_all()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_use >= self._limit:
+                self._cond.wait()
+            self._in_use += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify_all()
+
+
+# ---------- Autoscaler ----------
+
+class Autoscaler:
+    """Grows and shrinks the number of active scrape workers between ``min_workers`` and ``max_workers``.
+
+    Every ``interval`` seconds it looks at the per-hotel latencies reported through
+    ``observe``, the 1-minute load average per CPU and the Chrome RSS returned by
+    ``rss_fn``. It removes a worker when load, memory or latency (relative to the best
+    median seen so far) is over its limit, and adds one when all three have headroom
+    and hotels are waiting in the queue. Every decision is printed; changes are kept in ``history``.
+    """
+
+    def __init__(
+        self,
+        min_workers: int = 1,
+        max_workers: int = 8,
+        initial: Optional[int] = None,
+        interval: float = 10.0,
+        max_load_per_cpu: float = 1.0,
+        max_rss_mb: Optional[int] = None,
+        latency_factor: float = 2.0,
+        min_samples: int = 2,
+        rss_fn: Optional[Callable[[], Optional[int]]] = None,
+        on_change: Optional[Callable[[int], None]] = None,
+    ):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        start = initial if initial is not None else self.min_workers
+        self.limiter = ConcurrencyLimiter(min(max(start, self.min_workers), self.max_workers))
+        self.interval = interval
+        self.max_load_per_cpu = max_load_per_cpu
+        if max_rss_mb is None:
+            # Leave a third of the machine's memory for everything that is not Chrome
+            total = physical_memory_bytes()
+            max_rss_mb = int(total * 2 / 3 / (1024 * 1024)) if total else None
+        self.max_rss_mb = max_rss_mb
+        self.latency_factor = latency_factor
+        self.min_samples = min_samples
+        self.rss_fn = rss_fn
+        self.on_change = on_change
+        self.best_latency: Optional[float] = None
+        self.history: List[Dict] = []
+        self._latencies: List[float] = []
+        self._pending_fn: Callable[[], int] = lambda: 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = time.monotonic()
+
+    @property
+    def active(self) -> int:
+        return self.limiter.limit
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    # ----- control loop -----
+
+    def start(self, pending_fn: Callable[[], int]) -> None:
+        self._pending_fn = pending_fn
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="autoscaler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.step()
+
+    def step(self) -> Dict:
+        """Take one scaling decision from the signals gathered since the previous step."""
+        with self._lock:
+            window, self._latencies = self._latencies, []
+        p50 = percentile(window, 50) if len(window) >= self.min_samples else None
+        load = load_per_cpu()
+        rss = self.rss_fn() if self.rss_fn else None
+        rss_mb = rss / (1024 * 1024) if rss is not None else None
+        pending = self._pending_fn()
+        active = self.active
+
+        latency_limit = self.best_latency * self.latency_factor if self.best_latency else None
+        reasons = []
+        if load is not None and load > self.max_load_per_cpu:
+            reasons.append(f"load {load:.2f}/cpu > {self.max_load_per_cpu}")
+        if rss_mb is not None and self.max_rss_mb and rss_mb > self.max_rss_mb:
+            reasons.append(f"chrome rss {rss_mb:.0f} MB > {self.max_rss_mb} MB")
+        if p50 is not None and latency_limit is not None and p50 > latency_limit:
+            reasons.append(f"p50 {p50:.1f}s > {latency_limit:.1f}s")
+        if p50 is not None:
+            self.best_latency = p50 if self.best_latency is None else min(self.best_latency, p50)
+
+        target = active
+        if reasons:
+            target = max(self.min_workers, active - 1)
+        elif pending > 0 and active < self.max_workers:
+            # Memory headroom for one more Chrome, judged by the average per active worker
+            per_worker = rss_mb / active if rss_mb else 0
+            if not (self.max_rss_mb and rss_mb is not None and rss_mb + per_worker > self.max_rss_mb):
+                target = active + 1
+                reasons.append(f"{pending} hotels queued, headroom on load/memory/latency")
+            else:
+                reasons.append("no memory headroom for another Chrome")
+
+        decision = {
+            "t_s": round(time.monotonic() - self._started, 1),
+            "from": active,
+            "to": target,
+            "p50_s": round(p50, 3) if p50 is not None else None,
+            "samples": len(window),
+            "load_per_cpu": round(load, 2) if load is not None else None,
+            "chrome_rss_mb": round(rss_mb) if rss_mb is not None else None,
+            "pending": pending,
+            "reason": "; ".join(reasons) or "steady",
+        }
+        if target != active:
+            self.limiter.set_limit(target)
+            self.history.append(decision)
+        if reasons:
+            # Also logged when a bound or missing headroom keeps the count where it is
+            print(
+                f"[autoscale] workers {active} -> {target}: {decision['reason']} "
+                f"(p50 {decision['p50_s']}s over {len(window)} hotels, load {decision['load_per_cpu']}/cpu, "
+                f"chrome rss {decision['chrome_rss_mb']} MB, queue {pending})"
+            )
+        if target != active and self.on_change:
+            self.on_change(target)
+        return decision
+
+    def stats(self) -> Dict:
+        return {
+            "active": self.active,
+            "min_workers": self.min_workers,
+            "max_workers": self.max_workers,
+            "peak": max([self.active] + [max(d["from"], d["to"]) for d in self.history]),
+            "best_p50_s": round(self.best_latency, 3) if self.best_latency is not None else None,
+            "decisions": list(self.history),
+        }
@@ -0,0 +1,265 @@
+"""Run many searches (cities x date windows) through one shared, deduplicated detail-scraping pool.
+
+    python batch.py batch.json
+
+Top-level keys of the batch file are the defaults for every search and the run
+settings (same keys as input.json); each entry of "searches" overrides them. An
+entry with "date_windows" expands into one search per window. Results are written
+per search to <output_dir>/<search id>.jsonl and .json; hotels that still fail after
+retries are listed in <output_dir>/failures.jsonl.
+"""
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from api import CLI_SELECTOR_STATS, Scraper
+from hotel_urls import hotel_key
+from metrics import span
+from output_store import JsonlWriter, export_json, load_done_keys, open_stores, result_key
+from results_harvester import card_filter, harvest_cards, open_search_results
+from selector_stats import selector_stats
+
+_DONE = object()
+
+
+# ---------- Batch file ----------
+
+def search_id(spec: Dict) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", spec["search"].lower()).strip("-")
+    return f"{slug}_{spec['check_in']}_{spec['check_out']}"
+
+
+def expand_searches(batch: Dict) -> List[Dict]:
+    defaults = {k: v for k, v in batch.items() if k != "searches"}
+    specs = []
+    for entry in batch["searches"]:
+        windows = entry.get("date_windows") or [{}]
+        for window in windows:
+            spec = dict(defaults)
+            spec.update({k: v for k, v in entry.items() if k != "date_windows"})
+            spec.update(window)
+            if "id" not in entry:
+                spec["id"] = search_id(spec)
+            elif len(windows) > 1:
+                spec["id"] = f"{entry['id']}_{spec['check_in']}_{spec['check_out']}"
+            specs.append(spec)
+    ids = [s["id"] for s in specs]
+    duplicates = sorted({i for i in ids if ids.count(i) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate search ids in batch: {', '.join(duplicates)}")
+    return specs
+
+
+# ---------- Concurrent harvesting ----------
+
+def _search_driver():
+    options = Options()
+    options.add_argument("--start-maximized")
+    return webdriver.Chrome(options=options)
+
+
+def harvest_searches(
+    specs: List[Dict],
+    concurrency: int,
+    driver_factory=_search_driver,
+) -> Iterator[Tuple[str, str, Dict]]:
+    """Yield ``(search id, href, card)`` from ``concurrency`` search browsers working through ``specs``.
+
+    Each harvester keeps its browser for every search it takes, and blocks once
+    the detail workers fall behind.
+    """
+    todo: "queue.Queue" = queue.Queue()
+    for spec in specs:
+        todo.put(spec)
+    found: "queue.Queue" = queue.Queue(maxsize=max(50, concurrency * 25))
+
+    def harvester():
+        driver = None
+        try:
+            while True:
+                try:
+                    spec = todo.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if driver is None:
+                        with span("search_driver_start"):
+                            driver = driver_factory()
+                    with span("search"):
+                        opened = open_search_results(driver, spec)
+                    if not opened:
+                        continue
+                    count = 0
+                    for card in harvest_cards(driver, driver.current_url, spec.get("maxitems", 10), keep=card_filter(spec)):
+                        found.put((spec["id"], card.pop("href"), card))
+                        count += 1
+                    print(f"Harvested {count} hotels for {spec['id']}")
+                except Exception as e:
+                    print(f"ERROR harvesting {spec['id']}: {e}")
+        finally:
+            if driver is not None:
+                driver.quit()
+            found.put(_DONE)
+
+    threads = [threading.Thread(target=harvester, name=f"harvester-{i}", daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    finished = 0
+    while finished < len(threads):
+        item = found.get()
+        if item is _DONE:
+            finished += 1
+            continue
+        yield item
+
+
+# ---------- Shared detail pool ----------
+
+class BatchRouter:
+    """Schedules each hotel once across all searches and writes its result to every search that found it.
+
+    Hotels are matched by ``hotel_key``, so the same hotel under other dates or
+    occupancy reuses the first scrape; each search's record keeps its own URL
+    and search card.
+    """
+
+    def __init__(
+        self,
+        writers: Dict[str, JsonlWriter],
+        failures: Optional[JsonlWriter] = None,
+        stores: Optional[List] = None,
+        cities: Optional[Dict[str, str]] = None,
+    ):
+        self.writers = writers
+        self.failures = failures
+        self.stores = stores or []
+        self.cities = cities or {}
+        self._lock = threading.Lock()
+        self._waiting: Dict[str, List[Tuple[str, str, Dict]]] = {}
+        self._results: Dict[str, Dict] = {}
+        self.scheduled = 0
+        self.reused = 0
+        self.failed: Dict[str, int] = {sid: 0 for sid in writers}
+
+    def offer(self, sid: str, href: str, card: Dict):
+        """Return ``href`` if it needs a detail scrape, or None when the hotel is already scraped or in flight."""
+        key = hotel_key(href)
+        with self._lock:
+            if key in self._results:
+                self.reused += 1
+                self._write(sid, href, card, self._results[key])
+                return None
+            if key in self._waiting:
+                self.reused += 1
+                self._waiting[key].append((sid, href, card))
+                return None
+            self._waiting[key] = [(sid, href, card)]
+            self.scheduled += 1
+            return href
+
+    def _write(self, sid: str, href: str, card: Dict, result: Dict) -> None:
+        record = dict(result, url=href)
+        record["search_id"] = sid
+        record["search_card"] = card
+        self.writers[sid].write(record)
+        for store in self.stores:
+            store.write(record, city=self.cities.get(sid))
+
+    def on_result(self, href: str, data: Dict) -> None:
+        key = hotel_key(href)
+        with self._lock:
+            self._results[key] = data
+            subscribers = self._waiting.pop(key, [])
+            for sid, sub_href, card in subscribers:
+                self._write(sid, sub_href, card, data)
+        print(f"✅ Scraped {data.get('hotel_name') or href} for {len(subscribers)} search(es)")
+
+    def on_error(self, href: str, e: Exception) -> None:
+        with self._lock:
+            subscribers = self._waiting.pop(hotel_key(href), [])
+            for sid, _, _ in subscribers:
+                self.failed[sid] += 1
+        print(f"ERROR scraping {href}: {e}")
+        if self.failures is not None:
+            self.failures.write({
+                "url": href,
+                "error": f"{type(e).__name__}: {e}",
+                "failed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "search_ids": [sid for sid, _, _ in subscribers],
+            })
+
+
+def run_batch(path: str) -> Dict:
+    with open(path, "r") as f:
+        batch = json.load(f)
+    specs = expand_searches(batch)
+    output_dir = batch.get("output_dir", "batch_output")
+    os.makedirs(output_dir, exist_ok=True)
+    resume = batch.get("resume", False)
+
+    writers = {}
+    done = {}
+    for spec in specs:
+        jsonl = os.path.join(output_dir, f"{spec['id']}.jsonl")
+        done[spec["id"]] = load_done_keys(jsonl) if resume else set()
+        writers[spec["id"]] = JsonlWriter(jsonl, fsync_every=batch.get("fsync_every", 10), append=resume)
+    failures = JsonlWriter(os.path.join(output_dir, "failures.jsonl"), fsync_every=1, append=resume)
+    stores = open_stores(batch.get("output_sqlite"), batch.get("output_parquet"), append=resume)
+    router = BatchRouter(writers, failures, stores, cities={spec["id"]: spec["search"] for spec in specs})
+
+    def pending_hrefs():
+        for sid, href, card in harvest_searches(specs, batch.get("harvest_concurrency", 2)):
+            if result_key(href) in done[sid]:
+                continue
+            href = router.offer(sid, href, card)
+            if href is not None:
+                yield href
+
+    print(f"Batch: {len(specs)} searches -> {output_dir}/")
+    # A cached hotel is reused across date windows unless the batch file says otherwise
+    try:
+        with Scraper(dict({"cache_any_dates": True, "selector_stats": CLI_SELECTOR_STATS}, **batch)) as scraper:
+            run_stats = scraper.run_hotels(pending_hrefs(), router.on_result, router.on_error)
+            stats = scraper.stats()
+    finally:
+        for writer in writers.values():
+            writer.close()
+        failures.close()
+        for store in stores:
+            store.close()
+    if stats["images"] is not None:
+        print(f"Images: {stats['images']}")
+    if stats["resilience"] is not None:
+        print(f"Resilience: {stats['resilience']}")
+    selector_stats.print_drift()
+
+    summary = {"pipeline": run_stats, "scheduled": router.scheduled, "reused": router.reused, "searches": {}}
+    for spec in specs:
+        sid = spec["id"]
+        jsonl = os.path.join(output_dir, f"{sid}.jsonl")
+        summary["searches"][sid] = {
+            "search": spec["search"],
+            "check_in": spec["check_in"],
+            "check_out": spec["check_out"],
+            "hotels": export_json(jsonl, os.path.join(output_dir, f"{sid}.json")),
+            "failed": router.failed[sid],
+        }
+    with open(os.path.join(output_dir, "batch_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(
+        f"Batch done: {router.scheduled} hotel pages scraped, {router.reused} reused across searches, "
+        f"finished in {run_stats['elapsed_s']}s"
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    run_batch(sys.argv[1] if len(sys.argv) > 1 else "batch.json")
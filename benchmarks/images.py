@@ -0,0 +1,56 @@
+"""Exercise the image pipeline against the local fixture server.
+
+    python -m benchmarks.images --hotels 30 --concurrency 16
+
+Collects image_urls from the fixture hotel pages over HTTP, downloads the largest
+variant of each photo twice into a temporary store and reports what the second
+pass reused.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from benchmarks.server import FixtureServer
+from http_client import HttpClient
+from http_scraper import extract_fields_html
+from image_store import ImageDownloader, ImageStore, largest_variants
+from page_extract import IMAGE_FIELD
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hotels", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--delay-ms", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="image-store-")
+    try:
+        with FixtureServer(hotels=args.hotels, delay_ms=args.delay_ms) as server, HttpClient() as client:
+            hotels = [
+                extract_fields_html(client.get(url).text, [IMAGE_FIELD])["image_urls"]
+                for url in server.hotel_urls()
+            ]
+            raw = sum(len(urls) for urls in hotels)
+            selected = sum(len(largest_variants(urls)) for urls in hotels)
+            print(f"{args.hotels} hotels: {raw} image URLs, {selected} after keeping the largest variant per photo")
+            for run in ("cold", "warm"):
+                with ImageDownloader(ImageStore(root), concurrency=args.concurrency) as downloader:
+                    started = time.perf_counter()
+                    images = [img for urls in hotels for img in downloader.download(urls)]
+                    elapsed = time.perf_counter() - started
+                    failed = [img for img in images if "error" in img]
+                    print(f"{run}: {len(images)} images in {elapsed:.2f}s, {downloader.stats()}")
+                    if failed:
+                        print(f"  first failure: {failed[0]}")
+                        return 1
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Check that the lean browser profile scrapes the same values as the full one.
+
+    python -m benchmarks.parity                  # 2 hotels of each fixture layout, every image mode
+    python -m benchmarks.parity --per-kind 5 --modes fast
+
+Exits with status 1 when any field differs.
+"""
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.server import KINDS, FixtureServer
+from driver_pool import make_driver
+from scrape_worker import IMAGE_MODES, scrape_hotel_with
+
+
+
+def diff_results(full: Dict, lean: Dict) -> List[str]:
+    diffs = []
+    for key in sorted(set(full) | set(lean)):
+        if full.get(key) != lean.get(key):
+            diffs.append(f"{key}: full={full.get(key)!r} lean={lean.get(key)!r}")
+    return diffs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-kind", type=int, default=2, help="hotels of each fixture layout")
+    parser.add_argument("--modes", default=",".join(IMAGE_MODES), help="comma-separated: fast, gallery, gallery_fast")
+    args = parser.parse_args(argv)
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = set(modes) - set(IMAGE_MODES)
+    if unknown:
+        parser.error(f"unknown image mode(s): {', '.join(sorted(unknown))}")
+
+    mismatches = 0
+    timings = {"full": 0.0, "lean": 0.0}
+    with FixtureServer() as server:
+        urls = [u for kind in KINDS for u in server.hotel_urls_of_kind(kind, args.per_kind)]
+        drivers = {profile: make_driver(profile) for profile in timings}
+        try:
+            for mode in modes:
+                for url in urls:
+                    results = {}
+                    for profile, driver in drivers.items():
+                        started = time.perf_counter()
+                        results[profile] = scrape_hotel_with(driver, url, mode)
+                        timings[profile] += time.perf_counter() - started
+                    diffs = diff_results(results["full"], results["lean"])
+                    status = "ok" if not diffs else f"{len(diffs)} field(s) differ"
+                    print(f"[{mode}] {url.split('?')[0]}: {status}")
+                    for line in diffs:
+                        print(f"    {line}")
+                    mismatches += bool(diffs)
+        finally:
+            for driver in drivers.values():
+                driver.quit()
+
+    checked = len(urls) * len(modes)
+    print(
+        f"\n{checked - mismatches}/{checked} pages identical; "
+        f"full profile {timings['full']:.1f}s, lean profile {timings['lean']:.1f}s"
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""Offline benchmark of the scraper against the local fixture server.
+
+    python -m benchmarks.run_bench --workers 1,2,4
+    python -m benchmarks.run_bench --save-baseline          # store results as the baseline
+    python -m benchmarks.run_bench --fail-on-regression     # exit 1 when slower than the baseline
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+from benchmarks.server import FixtureServer
+from driver_pool import DriverPool, make_driver, process_tree_rss
+from http_client import HttpClient
+from http_scraper import scrape_hotel_http
+from metrics import percentile
+from page_extract import IMAGE_FIELD, extract_fields, wait_ready
+from pipeline import run_pipeline
+from results_harvester import harvest_cards
+from scrape_worker import scrape_hotel
+from scraping_utils import (
+    NAME_FALLBACK_SELECTOR,
+    NAME_SELECTORS,
+    close_gallery,
+    collect_gallery_fast,
+    collect_gallery_images,
+    dismiss_consent,
+    first_text,
+    get_address,
+    open_gallery,
+)
+from search_url import build_search_url
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+SEARCH_SPEC = {
+    "currency": "USD",
+    "search": "New York",
+    "check_in": "2025-10-15",
+    "check_out": "2025-10-21",
+    "propertyType": "Hotels",
+    "adults": 2,
+    "children": 0,
+    "rooms": 1,
+}
+
+# metric -> True when higher is better
+METRIC_DIRECTIONS = {
+    "throughput_per_s": True,
+    "latency_p50_s": False,
+    "latency_p95_s": False,
+    "latency_p99_s": False,
+    "peak_rss_mb": False,
+}
+
+
+class PeakRss:
+    """Samples RSS of this process and its children (chromedriver, Chrome) in the background."""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(os.getpid()) or 0
+            self.peak = max(self.peak, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def summarize(latencies: List[float], elapsed: float, peak_rss: int, **extra) -> Dict:
+    out = {
+        "count": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 3) if elapsed > 0 else None,
+        "latency_p50_s": round(percentile(latencies, 50), 4) if latencies else None,
+        "latency_p95_s": round(percentile(latencies, 95), 4) if latencies else None,
+        "latency_p99_s": round(percentile(latencies, 99), 4) if latencies else None,
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+    }
+    out.update(extra)
+    return out
+
+
+# ---------- End-to-end flow ----------
+
+def bench_end_to_end(
+    server: FixtureServer,
+    workers: int,
+    engine: str,
+    hotels: int,
+    images: str = "fast",
+    profile: str = "full",
+    prewarm: bool = False,
+) -> Dict:
+    latencies: List[float] = []
+    lock = threading.Lock()
+    failures = []
+    first_result = []
+    with PeakRss() as rss, DriverPool(max_size=workers, factory=partial(make_driver, profile)) as pool:
+        started = time.perf_counter()
+        if prewarm and engine != "http":
+            pool.prewarm(workers, server.base + "/")
+        client = HttpClient(max_per_host=max(workers, 8)) if engine == "http" else None
+
+        def task(href):
+            started = time.perf_counter()
+            if client is not None:
+                result = scrape_hotel_http(href, client, images, pool)
+            else:
+                result = scrape_hotel(href, images, pool)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+            return result
+
+        search_driver = make_driver(profile)
+        try:
+            search_driver.get(build_search_url(SEARCH_SPEC, base=server.base))
+            dismiss_consent(search_driver, timeout=2)
+            hrefs = (c["href"] for c in harvest_cards(search_driver, search_driver.current_url, hotels))
+            stats = run_pipeline(
+                hrefs,
+                task,
+                workers=workers if client is None else max(workers, 8),
+                on_result=lambda href, data: first_result or first_result.append(time.perf_counter()),
+                on_error=lambda href, e: failures.append(f"{href}: {e}"),
+            )
+        finally:
+            search_driver.quit()
+            if client is not None:
+                client.close()
+        elapsed = time.perf_counter() - started
+    return summarize(
+        latencies,
+        elapsed,
+        rss.peak,
+        failed=len(failures),
+        first_result_s=stats["first_result_s"],
+        startup_to_first_result_s=round(first_result[0] - started, 3) if first_result else None,
+        pool=pool.stats(),
+    )
+
+
+# ---------- Individual helpers ----------
+
+def _fast_images(driver):
+    return extract_fields(driver, [IMAGE_FIELD])[0]["image_urls"]
+
+
+def _gallery(driver):
+    urls = collect_gallery_images(driver) if open_gallery(driver) else []
+    close_gallery(driver)
+    return urls
+
+
+# name -> (fixture layout, helper)
+HELPERS: Dict[str, tuple] = {
+    "first_text_hit": ("basic", lambda d: first_text(d, NAME_SELECTORS, fallbacks=[NAME_FALLBACK_SELECTOR])),
+    "first_text_fallback": ("missing", lambda d: first_text(d, NAME_SELECTORS, fallbacks=[NAME_FALLBACK_SELECTOR])),
+    "get_address": ("basic", get_address),
+    "get_address_fallback": ("missing", get_address),
+    "collect_gallery_images": ("gallery", _gallery),
+    "fast_images_js": ("gallery", _fast_images),
+    "collect_gallery_fast": ("gallery", collect_gallery_fast),
+}
+
+
+def bench_helper(server: FixtureServer, name: str, workers: int, iterations: int, profile: str = "full") -> Dict:
+    kind, helper = HELPERS[name]
+    urls = server.hotel_urls_of_kind(kind, iterations * workers)
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def run_one(pool: DriverPool, url: str):
+        with pool.driver() as driver:
+            driver.get(url)
+            wait_ready(driver)
+            started = time.perf_counter()
+            helper(driver)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    with PeakRss() as rss, DriverPool(max_size=workers, factory=partial(make_driver, profile)) as pool:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(lambda u: run_one(pool, u), urls))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, rss.peak)
+
+
+# ---------- Baseline comparison ----------
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    print(f"\n{'run':44} {'metric':18} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, current in sorted(results["runs"].items()):
+        base = baseline.get("runs", {}).get(key)
+        if not base:
+            continue
+        for metric, higher_is_better in METRIC_DIRECTIONS.items():
+            b, c = base.get(metric), current.get(metric)
+            if not b or c is None:
+                continue
+            change = (c - b) / b
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > threshold else ""
+            print(f"{key:44} {metric:18} {b:>10} {c:>10} {change:>+7.1%}{flag}")
+            if worse > threshold:
+                regressions.append(f"{key} {metric}: {b} -> {c} ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--hotels", type=int, default=24, help="hotels per end-to-end run")
+    parser.add_argument("--engines", default="selenium,http", help="comma-separated: selenium, http")
+    parser.add_argument("--helpers", default=",".join(HELPERS), help="comma-separated helper names, or '' to skip")
+    parser.add_argument("--iterations", type=int, default=3, help="helper calls per worker")
+    parser.add_argument("--profile", default="full", help="browser profile: full or lean")
+    parser.add_argument("--prewarm", action="store_true", help="start the worker drivers while the search runs")
+    parser.add_argument("--image-mode", default="fast", help="end-to-end image mode: fast, gallery or gallery_fast")
+    parser.add_argument("--delay-ms", type=int, default=0, help="added server latency per response")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    worker_counts = [int(w) for w in args.workers.split(",") if w]
+    engines = [e for e in args.engines.split(",") if e]
+    helpers = [h for h in args.helpers.split(",") if h]
+    results = {
+        "meta": {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "hotels": args.hotels,
+            "iterations": args.iterations,
+            "delay_ms": args.delay_ms,
+            "profile": args.profile,
+            "image_mode": args.image_mode,
+            "prewarm": args.prewarm,
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": {},
+    }
+    with FixtureServer(hotels=max(args.hotels, 60), delay_ms=args.delay_ms) as server:
+        for workers in worker_counts:
+            for engine in engines:
+                key = f"e2e/{engine}/w{workers}"
+                print(f"Running {key} ...")
+                results["runs"][key] = bench_end_to_end(
+                    server,
+                    workers,
+                    engine,
+                    args.hotels,
+                    images=args.image_mode,
+                    profile=args.profile,
+                    prewarm=args.prewarm,
+                )
+            for name in helpers:
+                key = f"helper/{name}/w{workers}"
+                print(f"Running {key} ...")
+                results["runs"][key] = bench_helper(server, name, workers, args.iterations, profile=args.profile)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline first)")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Smallest valid GIF; served for every image URL so pages render without network access
+PIXEL = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00"
+    b",\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+# Hotel page layouts, assigned round-robin to generated hotels
+KINDS = ("gallery", "basic", "missing")
+
+_HOTEL_PATH_RE = re.compile(r"^/hotel/us/fixture-(\d+)(?:\.[a-z-]+)?\.html$")
+
+
+def _load(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _render(template: str, values: Dict[str, str]) -> str:
+    for key, value in values.items():
+        template = template.replace("{{" + key + "}}", str(value))
+    return template
+
+
+class FixtureServer:
+    """Local stand-in for Booking.com serving saved fixture pages.
+
+    Serves a paginated search-results page (``offset`` parameter), ``hotels``
+    generated hotel pages cycling through the fixture layouts (with gallery,
+    without gallery, missing selectors), and a 1x1 image for any
+    ``cf.bstatic.com`` path. ``delay_ms`` adds server latency to every response.
+    """
+
+    def __init__(self, hotels: int = 60, page_size: int = 25, delay_ms: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.hotels = hotels
+        self.page_size = page_size
+        self.delay_ms = delay_ms
+        self.templates = {
+            "gallery": _load("hotel_gallery.html"),
+            "basic": _load("hotel_basic.html"),
+            "missing": _load("hotel_missing.html"),
+            "search": _load("searchresults.html"),
+            "card": _load("property_card.html"),
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ----- generated data -----
+
+    def hotel(self, i: int) -> Dict:
+        return {
+            "INDEX": i,
+            "KIND": KINDS[i % len(KINDS)],
+            "ID": 7000000 + i,
+            "NAME": f"Fixture Hotel {i}",
+            "ADDRESS": f"{100 + i} West {i % 90 + 1}th Street, New York, NY 10036, United States",
+            "DESCRIPTION": (
+                f"Fixture Hotel {i} is a benchmark property.\n\n"
+                "Rooms include a flat-screen TV and free WiFi."
+            ),
+            "SCORE": f"{6 + (i % 40) / 10:.1f}",
+            "REVIEWS": f"{(i * 137) % 5000 + 12:,}",
+            "PRICE": 150 * 6 + (i * 37) % 1200,
+            "DISTANCE": f"{(i % 30) / 10 + 0.2:.1f}",
+            "BASE": self.base,
+            **{f"PHOTO{k}": 400000000 + i * 100 + k for k in range(5)},
+            "GALLERY_PHOTOS": json.dumps([400000000 + i * 100 + k for k in range(24)]),
+        }
+
+    def hotel_url(self, i: int, checkin: str = "2025-10-15", checkout: str = "2025-10-21") -> str:
+        return (
+            f"{self.base}/hotel/us/fixture-{i}.html?label=bench-{i}&aid=304142"
+            f"&checkin={checkin}&checkout={checkout}&group_adults=2&group_children=0&no_rooms=1"
+            f"&srpvid=bench{i:04d}&highlighted_blocks={7000000 + i}_371662184_2_0_0&from=searchresults"
+        )
+
+    def hotel_urls(self, count: Optional[int] = None) -> List[str]:
+        return [self.hotel_url(i) for i in range(count if count is not None else self.hotels)]
+
+    def hotel_urls_of_kind(self, kind: str, count: int) -> List[str]:
+        return [self.hotel_url(i) for i in range(self.hotels) if KINDS[i % len(KINDS)] == kind][:count]
+
+    # ----- pages -----
+
+    def search_page(self, query: Dict[str, List[str]]) -> str:
+        offset = int(query.get("offset", ["0"])[0] or 0)
+        checkin = query.get("checkin", ["2025-10-15"])[0]
+        checkout = query.get("checkout", ["2025-10-21"])[0]
+        cards = []
+        for i in range(offset, min(self.hotels, offset + self.page_size)):
+            values = self.hotel(i)
+            values["HREF"] = self.hotel_url(i, checkin, checkout).replace("&", "&amp;")
+            cards.append(_render(self.templates["card"], values))
+        return _render(self.templates["search"], {"CARDS": "\n".join(cards)})
+
+    def hotel_page(self, i: int) -> str:
+        values = self.hotel(i)
+        return _render(self.templates[values["KIND"]], values)
+
+    def home_page(self) -> str:
+        return _render(self.templates["search"], {"CARDS": ""})
+
+    # ----- server -----
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.delay_ms:
+                    time.sleep(server.delay_ms / 1000.0)
+                parts = urlsplit(self.path)
+                m = _HOTEL_PATH_RE.match(parts.path)
+                if parts.path.startswith("/cf.bstatic.com/"):
+                    # Trailing bytes after the GIF trailer are ignored by decoders but give each URL its own content
+                    self._send(200, PIXEL + parts.path.encode(), "image/gif")
+                elif parts.path == "/searchresults.html":
+                    self._send(200, server.search_page(parse_qs(parts.query)).encode(), "text/html; charset=utf-8")
+                elif m and int(m.group(1)) < server.hotels:
+                    self._send(200, server.hotel_page(int(m.group(1))).encode(), "text/html; charset=utf-8")
+                elif parts.path in ("/", "/index.html"):
+                    self._send(200, server.home_page().encode(), "text/html; charset=utf-8")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def _send(self, status: int, body: bytes, ctype: str):
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve Booking-style fixture pages locally")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--hotels", type=int, default=60)
+    parser.add_argument("--delay-ms", type=int, default=0)
+    args = parser.parse_args()
+    with FixtureServer(hotels=args.hotels, delay_ms=args.delay_ms, port=args.port) as srv:
+        print(f"Serving fixtures on {srv.base} (search: {srv.base}/searchresults.html)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
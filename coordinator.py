@@ -0,0 +1,130 @@
+"""Harvest search results into a durable job queue and merge what the workers scrape.
+
+    python coordinator.py --local-workers 2                   # queue in jobs.sqlite, two worker processes here
+    python coordinator.py --serve 0.0.0.0:8740 --token <secret> # plus workers elsewhere:
+    python queue_worker.py --queue http://<this-host>:8740 --token <secret>
+
+Reads input.json like main.py. The search always uses the direct results URL
+(search_mode "ui" is only available in main.py).
+"""
+import argparse
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from job_queue import TOKEN_ENV, JobQueueServer, SqliteJobQueue
+from output_store import JsonlWriter, export_json, load_done_keys, result_key
+from results_harvester import card_filter, harvest_cards, open_search_results
+
+
+def harvest_into(queue: SqliteJobQueue, data, done_keys) -> int:
+    options = Options()
+    options.add_argument("--start-maximized")
+    driver = webdriver.Chrome(options=options)
+    queued = 0
+    try:
+        if not open_search_results(driver, data):
+            return 0
+        for card in harvest_cards(driver, driver.current_url, data.get("maxitems", 10), keep=card_filter(data)):
+            href = card.pop("href")
+            if result_key(href) in done_keys:
+                continue
+            if queue.put(href, {"search_card": card}):
+                queued += 1
+    finally:
+        driver.quit()
+    return queued
+
+
+def merge_results(queue: SqliteJobQueue, writer: JsonlWriter, poll_s: float) -> dict:
+    """Append finished jobs to ``writer`` until nothing is queued or leased."""
+    merged = {"done": 0, "failed": 0}
+    while True:
+        queue.requeue_expired()
+        finished = queue.take_results()
+        for job in finished:
+            if job.result is None:
+                merged["failed"] += 1
+                print(f"ERROR {job.url} failed after {job.attempts} attempts: {job.error}")
+                continue
+            job.result["search_card"] = job.payload.get("search_card")
+            writer.write(job.result)
+            merged["done"] += 1
+            print(f"✅ Merged hotel #{writer.written}: {job.result.get('hotel_name') or job.url}")
+        counts = queue.counts()
+        if not finished and counts["queued"] == 0 and counts["leased"] == 0:
+            return merged
+        if not finished:
+            time.sleep(poll_s)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue", default="jobs.sqlite", help="SQLite queue file owned by this coordinator")
+    parser.add_argument("--serve", help="host:port to expose the queue to workers on other machines (host defaults to 127.0.0.1)")
+    parser.add_argument("--token", help=f"shared secret remote workers must send (default ${TOKEN_ENV}, else a new random one)")
+    parser.add_argument("--local-workers", type=int, default=0, help="worker processes to start on this machine")
+    parser.add_argument("--worker-threads", type=int, help="threads per local worker (default: workers from input.json)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="claims per job before it is marked failed")
+    parser.add_argument("--poll", type=float, default=2, help="seconds between merge passes")
+    parser.add_argument("--config", default="input.json")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        data = json.load(f)
+    output_json = data.get("output", "output.json")
+    output_jsonl = data.get("output_jsonl", "output.jsonl")
+    resume = data.get("resume", False)
+
+    queue = SqliteJobQueue(args.queue, max_attempts=args.max_attempts)
+    if not resume:
+        queue.reset()
+    queue.seal(False)
+    server = None
+    if args.serve:
+        host, _, port = args.serve.rpartition(":")
+        token = args.token or os.environ.get(TOKEN_ENV) or secrets.token_urlsafe(24)
+        server = JobQueueServer(queue, host or "127.0.0.1", int(port), token=token).start()
+        print(f"Serving job queue on {server.address}")
+        if not (args.token or os.environ.get(TOKEN_ENV)):
+            print(f"Start remote workers with: python queue_worker.py --queue http://<this-host>:{port} --token {token}")
+
+    workers = []
+    for _ in range(args.local_workers):
+        cmd = [sys.executable, "queue_worker.py", "--queue", args.queue, "--exit-when-empty", "--config", args.config]
+        if args.worker_threads:
+            cmd += ["--threads", str(args.worker_threads)]
+        workers.append(subprocess.Popen(cmd))
+
+    done_keys = load_done_keys(output_jsonl) if resume else set()
+    writer = JsonlWriter(output_jsonl, fsync_every=data.get("fsync_every", 10), append=resume)
+    started = time.monotonic()
+    try:
+        queued = harvest_into(queue, data, done_keys)
+        print(f"✅ Queued {queued} hotels; {queue.counts()}")
+        queue.seal()
+        with writer:
+            merged = merge_results(queue, writer, args.poll)
+    finally:
+        queue.seal()
+        for proc in workers:
+            proc.wait()
+        if server is not None:
+            server.stop()
+    print(
+        f"Merged {merged['done']} hotels ({merged['failed']} failed) "
+        f"in {time.monotonic() - started:.1f}s; queue: {queue.counts()}"
+    )
+    queue.close()
+    exported = export_json(output_jsonl, output_json)
+    print(f"Wrote {exported} hotels to {output_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from scraping_utils import close_gallery as su_close_gallery, dismiss_consent as su_dismiss_consent
+from metrics import span
+
+try:
+    import psutil  # optional: used for RSS limits where /proc is not available
+except ImportError:
+    psutil = None
+
+
+# ---------- Driver construction ----------
+
+PROFILES = ("full", "lean")
+
+LEAN_WINDOW_SIZE = "1280,900"
+# Hosts the lean profile can reach; every other host (ads, analytics, tag managers) fails DNS
+LEAN_ALLOWED_HOSTS = ("booking.com", "*.booking.com", "*.bstatic.com", "localhost")
+# Requests dropped by the lean profile; img src/srcset attributes are unaffected
+LEAN_BLOCKED_URLS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*",
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*",
+]
+
+
+def make_driver(profile: str = "full") -> webdriver.Chrome:
+    """Start Chrome with the ``"full"`` (headed, maximized) or ``"lean"`` (headless, no images) profile.
+
+    Whether the lean profile scrapes the same values is checked on the fixture
+    pages by ``python -m benchmarks.parity``.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile {profile!r} (expected one of {', '.join(PROFILES)})")
+    options = Options()
+    if profile == "full":
+        # Keep the same behavior as main browser (do not change to headless to avoid behavioral diffs)
+        options.add_argument("--start-maximized")
+        return webdriver.Chrome(options=options)
+
+    options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={LEAN_WINDOW_SIZE}")
+    options.add_argument("--mute-audio")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disk-cache-size=268435456")
+    rules = ["MAP * ~NOTFOUND"] + [f"EXCLUDE {host}" for host in LEAN_ALLOWED_HOSTS]
+    options.add_argument("--host-resolver-rules=" + ", ".join(rules))
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        # Headless Chrome announces itself in the user agent; present the regular one
+        user_agent = driver.execute_script("return navigator.userAgent")
+        driver.execute_cdp_cmd("Network.setUserAgentOverride", {
+            "userAgent": user_agent.replace("HeadlessChrome", "Chrome"),
+        })
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+
+# ---------- Process memory ----------
+
+def _proc_children(pid: int) -> List[int]:
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _proc_rss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Resident memory in bytes of ``pid`` and all of its descendants."""
+    if psutil is not None:
+        try:
+            proc = psutil.Process(pid)
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total
+        except psutil.Error:
+            return None
+    if not os.path.isdir("/proc"):
+        return None
+    total = 0
+    stack = [pid]
+    while stack:
+        p = stack.pop()
+        total += _proc_rss(p)
+        stack.extend(_proc_children(p))
+    return total
+
+
+def driver_rss(driver) -> Optional[int]:
+    """RSS of the chromedriver process plus the Chrome processes it spawned."""
+    try:
+        pid = driver.service.process.pid
+    except Exception:
+        return None
+    return process_tree_rss(pid)
+
+
+# ---------- Driver pool ----------
+
+# OneTrust keeps the cookie-banner choice in these cookies; the pool carries them across resets
+CONSENT_COOKIE_PREFIXES = ("Optanon",)
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.main_handle = None
+        self.owner = None
+        self.aborted = False
+        # Set by a worker taking the driver while prewarm is still loading its page
+        self.claimed = False
+        self.warmed = threading.Event()
+
+
+class DriverPool:
+    """Bounded pool of Chrome drivers shared by the detail-scraping threads.
+
+    At most ``max_size`` drivers exist at once; ``acquire`` blocks when all of
+    them are checked out. A driver is quit and replaced after ``max_pages``
+    pages or once its process tree RSS passes ``max_rss_mb``.
+
+    ``prewarm`` starts drivers in the background before any page is requested;
+    a worker finding no free slot takes over one whose Chrome is already up.
+    Consent cookies picked up while warming are restored on every reset and set
+    on drivers started later, so no worker sees the cookie banner again.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4,
+        max_pages: int = 50,
+        max_rss_mb: Optional[int] = 1500,
+        factory=make_driver,
+    ):
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.factory = factory
+        self._idle: List[_PooledDriver] = []
+        self._busy: Dict[int, _PooledDriver] = {}
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.recycled = 0
+        self.prewarmed = 0
+        self._consent_cookies: List[Dict] = []
+        self._prewarm_threads: List[threading.Thread] = []
+        self._warming: List[_PooledDriver] = []
+        self._prewarming = 0
+        self.handoffs = 0
+
+    def _take_slot(self) -> Optional[_PooledDriver]:
+        """Wait for a free slot (returns None) or take over a driver still being prewarmed."""
+        while True:
+            with self._lock:
+                prewarming = self._prewarming > 0
+            if not prewarming:
+                self._slots.acquire()
+                return None
+            if self._slots.acquire(blocking=False):
+                return None
+            with self._lock:
+                entry = next((e for e in self._warming if not e.claimed), None)
+                if entry is not None:
+                    # The prewarm thread stops at its next step and hands its slot over with the driver
+                    entry.claimed = True
+                    self.handoffs += 1
+            if entry is not None:
+                entry.warmed.wait()
+                return entry
+            if self._slots.acquire(timeout=0.05):
+                return None
+
+    def acquire(self):
+        with span("driver_checkout_wait"):
+            entry = self._take_slot()
+        handed_over = entry is not None
+        with self._lock:
+            if self._closed:
+                self._slots.release()
+                if handed_over:
+                    self._quit(entry)
+                raise RuntimeError("DriverPool is closed")
+            if entry is None:
+                entry = self._idle.pop() if self._idle else None
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if handed_over:
+            self._restore_cookies(entry.driver)
+        elif entry is None:
+            try:
+                with span("driver_start"):
+                    entry = _PooledDriver(self.factory())
+            except Exception:
+                self._slots.release()
+                raise
+            self._restore_cookies(entry.driver)
+            with self._lock:
+                self.created += 1
+        try:
+            entry.main_handle = entry.driver.current_window_handle
+        except Exception:
+            entry.main_handle = None
+        entry.owner = threading.get_ident()
+        entry.aborted = False
+        with self._lock:
+            self._busy[id(entry.driver)] = entry
+        return entry.driver
+
+    def release(self, driver, discard: bool = False) -> None:
+        with self._lock:
+            entry = self._busy.pop(id(driver), None)
+        if entry is None:
+            return
+        try:
+            entry.pages += 1
+            with span("driver_reset"):
+                reusable = not (discard or entry.aborted) and not self._should_recycle(entry) and self._reset(entry)
+            if not reusable:
+                self._quit(entry)
+                with self._lock:
+                    self.recycled += 1
+                return
+            with self._lock:
+                if self._closed:
+                    self._quit(entry)
+                else:
+                    self._idle.append(entry)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        drv = self.acquire()
+        failed = False
+        try:
+            yield drv
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # A driver that raised mid-page may be wedged; drop it rather than reuse it
+            self.release(drv, discard=failed and not _is_alive(drv))
+
+    def abort(self, thread_id: int) -> bool:
+        """Quit the driver checked out by ``thread_id`` so its blocked WebDriver call fails fast.
+
+        The owner still releases it as usual; an aborted driver is discarded, not reused.
+        """
+        with self._lock:
+            entry = next((e for e in self._busy.values() if e.owner == thread_id), None)
+            if entry is None or entry.aborted:
+                return False
+            entry.aborted = True
+        self._quit(entry)
+        return True
+
+    def _should_recycle(self, entry: _PooledDriver) -> bool:
+        if self.max_pages and entry.pages >= self.max_pages:
+            return True
+        if self.max_rss_mb:
+            rss = driver_rss(entry.driver)
+            if rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+                return True
+        return False
+
+    def _reset(self, entry: _PooledDriver) -> bool:
+        driver = entry.driver
+        try:
+            # Leftover gallery overlay from close_gallery failing or being skipped
+            su_close_gallery(driver)
+            handles = driver.window_handles
+            keep = entry.main_handle if entry.main_handle in handles else handles[0]
+            for handle in handles:
+                if handle != keep:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(keep)
+            # delete_all_cookies only reaches the current document's origin, so clear through
+            # CDP (every origin) or, failing that, while still on the hotel page
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except Exception:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            self._restore_cookies(driver)
+            try:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                    "origin": "https://www.booking.com",
+                    "storageTypes": "local_storage,session_storage",
+                })
+            except Exception:
+                pass
+            return True
+        except Exception:
+            return False
+
+    def prewarm(self, count: int, warm_url: Optional[str] = None, load_timeout: float = 10) -> None:
+        """Start up to ``count`` drivers on background threads and leave them idle in the pool.
+
+        With ``warm_url`` each one loads that page first (DNS, TLS and HTTP cache
+        are warm afterwards) and dismisses the cookie banner. Each prewarm holds a
+        slot while it runs. A worker that finds every slot taken does not wait for
+        the page: once a prewarmed Chrome has started, ``acquire`` takes it over
+        after the current page load, and the cookie-banner steps are skipped.
+        The warm-up load is cut off after ``load_timeout`` seconds so neither a
+        waiting worker nor ``close`` sits through a slow page; the driver's own
+        page-load timeout is restored before it is handed out.
+        """
+        count = min(count, self.max_size)
+        with self._lock:
+            self._prewarming += count
+        for i in range(count):
+            t = threading.Thread(
+                target=self._prewarm_one, args=(warm_url, load_timeout), name=f"driver-prewarm-{i}", daemon=True
+            )
+            t.start()
+            self._prewarm_threads.append(t)
+
+    def _prewarm_one(self, warm_url: Optional[str], load_timeout: float) -> None:
+        try:
+            if self._slots.acquire(blocking=False):
+                if not self._prewarm_slot(warm_url, load_timeout):
+                    self._slots.release()
+        finally:
+            with self._lock:
+                self._prewarming -= 1
+
+    def _prewarm_slot(self, warm_url: Optional[str], load_timeout: float) -> bool:
+        """Start and warm one driver in the slot already taken; True when a worker took it over."""
+        with self._lock:
+            if self._closed:
+                return False
+        try:
+            with span("driver_prewarm"):
+                entry = _PooledDriver(self.factory())
+        except Exception as e:
+            print(f"Driver prewarm failed: {e}")
+            return False
+        with self._lock:
+            self.created += 1
+            self.prewarmed += 1
+            self._warming.append(entry)
+        try:
+            if warm_url and not entry.claimed:
+                page_load = self._page_load_timeout(entry.driver)
+                try:
+                    entry.driver.set_page_load_timeout(load_timeout)
+                    entry.driver.get(warm_url)
+                    if not entry.claimed:
+                        su_dismiss_consent(entry.driver, timeout=5)
+                        self._keep_consent_cookies(entry.driver)
+                        entry.driver.get("about:blank")
+                except Exception as e:
+                    print(f"Driver prewarm could not load {warm_url}: {e}")
+                finally:
+                    try:
+                        entry.driver.set_page_load_timeout(page_load)
+                    except Exception:
+                        pass
+            if not entry.claimed:
+                self._restore_cookies(entry.driver)
+        finally:
+            with self._lock:
+                handed_over = entry.claimed
+                idle = not handed_over and not self._closed
+                self._warming.remove(entry)
+                if idle:
+                    self._idle.append(entry)
+            entry.warmed.set()
+        if not handed_over and not idle:
+            self._quit(entry)
+        return handed_over
+
+    @staticmethod
+    def _page_load_timeout(driver) -> float:
+        try:
+            return driver.timeouts.page_load
+        except Exception:
+            return 300  # WebDriver default
+
+    def _keep_consent_cookies(self, driver) -> None:
+        try:
+            cookies = [c for c in driver.get_cookies() if c["name"].startswith(CONSENT_COOKIE_PREFIXES)]
+        except Exception:
+            return
+        if cookies:
+            with self._lock:
+                self._consent_cookies = cookies
+
+    def _restore_cookies(self, driver) -> None:
+        with self._lock:
+            cookies = list(self._consent_cookies)
+        if not cookies:
+            return
+        # CDP can set cookies for any domain while the tab is still on about:blank
+        params = []
+        for c in cookies:
+            cookie = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c}
+            if "expiry" in c:
+                cookie["expires"] = c["expiry"]
+            if c.get("sameSite") in ("Strict", "Lax", "None"):
+                cookie["sameSite"] = c["sameSite"]
+            params.append(cookie)
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+        except Exception:
+            pass
+
+    def _quit(self, entry: _PooledDriver) -> None:
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    def rss(self) -> Optional[int]:
+        """Total RSS of every pooled Chrome, idle or checked out."""
+        with self._lock:
+            drivers = [e.driver for e in self._idle] + [e.driver for e in self._busy.values()]
+        sizes = [driver_rss(d) for d in drivers]
+        known = [s for s in sizes if s is not None]
+        return sum(known) if known else None
+
+    def trim(self, keep: int) -> None:
+        """Quit idle drivers until at most ``keep`` drivers are alive."""
+        with self._lock:
+            surplus = max(0, len(self._idle) + len(self._busy) - keep)
+            drop = self._idle[:surplus]
+            self._idle = self._idle[surplus:]
+        for entry in drop:
+            self._quit(entry)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "created": self.created,
+                "recycled": self.recycled,
+                "prewarmed": self.prewarmed,
+                "handoffs": self.handoffs,
+                "idle": len(self._idle),
+                "busy": len(self._busy),
+                "max_size": self.max_size,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            warming = list(self._warming)
+        for entry in idle:
+            self._quit(entry)
+        # Quitting a driver that is still warming interrupts its page load instead of waiting it out
+        for entry in warming:
+            self._quit(entry)
+        for t in self._prewarm_threads:
+            t.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _is_alive(driver) -> bool:
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
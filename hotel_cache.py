@@ -0,0 +1,184 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from hotel_urls import canonical_url, hotel_key
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Static hotel data changes rarely; review counts move daily
+DEFAULT_TTLS = {
+    "hotel_name": 30 * DAY,
+    "address": 30 * DAY,
+    "description": 7 * DAY,
+    "image_urls": 7 * DAY,
+    "check_in": 7 * DAY,
+    "check_out": 7 * DAY,
+    "review_score": 1 * DAY,
+    "total_reviews": 1 * DAY,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotels (
+    key TEXT PRIMARY KEY,
+    hotel_key TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hotels_accessed ON hotels (accessed_at);
+CREATE INDEX IF NOT EXISTS hotels_hotel_key ON hotels (hotel_key);
+"""
+
+
+class HotelCache:
+    """On-disk cache of ``scrape_hotel`` results keyed by canonical hotel URL.
+
+    Each field carries its own fetch time and TTL. ``lookup`` returns the cached
+    values together with the fields that have expired, so a caller can refresh
+    just those (``cached`` does this with its ``refresh`` task) and keep the rest;
+    ``get`` only returns entries with every field fresh. On store, an empty value
+    does not overwrite a cached value that is still fresh, so one bad page load
+    does not blank a field. Least recently used entries are evicted beyond
+    ``max_entries``.
+    """
+
+    def __init__(self, path: str = "hotel_cache.sqlite", ttls: Optional[Dict[str, float]] = None, max_entries: int = 50000):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.partial = 0
+        self.misses = 0
+
+    def _load(self, key: str) -> Optional[Dict]:
+        row = self._conn.execute("SELECT fields FROM hotels WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _fresh(self, name: str, entry: Dict, now: float) -> bool:
+        return now - entry["t"] <= self.ttls.get(name, 0)
+
+    def _stale(self, fields: Optional[Dict], now: float) -> List[str]:
+        return [name for name in self.ttls if fields is None or name not in fields or not self._fresh(name, fields[name], now)]
+
+    def lookup(self, url: str, any_dates: bool = False) -> Tuple[Optional[Dict], List[str]]:
+        """Cached result for ``url`` (None if there is no entry) and the names of its expired fields.
+
+        With ``any_dates`` a fully fresh entry of the same hotel for other dates also counts.
+        """
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            fields = self._load(key)
+            stale = self._stale(fields, now)
+            if any_dates and stale:
+                # The scraped fields describe the hotel, not the stay, so other date windows are equally valid
+                rows = self._conn.execute(
+                    "SELECT key, fields FROM hotels WHERE hotel_key = ? ORDER BY accessed_at DESC",
+                    (hotel_key(url),),
+                ).fetchall()
+                for other_key, other in rows:
+                    other = json.loads(other)
+                    if not self._stale(other, now):
+                        key, fields, stale = other_key, other, []
+                        break
+            if fields is None:
+                self.misses += 1
+                return None, stale
+            if stale:
+                self.partial += 1
+            else:
+                self.hits += 1
+                self._conn.execute("UPDATE hotels SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+        result = {"url": url}
+        result.update({name: entry["v"] for name, entry in fields.items()})
+        return result, stale
+
+    def get(self, url: str, any_dates: bool = False) -> Optional[Dict]:
+        """Cached result for ``url`` if every field is still fresh."""
+        result, stale = self.lookup(url, any_dates)
+        return result if not stale else None
+
+    def put(self, url: str, result: Dict, only: Optional[Iterable[str]] = None) -> Dict:
+        """Store ``result`` and return it with still-fresh cached values filled into empty fields.
+
+        With ``only``, just those fields are taken from ``result``; the other cached
+        fields keep their values and fetch times.
+        """
+        key = canonical_url(url)
+        now = time.time()
+        only = None if only is None else set(only)
+        with self._lock:
+            fields = self._load(key) or {}
+            for name, value in result.items():
+                if name == "url" or (only is not None and name not in only and name in fields):
+                    continue
+                old = fields.get(name)
+                if not value and old is not None and old["v"] and self._fresh(name, old, now):
+                    continue
+                fields[name] = {"v": value, "t": now}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hotels (key, hotel_key, fields, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, hotel_key(url), json.dumps(fields, ensure_ascii=False), now),
+            )
+            self._evict()
+            self._conn.commit()
+        merged = {"url": url}
+        merged.update({name: entry["v"] for name, entry in fields.items()})
+        return merged
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM hotels").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM hotels WHERE key IN (SELECT key FROM hotels ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM hotels").fetchone()
+            return {"hits": self.hits, "partial": self.partial, "misses": self.misses, "entries": count}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def cached(
+    task: Callable[[str], Dict],
+    cache: HotelCache,
+    any_dates: bool = False,
+    refresh: Optional[Callable[[str, List[str]], Dict]] = None,
+) -> Callable[[str], Dict]:
+    """Wrap a scrape task so cache hits skip the page load entirely.
+
+    When only some fields have expired, ``refresh(href, stale)`` is run instead of
+    ``task`` (it can skip work for fields that are still fresh, such as the
+    gallery) and only the expired fields are updated.
+    """
+
+    def run(href: str) -> Dict:
+        hit, stale = cache.lookup(href, any_dates=any_dates)
+        if hit is not None and not stale:
+            return hit
+        if hit is not None and refresh is not None:
+            return cache.put(href, refresh(href, stale), only=stale)
+        return cache.put(href, task(href))
+
+    return run
@@ -0,0 +1,35 @@
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that change what a hotel page shows; everything else is tracking
+CANONICAL_PARAMS = ("checkin", "checkout", "group_adults", "group_children", "no_rooms", "age")
+
+# /hotel/us/royalton.en-gb.html -> /hotel/us/royalton.html
+_LANG_SUFFIX_RE = re.compile(r"\.[a-z]{2}(?:-[a-z]{2})?\.html$")
+
+
+def hotel_id(url: str) -> Optional[str]:
+    """Booking.com numeric hotel id from a ``hotel_id`` query parameter, or None.
+
+    Search-result links usually carry none: their block parameters
+    (``highlighted_blocks``, ...) hold room ids, not hotel ids. Dedupe on
+    ``hotel_key`` instead.
+    """
+    value = dict(parse_qsl(urlsplit(url).query)).get("hotel_id", "")
+    return value if value.isdigit() else None
+
+
+def hotel_key(url: str) -> str:
+    """The hotel slug path, identical for every date, occupancy and language variant of a hotel."""
+    path = urlsplit(url).path
+    return _LANG_SUFFIX_RE.sub(".html", path.lower())
+
+
+def canonical_url(url: str) -> str:
+    """Reduce a hotel URL to its slug plus the date and occupancy parameters."""
+    parts = urlsplit(url)
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False) if k in CANONICAL_PARAMS
+    )
+    return urlunsplit(("https", parts.netloc.lower(), hotel_key(url), urlencode(params), ""))
@@ -0,0 +1,450 @@
+import re
+import threading
+from collections import defaultdict
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from lxml import etree as lxml_etree  # optional: C parser and XPath, used by parse_page when installed
+except ImportError:
+    lxml_etree = None
+
+# ---------- Minimal DOM ----------
+#
+# Just enough of a DOM to run the CSS selectors in scraping_utils against server-rendered
+# HTML: element tree, attributes, text, and innerText-like line breaks at block elements.
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+}
+RAW_TEXT_TAGS = {"script", "style", "template", "noscript"}
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Optional[Dict[str, str]] = None, parent: Optional["Node"] = None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: List = []  # Node or str
+        self.parent = parent
+
+    def get(self, name: str, default=None):
+        return self.attrs.get(name, default)
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    def iter(self) -> Iterator["Node"]:
+        """Descendant elements in document order (excluding self)."""
+        stack = list(reversed([c for c in self.children if isinstance(c, Node)]))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed([c for c in node.children if isinstance(c, Node)]))
+
+    def own_text(self) -> str:
+        return "".join(c for c in self.children if isinstance(c, str))
+
+    @property
+    def inner_text(self) -> str:
+        parts: List[str] = []
+        _collect_text(self, parts)
+        return _join_lines(parts)
+
+    def select(self, selector: str) -> List["Node"]:
+        return select(self, selector)
+
+    def select_one(self, selector: str) -> Optional["Node"]:
+        found = select(self, selector, limit=1)
+        return found[0] if found else None
+
+
+def _join_lines(parts: List[str]) -> str:
+    lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parts).split("\n")]
+    out: List[str] = []
+    for line in lines:
+        if line or (out and out[-1]):
+            out.append(line)
+    return "\n".join(out).strip()
+
+
+def _collect_text(node: Node, parts: List[str]) -> None:
+    if node.tag in RAW_TEXT_TAGS:
+        return
+    block = node.tag in BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    for child in node.children:
+        if isinstance(child, str):
+            parts.append(child.replace("\n", " "))
+        elif child.tag == "br":
+            parts.append("\n")
+        else:
+            _collect_text(child, parts)
+    if block:
+        parts.append("\n")
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+
+    def handle_endtag(self, tag):
+        # Close up to the nearest open element with this tag; ignore stray end tags
+        node = self.current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+# ---------- CSS selectors ----------
+#
+# Supports type, #id, .class, [attr], [attr=v], [attr^=v], [attr$=v], [attr*=v],
+# [attr~=v], descendant and child (>) combinators, and comma-separated groups.
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s*>\s*|\s+)
+    |(?P<tag>\*|[a-zA-Z][\w-]*)
+    |\#(?P<id>[\w-]+)
+    |\.(?P<cls>[\w-]+)
+    |\[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[\^$*~|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+)))?\s*\]
+    """,
+    re.VERBOSE,
+)
+
+_compiled: Dict[str, List] = {}
+
+
+def _compile(selector: str) -> List:
+    """Compile to a list of groups; each group is a list of (combinator, compound) pairs."""
+    cached = _compiled.get(selector)
+    if cached is not None:
+        return cached
+    groups = []
+    for part in selector.split(","):
+        part = part.strip()
+        steps = []
+        compound = {"tag": None, "id": None, "classes": [], "attrs": []}
+        combinator = " "
+        pos = 0
+        while pos < len(part):
+            m = _TOKEN_RE.match(part, pos)
+            if not m or m.end() == pos:
+                raise ValueError(f"Unsupported selector: {selector!r}")
+            pos = m.end()
+            if m.group("ws") is not None:
+                steps.append((combinator, compound))
+                combinator = ">" if ">" in m.group("ws") else " "
+                compound = {"tag": None, "id": None, "classes": [], "attrs": []}
+            elif m.group("tag"):
+                compound["tag"] = None if m.group("tag") == "*" else m.group("tag").lower()
+            elif m.group("id"):
+                compound["id"] = m.group("id")
+            elif m.group("cls"):
+                compound["classes"].append(m.group("cls"))
+            else:
+                value = next((v for v in (m.group("dq"), m.group("sq"), m.group("bare")) if v is not None), None)
+                compound["attrs"].append((m.group("attr"), m.group("op"), value))
+        steps.append((combinator, compound))
+        groups.append(steps)
+    _compiled[selector] = groups
+    return groups
+
+
+def _match_compound(node: Node, c: Dict) -> bool:
+    if c["tag"] and node.tag != c["tag"]:
+        return False
+    if c["id"] and node.attrs.get("id") != c["id"]:
+        return False
+    if c["classes"]:
+        classes = node.classes
+        if any(cls not in classes for cls in c["classes"]):
+            return False
+    for name, op, value in c["attrs"]:
+        actual = node.attrs.get(name)
+        if actual is None:
+            return False
+        if op is None:
+            continue
+        if op == "=" and actual != value:
+            return False
+        if op == "^=" and not actual.startswith(value):
+            return False
+        if op == "$=" and not actual.endswith(value):
+            return False
+        if op == "*=" and value not in actual:
+            return False
+        if op == "~=" and value not in actual.split():
+            return False
+        if op == "|=" and actual != value and not actual.startswith(value + "-"):
+            return False
+    return True
+
+
+def _match_steps(node: Node, steps: List, idx: int) -> bool:
+    combinator, compound = steps[idx]
+    if not _match_compound(node, compound):
+        return False
+    if idx == 0:
+        return True
+    parent = node.parent
+    if combinator == ">":
+        return parent is not None and parent.tag != "#document" and _match_steps(parent, steps, idx - 1)
+    while parent is not None and parent.tag != "#document":
+        if _match_steps(parent, steps, idx - 1):
+            return True
+        parent = parent.parent
+    return False
+
+
+def select(root: Node, selector: str, limit: Optional[int] = None) -> List[Node]:
+    groups = _compile(selector)
+    out: List[Node] = []
+    for node in root.iter():
+        if any(_match_steps(node, steps, len(steps) - 1) for steps in groups):
+            out.append(node)
+            if limit and len(out) >= limit:
+                break
+    return out
+
+
+def _index_key(compound: Dict) -> Tuple[str, str]:
+    # The most selective part of a selector's last compound; a node can only match if it has it
+    if compound["id"]:
+        return ("id", compound["id"])
+    if compound["classes"]:
+        return ("class", compound["classes"][0])
+    if compound["attrs"]:
+        return ("attr", compound["attrs"][0][0])
+    if compound["tag"]:
+        return ("tag", compound["tag"])
+    return ("any", "")
+
+
+def select_many(root: Node, selectors: Iterable[str]) -> Dict[str, List[Node]]:
+    """Every match of each selector, found in one walk of the tree instead of one walk per selector."""
+    index = defaultdict(list)
+    out: Dict[str, List[Node]] = {}
+    for selector in selectors:
+        out[selector] = []
+        for steps in _compile(selector):
+            index[_index_key(steps[-1][1])].append((selector, steps))
+    any_node = index.get(("any", ""), [])
+    for node in root.iter():
+        candidates = list(any_node)
+        candidates.extend(index.get(("tag", node.tag), ()))
+        for name in node.attrs:
+            candidates.extend(index.get(("attr", name), ()))
+        if "id" in node.attrs:
+            candidates.extend(index.get(("id", node.attrs["id"]), ()))
+        if "class" in node.attrs:
+            for cls in node.classes:
+                candidates.extend(index.get(("class", cls), ()))
+        for selector, steps in candidates:
+            found = out[selector]
+            if (not found or found[-1] is not node) and _match_steps(node, steps, len(steps) - 1):
+                found.append(node)
+    return out
+
+
+# ---------- Pages for field extraction ----------
+#
+# http_scraper evaluates the field spec through a page object so the same probes run on
+# lxml (C parser, selectors compiled to XPath) or, without lxml, on the tree above.
+
+def _xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in value.split("'")) + ")"
+
+
+def _compound_xpath(c: Dict) -> str:
+    preds = []
+    if c["id"]:
+        preds.append(f"@id={_xpath_literal(c['id'])}")
+    for cls in c["classes"]:
+        preds.append(f"contains(concat(' ', normalize-space(@class), ' '), {_xpath_literal(f' {cls} ')})")
+    for name, op, value in c["attrs"]:
+        attr = f"@*[name()={_xpath_literal(name)}]" if ":" in name else f"@{name}"
+        if op is None:
+            preds.append(attr)
+            continue
+        lit = _xpath_literal(value)
+        if op == "=":
+            preds.append(f"{attr}={lit}")
+        elif op == "^=":
+            preds.append(f"starts-with({attr}, {lit})")
+        elif op == "$=":
+            preds.append(f"{attr} and substring({attr}, string-length({attr}) - {len(value) - 1})={lit}")
+        elif op == "*=":
+            preds.append(f"contains({attr}, {lit})")
+        elif op == "~=":
+            preds.append(f"contains(concat(' ', normalize-space({attr}), ' '), {_xpath_literal(f' {value} ')})")
+        elif op == "|=":
+            preds.append(f"({attr}={lit} or starts-with({attr}, {_xpath_literal(value + '-')}))")
+    return (c["tag"] or "*") + "".join(f"[{p}]" for p in preds)
+
+
+def css_to_xpath(selector: str) -> str:
+    """XPath selecting the descendants of the context node that match ``selector``, in document order."""
+    paths = []
+    for steps in _compile(selector):
+        path = ""
+        for combinator, compound in steps:
+            path += ("/" if path and combinator == ">" else ("/descendant::" if path else "descendant::"))
+            path += _compound_xpath(compound)
+        paths.append(path)
+    return " | ".join(paths)
+
+
+def _collect_lxml_text(el, parts: List[str]) -> None:
+    # Same rules as _collect_text, on an lxml element (text before children, tail after)
+    if not isinstance(el.tag, str) or el.tag in RAW_TEXT_TAGS:
+        return
+    block = el.tag in BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    if el.text:
+        parts.append(el.text.replace("\n", " "))
+    for child in el:
+        if child.tag == "br":
+            parts.append("\n")
+        else:
+            _collect_lxml_text(child, parts)
+        if child.tail:
+            parts.append(child.tail.replace("\n", " "))
+    if block:
+        parts.append("\n")
+
+
+class TreePage:
+    """Page on the pure-Python tree. ``prefetch`` finds every selector of a spec in one walk."""
+
+    backend = "html.parser"
+
+    def __init__(self, html: str):
+        self.root = parse_html(html)
+        self._matches: Dict[str, List[Node]] = {}
+        self._texts: Optional[List[str]] = None
+
+    def prefetch(self, selectors: Iterable[str]) -> None:
+        pending = [s for s in dict.fromkeys(selectors) if s not in self._matches]
+        if pending:
+            self._matches.update(select_many(self.root, pending))
+
+    def select(self, selector: str, within: Optional[Node] = None, limit: Optional[int] = None) -> List[Node]:
+        if within is not None:
+            return select(within, selector, limit)
+        found = self._matches.get(selector)
+        if found is None:
+            return select(self.root, selector, limit)
+        return found[:limit] if limit else found
+
+    def select_one(self, selector: str, within: Optional[Node] = None) -> Optional[Node]:
+        found = self.select(selector, within, limit=1)
+        return found[0] if found else None
+
+    def attr(self, el: Node, name: str) -> Optional[str]:
+        return el.get(name)
+
+    def inner_text(self, el: Node) -> str:
+        return el.inner_text
+
+    def own_text(self, el: Node) -> str:
+        return el.own_text()
+
+    def texts(self) -> List[str]:
+        """Text nodes outside script and style, in document order."""
+        if self._texts is None:
+            self._texts = [
+                c for node in self.root.iter() if node.tag not in ("script", "style")
+                for c in node.children if isinstance(c, str)
+            ]
+        return self._texts
+
+
+class LxmlPage:
+    """Page parsed by lxml; selectors run as compiled XPath."""
+
+    backend = "lxml"
+    # Compiled XPath objects are not shared between threads
+    _local = threading.local()
+
+    def __init__(self, html: str):
+        root = lxml_etree.HTML(html.encode("utf-8"), lxml_etree.HTMLParser(encoding="utf-8"))
+        self.tree = root.getroottree() if root is not None else None
+
+    def prefetch(self, selectors: Iterable[str]) -> None:
+        pass
+
+    def select(self, selector: str, within=None, limit: Optional[int] = None) -> List:
+        context = self.tree if within is None else within
+        if context is None:
+            return []
+        xpaths = self._local.__dict__.setdefault("xpaths", {})
+        xpath = xpaths.get(selector)
+        if xpath is None:
+            xpath = xpaths[selector] = lxml_etree.XPath(css_to_xpath(selector))
+        found = xpath(context)
+        return found[:limit] if limit else found
+
+    def select_one(self, selector: str, within=None):
+        found = self.select(selector, within, limit=1)
+        return found[0] if found else None
+
+    def attr(self, el, name: str) -> Optional[str]:
+        return el.get(name)
+
+    def inner_text(self, el) -> str:
+        parts: List[str] = []
+        _collect_lxml_text(el, parts)
+        return _join_lines(parts)
+
+    def own_text(self, el) -> str:
+        return (el.text or "") + "".join(c.tail or "" for c in el)
+
+    def texts(self) -> List[str]:
+        if self.tree is None:
+            return []
+        return self.tree.xpath("//text()[not(parent::script or parent::style)]")
+
+
+def parse_page(html: str, backend: Optional[str] = None):
+    """``LxmlPage`` when lxml is installed, else ``TreePage``; ``backend`` ("lxml"/"html.parser") forces one."""
+    if backend == "lxml" or (backend is None and lxml_etree is not None):
+        return LxmlPage(html)
+    return TreePage(html)
@@ -0,0 +1,154 @@
+import gzip
+import http.client
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+# Errors that mean a pooled keep-alive connection was closed by the server while idle
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class HttpResponse:
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        charset = "utf-8"
+        ctype = self.headers.get("content-type", "")
+        if "charset=" in ctype:
+            charset = ctype.split("charset=", 1)[1].split(";", 1)[0].strip() or charset
+        return self.body.decode(charset, errors="replace")
+
+
+class HttpClient:
+    """Thread-safe HTTP/1.1 client that keeps connections alive per host.
+
+    At most ``max_per_host`` requests run against one host at a time; further
+    callers block until a connection is handed back.
+    """
+
+    def __init__(self, max_per_host: int = 64, timeout: float = 20, headers: Optional[Dict[str, str]] = None):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._limits: Dict[Tuple[str, str], threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, max_redirects: int = 5) -> HttpResponse:
+        for _ in range(max_redirects + 1):
+            resp = self._request(url, headers)
+            location = resp.headers.get("location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return resp
+        raise http.client.HTTPException(f"Too many redirects for {url}")
+
+    def _request(self, url: str, headers: Optional[Dict[str, str]]) -> HttpResponse:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        req_headers = dict(self.headers)
+        if headers:
+            req_headers.update(headers)
+        limit = self._limit_for(key)
+        with limit:
+            conn, reused = self._checkout(key)
+            try:
+                try:
+                    conn.request("GET", path, headers=req_headers)
+                    raw = conn.getresponse()
+                except _STALE_ERRORS:
+                    if not reused:
+                        raise
+                    conn.close()
+                    conn = self._new_connection(key)
+                    conn.request("GET", path, headers=req_headers)
+                    raw = conn.getresponse()
+                body = raw.read()
+            except Exception:
+                conn.close()
+                raise
+            if raw.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+        resp_headers = {k.lower(): v for k, v in raw.getheaders()}
+        return HttpResponse(url, raw.status, resp_headers, _decode_body(body, resp_headers))
+
+    def _limit_for(self, key) -> threading.BoundedSemaphore:
+        with self._lock:
+            limit = self._limits.get(key)
+            if limit is None:
+                limit = self._limits[key] = threading.BoundedSemaphore(self.max_per_host)
+            return limit
+
+    def _checkout(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(key), False
+
+    def _checkin(self, key, conn) -> None:
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def _new_connection(self, key) -> http.client.HTTPConnection:
+        scheme, netloc = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.connections_opened += 1
+        return cls(netloc, timeout=self.timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _decode_body(body: bytes, headers: Dict[str, str]) -> bytes:
+    encoding = headers.get("content-encoding", "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
@@ -0,0 +1,175 @@
+import re
+from typing import Dict, List, Optional, Sequence, Union
+from html_dom import parse_page
+from http_client import HttpClient
+from page_extract import HOTEL_FIELD_SPEC
+from scraping_utils import TIME_VALUE_XPATH
+from scrape_worker import image_mode, scrape_hotel
+from metrics import span
+
+# Fields that must come back non-empty from the HTML, otherwise the page goes to the browser
+REQUIRED_FIELDS = ("hotel_name", "address")
+
+
+# ---------- Field spec evaluation on parsed HTML ----------
+
+# TIME_VALUE_XPATH's contains(@class, ...) tests are substring tests, i.e. [class*=...]
+_TIME_BLOCK_SELECTOR = "div[class*='b0400e5749']"
+_TIME_LABEL_SELECTOR = "div[class*='e7addce19e']"
+_TIME_HOLDER_SELECTOR = "div[class*='c92998be48']"
+_TIME_VALUE_SELECTOR = "div[class*='b99b6ef58f']"
+
+
+def _time_for(page, label_text: str) -> Optional[str]:
+    """Same lookup as TIME_VALUE_XPATH, as selectors on the parsed page."""
+    for block in page.select(_TIME_BLOCK_SELECTOR):
+        has_label = any(
+            " ".join(page.own_text(n).split()) == label_text
+            for n in page.select(_TIME_LABEL_SELECTOR, within=block)
+        )
+        if not has_label:
+            continue
+        for holder in page.select(_TIME_HOLDER_SELECTOR, within=block):
+            val = page.select_one(_TIME_VALUE_SELECTOR, within=holder)
+            if val is not None:
+                return page.inner_text(val) or None
+    return None
+
+
+# XPath probes in the spec that have a selector equivalent here
+_XPATH_EQUIVALENTS = {
+    TIME_VALUE_XPATH.format(label=label): (lambda page, label=label: _time_for(page, label))
+    for label in ("Check-in", "Check-out")
+}
+
+
+def _hotel_images(page) -> List[str]:
+    out: Dict[str, None] = {}
+    for img in page.select("img"):
+        s = page.attr(img, "src") or page.attr(img, "data-src")
+        if s and "bstatic.com" in s:
+            out.setdefault(s)
+    for source in page.select("picture source"):
+        for chunk in (page.attr(source, "srcset") or "").split(","):
+            u = chunk.strip().split(" ")[0]
+            if u and "bstatic.com" in u:
+                out.setdefault(u)
+    return [u for u in out if "/images/hotel/" in u]
+
+
+def _srcs(page, selectors: Sequence[str], limit: int) -> List[str]:
+    urls: List[str] = []
+    seen = set()
+    for sel in selectors:
+        for e in page.select(sel):
+            src = page.attr(e, "src") or page.attr(e, "data-src")
+            if src and src not in seen and "bstatic.com" in src:
+                seen.add(src)
+                urls.append(src)
+                if len(urls) >= limit:
+                    return urls
+    return urls
+
+
+def spec_selectors(spec: List[Dict]) -> List[str]:
+    """Every selector the probes of ``spec`` look up at page level."""
+    selectors: List[str] = []
+    for field in spec:
+        for probe in field["probes"]:
+            if probe.get("hotel_images"):
+                selectors += ["img", "picture source"]
+            elif "srcs" in probe:
+                selectors += probe["srcs"]
+            elif "xpath" in probe:
+                selectors.append(_TIME_BLOCK_SELECTOR)
+            elif "css" in probe:
+                selectors.append(probe["css"])
+    return selectors
+
+
+def _run_probe(page, probe: Dict):
+    if probe.get("hotel_images"):
+        return _hotel_images(page) or None
+    if "srcs" in probe:
+        return _srcs(page, probe["srcs"], probe["limit"]) or None
+    if "text_scan" in probe:
+        pattern = re.compile(probe["text_scan"], re.IGNORECASE)
+        for text in page.texts():
+            m = pattern.search(text)
+            if m:
+                return m.group(1)
+        return None
+    if "xpath" in probe:
+        fn = _XPATH_EQUIVALENTS.get(probe["xpath"])
+        return fn(page) if fn else None
+    el = page.select_one(probe["css"])
+    if el is None:
+        return None
+    if "attr" in probe:
+        return page.attr(el, probe["attr"]) or None
+    txt = page.inner_text(el)
+    if "regex" in probe:
+        m = re.search(probe["regex"], txt, re.IGNORECASE)
+        return m.group(1) if m else None
+    return txt or None
+
+
+def extract_fields_html(html: str, spec: Optional[List[Dict]] = None, backend: Optional[str] = None) -> Dict:
+    """Evaluate a page_extract field spec against raw HTML instead of a live page.
+
+    Uses lxml when it is installed. Without it the page is parsed by
+    html.parser and every selector of the spec is matched in one tree walk.
+    """
+    spec = HOTEL_FIELD_SPEC if spec is None else spec
+    page = parse_page(html, backend)
+    page.prefetch(spec_selectors(spec))
+    values: Dict = {}
+    for field in spec:
+        value = None
+        for probe in field["probes"]:
+            value = _run_probe(page, probe)
+            if value is not None:
+                break
+        if value is not None and field.get("first_line"):
+            value = value.split("\n", 1)[0].strip()
+        values[field["name"]] = value if value is not None else ([] if field.get("list") else None)
+    return values
+
+
+# ---------- Browser-free hotel scraping ----------
+
+def scrape_hotel_http(
+    href: str,
+    client: HttpClient,
+    images: Union[bool, str] = "fast",
+    pool=None,
+    required: Sequence[str] = REQUIRED_FIELDS,
+) -> Dict:
+    """Scrape a hotel page over plain HTTP, falling back to Selenium when required fields are missing.
+
+    Only on-page images are available without a browser, so the gallery image
+    modes always go to the Selenium worker.
+    """
+    if image_mode(images) == "fast":
+        fields = None
+        try:
+            with span("http_fetch"):
+                resp = client.get(href)
+            if resp.status == 200:
+                with span("html_parse"):
+                    fields = extract_fields_html(resp.text)
+        except Exception as e:
+            print(f"HTTP fetch failed for {href}: {e}")
+        if fields is not None and all(fields.get(name) for name in required):
+            return {
+                "url": href,
+                "hotel_name": fields["hotel_name"],
+                "address": fields["address"],
+                "image_urls": fields["image_urls"],
+                "description": fields["description"],
+                "review_score": fields["review_score"],
+                "total_reviews": fields["total_reviews"],
+                "check_in": fields["check_in"],
+                "check_out": fields["check_out"],
+            }
+    return scrape_hotel(href, images, pool)
@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from http_client import HttpClient
+from metrics import span
+
+# .../images/hotel/<size>/<photo id>.jpg?k=...
+_PHOTO_RE = re.compile(r"/images/hotel/([a-z0-9]+)/(\d+)\.([a-z]+)", re.I)
+
+_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif", "image/avif": ".avif"}
+
+IMAGE_HEADERS = {"Accept": "image/avif,image/webp,image/*,*/*;q=0.8"}
+
+
+# ---------- Variant selection ----------
+
+def parse_photo(url: str) -> Tuple[Optional[str], int]:
+    """``(photo id, pixel area)`` of a bstatic hotel image URL; ``(None, 0)`` if it is not one."""
+    m = _PHOTO_RE.search(urlsplit(url).path)
+    if not m:
+        return None, 0
+    dims = [int(d) for d in re.findall(r"\d+", m.group(1))]
+    if not dims:
+        area = 0
+    elif len(dims) == 1:
+        area = dims[0] * dims[0]  # max300 / square60: bounded on both sides
+    else:
+        area = dims[0] * dims[1]
+    return m.group(2), area
+
+
+def largest_variants(urls: List[str]) -> List[str]:
+    """One URL per photo id, the largest size; URLs without a photo id are kept once each, in order."""
+    best: Dict[str, Tuple[int, str]] = {}
+    order: List[str] = []
+    for url in urls:
+        pid, area = parse_photo(url)
+        key = pid or url
+        if key not in best:
+            order.append(key)
+            best[key] = (area, url)
+        elif area > best[key][0]:
+            best[key] = (area, url)
+    return [best[key][1] for key in order]
+
+
+# ---------- Content-addressed store ----------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    photo_key TEXT PRIMARY KEY,
+    area INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    path TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class ImageStore:
+    """Image files stored under ``root/objects/<sha256[:2]>/<sha256><ext>``.
+
+    ``index.sqlite`` maps each photo (its Booking photo id, or the URL without
+    query for other images) to the stored file, so a photo seen again in another
+    hotel or run is not fetched again unless a larger variant turns up.
+    """
+
+    def __init__(self, root: str = "images"):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def photo_key(url: str) -> str:
+        pid, _ = parse_photo(url)
+        if pid:
+            return pid
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Stored entry for the photo behind ``url`` if it is at least as large as this variant."""
+        _, area = parse_photo(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT area, sha256, path, bytes FROM photos WHERE photo_key = ?", (self.photo_key(url),)
+            ).fetchone()
+        if row is None or row[0] < area or not os.path.exists(os.path.join(self.root, row[2])):
+            return None
+        return {"sha256": row[1], "path": row[2], "bytes": row[3]}
+
+    def save(self, url: str, body: bytes, content_type: str = "") -> Dict:
+        digest = hashlib.sha256(body).hexdigest()
+        ext = _EXTENSIONS.get(content_type.split(";", 1)[0].strip().lower())
+        if ext is None:
+            ext = os.path.splitext(urlsplit(url).path)[1].lower() or ".bin"
+        rel = os.path.join("objects", digest[:2], digest + ext)
+        path = os.path.join(self.root, rel)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        _, area = parse_photo(url)
+        key = self.photo_key(url)
+        with self._lock:
+            row = self._conn.execute("SELECT area, path FROM photos WHERE photo_key = ?", (key,)).fetchone()
+            # A smaller variant finishing after a larger one must not replace it in the index
+            if row is None or row[0] <= area or not os.path.exists(os.path.join(self.root, row[1])):
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO photos (photo_key, area, url, sha256, path, bytes, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, area, url, digest, rel, len(body), time.time()),
+                )
+                self._conn.commit()
+        return {"sha256": digest, "path": rel, "bytes": len(body)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ---------- Downloader ----------
+
+class ImageDownloader:
+    """Downloads the largest variant of each photo into an ``ImageStore``.
+
+    Requests go through one keep-alive ``HttpClient`` on a thread pool of
+    ``concurrency`` threads, which bounds parallel downloads across all hotels;
+    ``fetch`` is the asyncio entry point, ``download`` the blocking one for worker
+    threads. A photo already stored, or being fetched for another hotel in the
+    same or a larger size, is not requested twice.
+    """
+
+    def __init__(self, store: ImageStore, concurrency: int = 16, client: Optional[HttpClient] = None):
+        self.store = store
+        self.concurrency = concurrency
+        self._own_client = client is None
+        self.client = client or HttpClient(max_per_host=concurrency, headers=IMAGE_HEADERS)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="image-download")
+        # photo key -> [(pixel area, future)] of the variants being fetched
+        self._inflight: Dict[str, List[Tuple[int, Future]]] = {}
+        self._lock = threading.Lock()
+        self.downloaded = 0
+        self.reused = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def _fetch_one(self, url: str) -> Dict:
+        stored = self.store.lookup(url)
+        if stored is not None:
+            with self._lock:
+                self.reused += 1
+            return stored
+        resp = self.client.get(url, headers=IMAGE_HEADERS)
+        if resp.status != 200:
+            raise IOError(f"HTTP {resp.status} for {url}")
+        entry = self.store.save(url, resp.body, resp.headers.get("content-type", ""))
+        with self._lock:
+            self.downloaded += 1
+            self.bytes += len(resp.body)
+        return entry
+
+    def _submit(self, url: str) -> Future:
+        key = ImageStore.photo_key(url)
+        _, area = parse_photo(url)
+        with self._lock:
+            pending = self._inflight.setdefault(key, [])
+            for pending_area, future in pending:
+                if pending_area >= area:
+                    return future
+            future = self._executor.submit(self._fetch_one, url)
+            pending.append((area, future))
+        future.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return future
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            pending = [p for p in self._inflight.get(key, ()) if p[1] is not future]
+            if pending:
+                self._inflight[key] = pending
+            else:
+                self._inflight.pop(key, None)
+
+    def _entries(self, selected: List[str], results: List) -> List[Dict]:
+        images = []
+        for url, result in zip(selected, results):
+            pid, _ = parse_photo(url)
+            if isinstance(result, Exception):
+                with self._lock:
+                    self.failed += 1
+                images.append({"photo_id": pid, "url": url, "error": str(result)})
+            else:
+                images.append({"photo_id": pid, "url": url, **result})
+        return images
+
+    async def fetch(self, urls: List[str]) -> List[Dict]:
+        selected = largest_variants(urls)
+        futures = [asyncio.wrap_future(self._submit(url)) for url in selected]
+        return self._entries(selected, await asyncio.gather(*futures, return_exceptions=True))
+
+    def download(self, urls: List[str]) -> List[Dict]:
+        with span("image_download"):
+            selected = largest_variants(urls)
+            futures = [self._submit(url) for url in selected]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+            return self._entries(selected, results)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "downloaded": self.downloaded,
+                "reused": self.reused,
+                "failed": self.failed,
+                "bytes": self.bytes,
+            }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._own_client:
+            self.client.close()
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
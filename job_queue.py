@@ -0,0 +1,453 @@
+import hmac
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from hotel_urls import canonical_url
+
+STATES = ("queued", "leased", "done", "failed")
+
+
+class Job:
+    def __init__(
+        self,
+        id: int,
+        url: str,
+        payload: Optional[Dict] = None,
+        attempts: int = 0,
+        worker: Optional[str] = None,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None,
+    ):
+        self.id = id
+        self.url = url
+        self.payload = payload or {}
+        self.attempts = attempts
+        self.worker = worker
+        self.result = result
+        self.error = error
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, d: Optional[Dict]) -> Optional["Job"]:
+        return cls(**d) if d else None
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ---------- Backend interface ----------
+
+class JobQueue(ABC):
+    """Durable queue of hotel URLs shared by a coordinator and any number of worker processes.
+
+    A worker ``claim``s a job for ``lease_s`` seconds and must ``heartbeat`` before
+    the lease runs out. Jobs whose lease expired (the worker crashed or hung) are
+    handed out again, until ``max_attempts`` claims have been made.
+    Backends implement every abstract method below.
+    """
+
+    @abstractmethod
+    def put(self, url: str, payload: Optional[Dict] = None) -> bool:
+        """Queue ``url``; returns False if a job for the same canonical URL already exists."""
+
+    @abstractmethod
+    def claim(self, worker: str, lease_s: float = 120) -> Optional[Job]:
+        """Lease the oldest queued job to ``worker`` for ``lease_s`` seconds; None if nothing is queued."""
+
+    @abstractmethod
+    def heartbeat(self, job_id: int, worker: str, lease_s: float = 120) -> bool:
+        """Extend the lease; False means the job is no longer held by ``worker``."""
+
+    @abstractmethod
+    def complete(self, job_id: int, worker: str, result: Dict) -> bool:
+        """Store ``result``; False if the job is no longer held by ``worker``."""
+
+    @abstractmethod
+    def fail(self, job_id: int, worker: str, error: str, retry: bool = True) -> bool:
+        """Give a job back: re-queued while attempts remain and ``retry`` is set, otherwise failed."""
+
+    @abstractmethod
+    def requeue_expired(self) -> int:
+        """Queue again (or fail, once out of attempts) jobs whose lease ran out; returns how many."""
+
+    @abstractmethod
+    def take_results(self, limit: int = 100) -> List[Job]:
+        """Finished jobs (done or failed) not yet returned by an earlier call."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each of STATES."""
+
+    @abstractmethod
+    def seal(self, sealed: bool = True) -> None:
+        """Mark that no more jobs will be added, so idle workers may exit once the queue drains."""
+
+    @abstractmethod
+    def is_sealed(self) -> bool:
+        """Whether ``seal`` was called."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------- SQLite backend ----------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    payload TEXT,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    collected INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (collected, state);
+CREATE TABLE IF NOT EXISTS queue_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SqliteJobQueue(JobQueue):
+    """SQLite job queue for processes on one machine (WAL mode, immediate transactions for claims).
+
+    Do not put the file on a network share; workers on other machines reach it
+    through ``JobQueueServer`` and ``HttpJobQueue``.
+    """
+
+    def __init__(self, path: str = "jobs.sqlite", max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript(_SCHEMA)
+
+    def _tx(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two processes never claim the same row
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def put(self, url: str, payload: Optional[Dict] = None) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_key, url, payload, updated_at) VALUES (?, ?, ?, ?)",
+                (canonical_url(url), url, json.dumps(payload or {}, ensure_ascii=False), time.time()),
+            )
+            return cur.rowcount == 1
+
+    def put_many(self, items: Iterable) -> int:
+        """Queue ``(url, payload)`` pairs in one transaction; returns how many were new."""
+        added = 0
+        with self._lock:
+            self._tx()
+            try:
+                for url, payload in items:
+                    cur = self._conn.execute(
+                        "INSERT OR IGNORE INTO jobs (job_key, url, payload, updated_at) VALUES (?, ?, ?, ?)",
+                        (canonical_url(url), url, json.dumps(payload or {}, ensure_ascii=False), time.time()),
+                    )
+                    added += cur.rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def _requeue_expired(self, now: float) -> int:
+        failed = self._conn.execute(
+            "UPDATE jobs SET state = 'failed', worker = NULL, lease_until = NULL, error = 'lease expired', updated_at = ? "
+            "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+            (now, now, self.max_attempts),
+        ).rowcount
+        requeued = self._conn.execute(
+            "UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE state = 'leased' AND lease_until < ?",
+            (now, now),
+        ).rowcount
+        return failed + requeued
+
+    def requeue_expired(self) -> int:
+        with self._lock:
+            self._tx()
+            try:
+                n = self._requeue_expired(time.time())
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return n
+
+    def claim(self, worker: str, lease_s: float = 120) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            self._tx()
+            try:
+                self._requeue_expired(now)
+                row = self._conn.execute(
+                    "SELECT id, url, payload, attempts FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                        "updated_at = ? WHERE id = ?",
+                        (worker, now + lease_s, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return Job(row[0], row[1], json.loads(row[2] or "{}"), row[3] + 1, worker)
+
+    def heartbeat(self, job_id: int, worker: str, lease_s: float = 120) -> bool:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (now + lease_s, now, job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: Dict) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (json.dumps(result, ensure_ascii=False), time.time(), job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str, retry: bool = True) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET state = CASE WHEN ? AND attempts < ? THEN 'queued' ELSE 'failed' END, "
+                "worker = NULL, lease_until = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                (int(retry), self.max_attempts, error, time.time(), job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def take_results(self, limit: int = 100) -> List[Job]:
+        with self._lock:
+            self._tx()
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, url, payload, attempts, result, error FROM jobs "
+                    "WHERE collected = 0 AND state IN ('done', 'failed') ORDER BY updated_at LIMIT ?",
+                    (limit,),
+                ).fetchall()
+                self._conn.executemany("UPDATE jobs SET collected = 1 WHERE id = ?", [(r[0],) for r in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            Job(r[0], r[1], json.loads(r[2] or "{}"), r[3], result=json.loads(r[4]) if r[4] else None, error=r[5])
+            for r in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        out = {state: 0 for state in STATES}
+        out.update(dict(rows))
+        return out
+
+    def reset(self) -> None:
+        """Drop every job, e.g. before a fresh (non-resumed) run."""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs")
+            self._conn.execute("DELETE FROM queue_meta")
+
+    def seal(self, sealed: bool = True) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queue_meta (name, value) VALUES ('sealed', ?)", ("1" if sealed else "0",)
+            )
+
+    def is_sealed(self) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM queue_meta WHERE name = 'sealed'").fetchone()
+        return bool(row and row[0] == "1")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ---------- Remote access over HTTP ----------
+
+_REMOTE_METHODS = (
+    "put", "claim", "heartbeat", "complete", "fail", "requeue_expired", "take_results", "counts", "seal", "is_sealed",
+)
+
+
+def _encode(value):
+    if isinstance(value, Job):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    return value
+
+
+TOKEN_ENV = "JOB_QUEUE_TOKEN"
+
+
+class JobQueueServer:
+    """Serves a local queue to workers on other machines: ``POST /<method>`` with JSON keyword arguments.
+
+    Every request must carry ``Authorization: Bearer <token>``. The server listens
+    on localhost unless ``host`` says otherwise; the token only keeps out clients
+    that do not know it, so use a trusted network or a TLS tunnel between machines.
+    """
+
+    def __init__(self, queue: JobQueue, host: str = "127.0.0.1", port: int = 8740, token: Optional[str] = None):
+        token = token or os.environ.get(TOKEN_ENV)
+        if not token:
+            raise ValueError(f"JobQueueServer needs a shared token (argument or {TOKEN_ENV})")
+        self.queue = queue
+        self.token = token
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        queue = self.queue
+        expected = f"Bearer {self.token}".encode("utf-8")
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                auth = (self.headers.get("Authorization") or "").encode("utf-8")
+                if not hmac.compare_digest(auth, expected):
+                    self._send(401, {"error": "missing or wrong token"})
+                    return
+                method = self.path.strip("/")
+                if method not in _REMOTE_METHODS:
+                    self._send(404, {"error": f"unknown method {method}"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    kwargs = json.loads(self.rfile.read(length) or b"{}")
+                    self._send(200, {"value": _encode(getattr(queue, method)(**kwargs))})
+                except Exception as e:
+                    self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+            def _send(self, status: int, body: Dict):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self) -> "JobQueueServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="job-queue-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        # shutdown() waits for serve_forever, so only call it once that is running
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+        self._httpd.server_close()
+
+
+class HttpJobQueue(JobQueue):
+    """Client for a queue served by ``JobQueueServer``; ``token`` defaults to $JOB_QUEUE_TOKEN."""
+
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.token = token or os.environ.get(TOKEN_ENV)
+        if not self.token:
+            raise ValueError(f"HttpJobQueue needs the coordinator's token (argument or {TOKEN_ENV})")
+        self.timeout = timeout
+
+    def _call(self, method: str, **kwargs):
+        req = urllib.request.Request(
+            f"{self.base_url}/{method}",
+            data=json.dumps(kwargs, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.token}"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())["value"]
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"job queue {method} failed: {json.loads(e.read()).get('error')}") from None
+
+    def put(self, url, payload=None):
+        return self._call("put", url=url, payload=payload)
+
+    def claim(self, worker, lease_s=120):
+        return Job.from_dict(self._call("claim", worker=worker, lease_s=lease_s))
+
+    def heartbeat(self, job_id, worker, lease_s=120):
+        return self._call("heartbeat", job_id=job_id, worker=worker, lease_s=lease_s)
+
+    def complete(self, job_id, worker, result):
+        return self._call("complete", job_id=job_id, worker=worker, result=result)
+
+    def fail(self, job_id, worker, error, retry=True):
+        return self._call("fail", job_id=job_id, worker=worker, error=error, retry=retry)
+
+    def requeue_expired(self):
+        return self._call("requeue_expired")
+
+    def take_results(self, limit=100):
+        return [Job.from_dict(d) for d in self._call("take_results", limit=limit)]
+
+    def counts(self):
+        return self._call("counts")
+
+    def seal(self, sealed=True):
+        self._call("seal", sealed=sealed)
+
+    def is_sealed(self):
+        return self._call("is_sealed")
+
+
+def open_queue(spec: str, max_attempts: int = 3, token: Optional[str] = None) -> JobQueue:
+    """``http://host:port`` for a served queue (needs its ``token``), otherwise the path of a SQLite queue file."""
+    if spec.startswith(("http://", "https://")):
+        return HttpJobQueue(spec, token)
+    if spec.startswith("sqlite:///"):
+        spec = spec[len("sqlite:///"):]
+    return SqliteJobQueue(spec, max_attempts=max_attempts)
@@ -0,0 +1,165 @@
+import cProfile
+import json
+import math
+import pstats
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from selector_stats import selector_stats
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (pct in 0..100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Recorder:
+    """Collects per-hotel, per-phase durations and which fallback selector matched each field.
+
+    Spans opened inside ``hotel(url)`` are attributed to that hotel; the current
+    hotel is tracked per thread so concurrent workers do not mix up their spans.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._durations: Dict[str, List[float]] = defaultdict(list)
+        self._hotels: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._selectors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._profiles: List[cProfile.Profile] = []
+        self._profiling = False
+        self.started = time.monotonic()
+
+    # ----- spans -----
+
+    def current_hotel(self) -> Optional[str]:
+        return getattr(self._local, "hotel", None)
+
+    def record(self, phase: str, seconds: float, hotel: Optional[str] = None) -> None:
+        hotel = hotel or self.current_hotel()
+        with self._lock:
+            self._durations[phase].append(seconds)
+            if hotel:
+                self._hotels[hotel][phase] += seconds
+
+    @contextmanager
+    def span(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    @contextmanager
+    def hotel(self, url: str):
+        previous = self.current_hotel()
+        self._local.hotel = url
+        # Threads that are already being profiled (the one that called enable_profiling) stay enabled
+        profile = None if getattr(self._local, "profiling", False) else self._thread_profile()
+        if profile is not None:
+            self._local.profiling = True
+            profile.enable()
+        try:
+            with self.span("hotel_total"):
+                yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._local.profiling = False
+            self._local.hotel = previous
+
+    @contextmanager
+    def attributed_to(self, url: Optional[str]):
+        """Attribute spans on this thread to ``url`` without opening a ``hotel_total`` span (helper threads)."""
+        previous = self.current_hotel()
+        self._local.hotel = url
+        try:
+            yield
+        finally:
+            self._local.hotel = previous
+
+    def selector_hit(self, field: str, selector: Optional[str]) -> None:
+        with self._lock:
+            self._selectors[field][selector or "<none>"] += 1
+
+    # ----- profiling -----
+
+    def enable_profiling(self) -> None:
+        """Profile the calling thread now and every worker thread while it scrapes a hotel."""
+        self._profiling = True
+        self._local.profiling = True
+        self._thread_profile().enable()
+
+    def _thread_profile(self) -> Optional[cProfile.Profile]:
+        # cProfile only sees the thread that enabled it, so each thread gets its own profile
+        if not self._profiling:
+            return None
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+
+    def dump_profile(self, path: str) -> None:
+        own = getattr(self._local, "profile", None)
+        if own is not None:
+            own.disable()
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+
+    # ----- report -----
+
+    def report(self) -> Dict:
+        with self._lock:
+            durations = {phase: list(values) for phase, values in self._durations.items()}
+            hotels = {url: dict(phases) for url, phases in self._hotels.items()}
+            selectors = {field: dict(hits) for field, hits in self._selectors.items()}
+        phases = {}
+        for phase, values in sorted(durations.items()):
+            phases[phase] = {
+                "count": len(values),
+                "total_s": round(sum(values), 4),
+                "p50_s": round(percentile(values, 50), 4),
+                "p95_s": round(percentile(values, 95), 4),
+                "p99_s": round(percentile(values, 99), 4),
+                "max_s": round(max(values), 4),
+            }
+        return {
+            "run_elapsed_s": round(time.monotonic() - self.started, 3),
+            "phases": phases,
+            "selectors": selectors,
+            "hotels": {url: {p: round(s, 4) for p, s in ph.items()} for url, ph in hotels.items()},
+        }
+
+    def write(self, path: str, extra: Optional[Dict] = None) -> Dict:
+        report = self.report()
+        if extra:
+            report.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+
+# Process-wide recorder used by main.py, scrape_worker and the scraping helpers
+recorder = Recorder()
+span = recorder.span
+record = recorder.record
+
+
+def selector_hit(field: str, selector: Optional[str]) -> None:
+    """Count the match for this run's report and feed the persisted hit-rate store."""
+    recorder.selector_hit(field, selector)
+    selector_stats.hit(field, selector)
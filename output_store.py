@@ -0,0 +1,401 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Set
+from hotel_urls import canonical_url, hotel_id
+
+
+def result_key(url: str) -> str:
+    # Hotel URLs carry per-session tracking parameters; compare the canonical form
+    return canonical_url(url)
+
+
+# ---------- JSONL output ----------
+
+class JsonlWriter:
+    """Append-only JSONL writer; one finished hotel per line, fsynced every ``fsync_every`` records."""
+
+    def __init__(self, path: str, fsync_every: int = 10, append: bool = True):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.written = 0
+        needs_newline = False
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                # A crash mid-write leaves a partial last line; start the next record on a fresh one
+                needs_newline = f.read(1) != b"\n"
+        self._f = open(path, "a" if append else "w", encoding="utf-8")
+        if needs_newline:
+            self._f.write("\n")
+
+    def write(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._f.write(line + "\n")
+            self.written += 1
+            self._pending += 1
+            if self._pending >= self.fsync_every:
+                self._sync()
+
+    def _sync(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f.closed:
+                return
+            self._sync()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Truncated record from an interrupted run
+                continue
+
+
+def load_done_keys(path: str) -> Set[str]:
+    return {result_key(rec["url"]) for rec in iter_jsonl(path) if rec.get("url")}
+
+
+def export_json(jsonl_path: str, json_path: str) -> int:
+    """Write the records of ``jsonl_path`` as the pretty ``output.json`` array, streaming one record at a time."""
+    count = 0
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write("[")
+        for rec in iter_jsonl(jsonl_path):
+            body = json.dumps(rec, ensure_ascii=False, indent=2)
+            out.write(("," if count else "") + "\n  " + body.replace("\n", "\n  "))
+            count += 1
+        out.write("\n]" if count else "]")
+    os.replace(tmp_path, json_path)
+    return count
+
+
+# ---------- Indexed and columnar stores ----------
+
+# Record fields stored as their own column; everything else (search card, images, ...) goes to "extra"
+COLUMNS = ("url", "hotel_name", "address", "description", "review_score", "total_reviews", "check_in", "check_out")
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(str(value).replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(str(value).replace(",", "").replace(".", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _row(record: Dict, city: Optional[str]) -> Dict:
+    row = {name: record.get(name) for name in COLUMNS}
+    row["review_score"] = _to_float(row["review_score"])
+    row["total_reviews"] = _to_int(row["total_reviews"])
+    # Only a real Booking hotel id (from the search card or a hotel_id URL parameter); null otherwise
+    card = record.get("search_card") or {}
+    row["hotel_id"] = card.get("hotel_id") or (hotel_id(record["url"]) if record.get("url") else None)
+    row["city"] = city
+    row["search_id"] = record.get("search_id")
+    row["image_urls"] = list(record.get("image_urls") or [])
+    extra = {k: v for k, v in record.items() if k not in row}
+    row["extra"] = json.dumps(extra, ensure_ascii=False) if extra else None
+    return row
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hotels (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    hotel_id TEXT,
+    city TEXT,
+    search_id TEXT,
+    hotel_name TEXT,
+    address TEXT,
+    description TEXT,
+    review_score REAL,
+    total_reviews INTEGER,
+    check_in TEXT,
+    check_out TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hotels_hotel_id ON hotels (hotel_id);
+CREATE INDEX IF NOT EXISTS hotels_city ON hotels (city);
+CREATE INDEX IF NOT EXISTS hotels_review_score ON hotels (review_score);
+"""
+
+# External-content FTS5 index over the description, kept in sync by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS hotels_fts USING fts5(
+    hotel_name, description, content='hotels', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS hotels_fts_insert AFTER INSERT ON hotels BEGIN
+    INSERT INTO hotels_fts (rowid, hotel_name, description) VALUES (new.rowid, new.hotel_name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS hotels_fts_delete AFTER DELETE ON hotels BEGIN
+    INSERT INTO hotels_fts (hotels_fts, rowid, hotel_name, description)
+    VALUES ('delete', old.rowid, old.hotel_name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS hotels_fts_update AFTER UPDATE ON hotels BEGIN
+    INSERT INTO hotels_fts (hotels_fts, rowid, hotel_name, description)
+    VALUES ('delete', old.rowid, old.hotel_name, old.description);
+    INSERT INTO hotels_fts (rowid, hotel_name, description) VALUES (new.rowid, new.hotel_name, new.description);
+END;
+"""
+
+
+class SqliteStore:
+    """Hotel records in SQLite, indexed by hotel id, city and review score, with full-text search.
+
+    Records are buffered and inserted ``batch_size`` at a time in one
+    transaction. A hotel written again for the same search replaces its row,
+    so resumed runs do not duplicate it.
+    """
+
+    def __init__(self, path: str, city: Optional[str] = None, batch_size: int = 200, append: bool = True):
+        self.path = path
+        self.city = city
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self.written = 0
+        if not append:
+            # A stale -wal/-shm pair next to a fresh file would be replayed against it
+            for stale in (path, path + "-wal", path + "-shm"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # INSERT OR REPLACE only fires the delete trigger that keeps the FTS index in sync with this on
+        self._conn.execute("PRAGMA recursive_triggers = ON")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            print("SQLite was built without FTS5; description search is disabled")
+            self.fts = False
+
+    def write(self, record: Dict, city: Optional[str] = None) -> None:
+        row = _row(record, city or self.city)
+        key = result_key(record["url"]) if record.get("url") else None
+        if row["search_id"]:
+            key = f"{row['search_id']}|{key}"
+        values = (
+            key, row["url"], row["hotel_id"], row["city"], row["search_id"], row["hotel_name"], row["address"],
+            row["description"], row["review_score"], row["total_reviews"], row["check_in"], row["check_out"],
+            json.dumps(record, ensure_ascii=False),
+        )
+        with self._lock:
+            self._pending.append(values)
+            self.written += 1
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hotels (key, url, hotel_id, city, search_id, hotel_name, address, "
+                "description, review_score, total_reviews, check_in, check_out, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending = []
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush()
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_sqlite(path: str, where: str = "", params: tuple = (), order_by: str = "rowid") -> Iterator[Dict]:
+    """Stream records from a ``SqliteStore`` file, e.g. ``iter_sqlite(p, "city = ? AND review_score >= ?", ("Paris", 8))``."""
+    conn = sqlite3.connect(path)
+    try:
+        sql = "SELECT record FROM hotels" + (f" WHERE {where}" if where else "") + f" ORDER BY {order_by}"
+        for (record,) in conn.execute(sql, params):
+            yield json.loads(record)
+    finally:
+        conn.close()
+
+
+def search_sqlite(path: str, query: str, limit: Optional[int] = None) -> Iterator[Dict]:
+    """Stream records whose name or description match the FTS5 ``query``, best match first."""
+    conn = sqlite3.connect(path)
+    try:
+        sql = (
+            "SELECT h.record FROM hotels_fts f JOIN hotels h ON h.rowid = f.rowid "
+            "WHERE hotels_fts MATCH ? ORDER BY f.rank"
+        )
+        args: tuple = (query,)
+        if limit:
+            sql += " LIMIT ?"
+            args += (limit,)
+        for (record,) in conn.execute(sql, args):
+            yield json.loads(record)
+    finally:
+        conn.close()
+
+
+def _arrow():
+    # pyarrow is only needed for Parquet output, so it is imported on first use
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+def _arrow_schema(pa):
+    return pa.schema([
+        ("url", pa.string()),
+        ("hotel_id", pa.string()),
+        ("city", pa.string()),
+        ("search_id", pa.string()),
+        ("hotel_name", pa.string()),
+        ("address", pa.string()),
+        ("description", pa.string()),
+        ("review_score", pa.float64()),
+        ("total_reviews", pa.int64()),
+        ("check_in", pa.string()),
+        ("check_out", pa.string()),
+        ("image_urls", pa.list_(pa.string())),
+        ("extra", pa.string()),
+    ])
+
+
+class ParquetWriter:
+    """Zstd-compressed Parquet file of hotel records, one row group per ``batch_size`` records.
+
+    Fields without a column of their own (search card, downloaded images, ...)
+    are kept as JSON in ``extra``. The file is written under a temporary name
+    and moved into place on ``close``; with ``append`` the rows of an existing
+    file are streamed into the new one first.
+    """
+
+    def __init__(self, path: str, city: Optional[str] = None, batch_size: int = 1000, append: bool = True):
+        self._pa, self._pq = _arrow()
+        self.path = path
+        self.city = city
+        self.batch_size = max(1, batch_size)
+        self.schema = _arrow_schema(self._pa)
+        self._lock = threading.Lock()
+        self._pending: List[Dict] = []
+        self.written = 0
+        self._tmp = path + ".tmp"
+        self._writer = self._pq.ParquetWriter(self._tmp, self.schema, compression="zstd")
+        if append and os.path.exists(path):
+            for batch in self._pq.ParquetFile(path).iter_batches(batch_size=self.batch_size):
+                self._writer.write_table(self._pa.Table.from_batches([batch]).cast(self.schema))
+
+    def write(self, record: Dict, city: Optional[str] = None) -> None:
+        with self._lock:
+            self._pending.append(_row(record, city or self.city))
+            self.written += 1
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._writer.write_table(self._pa.Table.from_pylist(self._pending, schema=self.schema))
+        self._pending = []
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is None:
+                return
+            self._flush()
+            self._writer.close()
+            self._writer = None
+            os.replace(self._tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_parquet(path: str, columns: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict]:
+    """Stream rows of a ``ParquetWriter`` file one batch at a time; ``columns`` limits what is read."""
+    _, pq = _arrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+        for row in batch.to_pylist():
+            extra = row.pop("extra", None)
+            if extra:
+                row.update(json.loads(extra))
+            yield row
+
+
+def open_stores(sqlite_path: Optional[str], parquet_path: Optional[str], append: bool, city: Optional[str] = None) -> List:
+    """The optional output stores configured by ``output_sqlite`` / ``output_parquet``."""
+    stores = []
+    if sqlite_path:
+        stores.append(SqliteStore(sqlite_path, city=city, append=append))
+    if parquet_path:
+        stores.append(ParquetWriter(parquet_path, city=city, append=append))
+    return stores
+
+
+def export_jsonl(jsonl_path: str, dst: str) -> int:
+    """Convert a JSONL output file to ``.json``, ``.sqlite``/``.db`` or ``.parquet`` by the extension of ``dst``."""
+    ext = os.path.splitext(dst)[1].lower()
+    if ext == ".json":
+        return export_json(jsonl_path, dst)
+    if ext in (".sqlite", ".db"):
+        store = SqliteStore(dst, append=False)
+    elif ext == ".parquet":
+        store = ParquetWriter(dst, append=False)
+    else:
+        raise ValueError(f"Unknown output format for {dst} (use .json, .sqlite, .db or .parquet)")
+    with store:
+        for rec in iter_jsonl(jsonl_path):
+            store.write(rec)
+    return store.written
+
+
+if __name__ == "__main__":
+    # python output_store.py [output.jsonl] [output.json | output.sqlite | output.parquet]
+    src = sys.argv[1] if len(sys.argv) > 1 else "output.jsonl"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "output.json"
+    print(f"Wrote {export_jsonl(src, dst)} hotels to {dst}")
@@ -0,0 +1,207 @@
+from typing import Dict, List, Optional, Tuple
+from selenium.webdriver.support.ui import WebDriverWait
+from metrics import selector_hit, span
+from selector_stats import selector_stats
+from scraping_utils import (
+    NAME_SELECTORS,
+    NAME_FALLBACK_SELECTOR,
+    DESCRIPTION_SELECTORS,
+    ADDRESS_SELECTORS,
+    ADDRESS_FALLBACK_SELECTOR,
+    SCORECARD_SELECTOR,
+    REVIEW_COMPONENT_SELECTOR,
+    IMAGE_FALLBACK_SELECTORS,
+    TIME_VALUE_XPATH,
+)
+
+# ---------- Declarative field spec ----------
+#
+# Each field lists probes tried in order; the first probe yielding a value wins.
+# Probe kinds:
+#   {"css": sel}                    -> trimmed innerText of the first match, if non-empty
+#   {"css": sel, "attr": name}      -> attribute of the first match, if non-empty
+#   {"css": sel, "regex": pattern}  -> group 1 of pattern searched in the match's innerText
+#   {"xpath": expr}                 -> trimmed innerText of the first XPath match
+#   {"text_scan": pattern}          -> group 1 of pattern in the first page text node matching it
+#   {"hotel_images": True}          -> all bstatic.com hotel image URLs from img/src and picture/srcset
+#   {"srcs": [sel, ...], "limit": n} -> bstatic.com src/data-src of matches, like find_many_src
+# Probe option: probes of a field that share a "reorder_group" pick the same element in
+# different layouts and are tried in hit-rate order within their slots. Every other probe
+# (broad fallbacks, regex and text scans) keeps its place, so a loose match never runs
+# ahead of a precise one.
+# Field options: "first_line" keeps only the first line of the value; "list" makes the
+# default an empty list instead of None.
+
+TEXT_FIELD_SPEC: List[Dict] = [
+    {
+        "name": "hotel_name",
+        "probes": [{"css": s, "reorder_group": "name"} for s in NAME_SELECTORS] + [{"css": NAME_FALLBACK_SELECTOR}],
+    },
+    {
+        "name": "address",
+        "first_line": True,
+        "probes": [{"css": s, "reorder_group": "address"} for s in ADDRESS_SELECTORS]
+        + [{"css": ADDRESS_FALLBACK_SELECTOR}],
+    },
+    {"name": "description", "probes": [{"css": s, "reorder_group": "description"} for s in DESCRIPTION_SELECTORS]},
+    {
+        "name": "review_score",
+        "probes": [
+            {"css": SCORECARD_SELECTOR, "attr": "data-review-score"},
+            {"css": REVIEW_COMPONENT_SELECTOR, "regex": r"(\d+(?:\.\d+)?)"},
+        ],
+    },
+    {
+        "name": "total_reviews",
+        "probes": [
+            {"css": REVIEW_COMPONENT_SELECTOR, "regex": r"([\d,]+)\s+reviews"},
+            {"text_scan": r"([\d,]+)\s+reviews"},
+        ],
+    },
+    {"name": "check_in", "probes": [{"xpath": TIME_VALUE_XPATH.format(label="Check-in")}]},
+    {"name": "check_out", "probes": [{"xpath": TIME_VALUE_XPATH.format(label="Check-out")}]},
+]
+
+IMAGE_FIELD: Dict = {
+    "name": "image_urls",
+    "list": True,
+    "probes": [{"hotel_images": True}, {"srcs": IMAGE_FALLBACK_SELECTORS, "limit": 15}],
+}
+
+HOTEL_FIELD_SPEC: List[Dict] = TEXT_FIELD_SPEC + [IMAGE_FIELD]
+
+_EXTRACT_JS = """
+const spec = arguments[0];
+const values = {};
+const matched = {};
+const textOf = el => (el.innerText || el.textContent || '').trim();
+const isHotelImage = u => u && u.includes('bstatic.com') && u.includes('/images/hotel/');
+
+function runProbe(p) {
+  if (p.hotel_images) {
+    const out = new Set();
+    for (const i of document.querySelectorAll('img')) {
+      const s = i.getAttribute('src') || i.getAttribute('data-src');
+      if (s && s.includes('bstatic.com')) out.add(s);
+    }
+    for (const s of document.querySelectorAll('picture source')) {
+      (s.getAttribute('srcset') || '').split(',').forEach(chunk => {
+        const u = chunk.trim().split(' ')[0];
+        if (u && u.includes('bstatic.com')) out.add(u);
+      });
+    }
+    const urls = Array.from(out).filter(isHotelImage);
+    return urls.length ? urls : null;
+  }
+  if (p.srcs) {
+    const urls = [];
+    const seen = new Set();
+    for (const sel of p.srcs) {
+      for (const e of document.querySelectorAll(sel)) {
+        const src = e.getAttribute('src') || e.getAttribute('data-src');
+        if (src && !seen.has(src) && src.includes('bstatic.com')) {
+          seen.add(src);
+          urls.push(src);
+          if (urls.length >= p.limit) return urls;
+        }
+      }
+    }
+    return urls.length ? urls : null;
+  }
+  if (p.text_scan) {
+    const re = new RegExp(p.text_scan, 'i');
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+      const m = re.exec(n.nodeValue);
+      if (m) return m[1];
+    }
+    return null;
+  }
+  let el = null;
+  if (p.xpath) {
+    el = document.evaluate(p.xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  } else {
+    el = document.querySelector(p.css);
+  }
+  if (!el) return null;
+  if (p.attr) return el.getAttribute(p.attr) || null;
+  const txt = textOf(el);
+  if (p.regex) {
+    const m = new RegExp(p.regex, 'i').exec(txt);
+    return m ? m[1] : null;
+  }
+  return txt || null;
+}
+
+for (const field of spec) {
+  let value = null;
+  for (let i = 0; i < field.probes.length; i++) {
+    let v = null;
+    try { v = runProbe(field.probes[i]); } catch (e) { v = null; }
+    if (v !== null && v !== undefined) {
+      value = v;
+      matched[field.name] = i;
+      break;
+    }
+  }
+  if (value !== null && field.first_line) value = value.split('\\n', 1)[0].trim();
+  values[field.name] = value === null ? (field.list ? [] : null) : value;
+}
+return {values: values, matched: matched};
+"""
+
+
+def wait_ready(driver, timeout: float = 20) -> None:
+    with span("ready_wait"):
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+
+
+def probe_label(probe: Dict) -> str:
+    for key in ("css", "xpath", "text_scan"):
+        if key in probe:
+            return probe[key]
+    if "srcs" in probe:
+        return ", ".join(probe["srcs"])
+    return "hotel_images"
+
+
+def ordered_spec(spec: List[Dict]) -> List[Dict]:
+    """``spec`` with each reorder group's probes in hit-rate order (see ``selector_stats``); other probes stay put."""
+    ordered = []
+    for field in spec:
+        probes = list(field["probes"])
+        groups: Dict[str, List[int]] = {}
+        for i, probe in enumerate(probes):
+            if probe.get("reorder_group"):
+                groups.setdefault(probe["reorder_group"], []).append(i)
+        for slots in groups.values():
+            by_label = {probe_label(probes[i]): probes[i] for i in slots}
+            if len(by_label) < len(slots):
+                continue
+            for i, label in zip(slots, selector_stats.order(field["name"], list(by_label))):
+                probes[i] = by_label[label]
+        if probes != field["probes"]:
+            field = dict(field, probes=probes)
+        ordered.append(field)
+    return ordered
+
+
+def extract_fields(driver, spec: Optional[List[Dict]] = None) -> Tuple[Dict, Dict[str, str]]:
+    """Evaluate every field of ``spec`` in a single ``execute_script`` round trip.
+
+    Interchangeable probes run in hit-rate order. Returns ``(values, matched)``
+    where ``matched`` maps each found field to the probe (selector, XPath or
+    pattern) that produced it.
+    """
+    spec = ordered_spec(HOTEL_FIELD_SPEC if spec is None else spec)
+    with span("extract_fields"):
+        out = driver.execute_script(_EXTRACT_JS, spec)
+    matched = {}
+    for field in spec:
+        idx = out["matched"].get(field["name"])
+        if idx is not None:
+            matched[field["name"]] = probe_label(field["probes"][idx])
+        selector_hit(field["name"], matched.get(field["name"]))
+    return out["values"], matched
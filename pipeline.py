@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+from autoscaler import Autoscaler
+from metrics import record
+
+_STOP = object()
+
+
+# ---------- Bounded producer/consumer queue ----------
+
+def run_pipeline(
+    hrefs: Iterable[str],
+    task: Callable[[str], Dict],
+    workers: int,
+    queue_size: Optional[int] = None,
+    on_result: Optional[Callable[[str, Dict], None]] = None,
+    on_error: Optional[Callable[[str, Exception], None]] = None,
+    scaler: Optional[Autoscaler] = None,
+) -> Dict:
+    """Feed ``hrefs`` to ``workers`` threads running ``task`` while they are still being produced.
+
+    The producer runs in the calling thread and blocks once ``queue_size`` hrefs
+    are waiting, so collection never runs far ahead of scraping. Callbacks are
+    serialized and may touch shared state without their own locking.
+
+    With a ``scaler``, ``workers`` is ignored: ``scaler.max_workers`` threads are
+    started but only ``scaler.active`` of them take hrefs at a time, and unless
+    ``queue_size`` is given the producer pauses at twice the active count.
+    """
+    if scaler is not None:
+        workers = scaler.max_workers
+    work: "queue.Queue" = queue.Queue(maxsize=queue_size or workers * 2)
+    space = threading.Condition()
+    callback_lock = threading.Lock()
+    started = time.monotonic()
+    stats = {"queued": 0, "completed": 0, "failed": 0, "first_result_s": None, "elapsed_s": None}
+
+    def capacity() -> int:
+        return queue_size or (scaler.active * 2 if scaler is not None else workers * 2)
+
+    def process(href):
+        started_task = time.monotonic()
+        try:
+            data = task(href)
+        except Exception as e:
+            with callback_lock:
+                stats["failed"] += 1
+                if on_error:
+                    on_error(href, e)
+            return
+        if scaler is not None:
+            scaler.observe(time.monotonic() - started_task)
+        with callback_lock:
+            stats["completed"] += 1
+            if stats["first_result_s"] is None:
+                stats["first_result_s"] = round(time.monotonic() - started, 3)
+            if on_result:
+                on_result(href, data)
+
+    def worker():
+        while True:
+            # Inactive workers park here until the scaler raises the limit
+            if scaler is not None:
+                scaler.limiter.acquire()
+            try:
+                item = work.get()
+                with space:
+                    space.notify()
+                if item is _STOP:
+                    return
+                href, queued_at = item
+                record("queue_wait", time.monotonic() - queued_at, hotel=href)
+                process(href)
+            finally:
+                if scaler is not None:
+                    scaler.limiter.release()
+
+    threads = [threading.Thread(target=worker, name=f"scrape-worker-{i}", daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+    if scaler is not None:
+        scaler.start(pending_fn=work.qsize)
+    try:
+        for href in hrefs:
+            with space:
+                space.wait_for(lambda: work.qsize() < capacity())
+            work.put((href, time.monotonic()))
+            stats["queued"] += 1
+    finally:
+        for _ in threads:
+            work.put(_STOP)
+        for t in threads:
+            t.join()
+        if scaler is not None:
+            scaler.stop()
+        stats["elapsed_s"] = round(time.monotonic() - started, 3)
+    return stats
@@ -0,0 +1,144 @@
+"""Scrape hotels claimed from a shared job queue until stopped.
+
+With --exit-when-empty the worker exits once the coordinator has finished queueing
+and no job is queued or leased.
+
+    python queue_worker.py --queue jobs.sqlite --threads 4
+    python queue_worker.py --queue http://coordinator-host:8740 --token <secret> --threads 6
+
+Scrape options (engine, fast_images/image_mode, browser_profile, pool limits, cache) are read
+from input.json when it exists, with the same keys and defaults as main.py.
+"""
+import argparse
+import json
+import os
+import threading
+from typing import Dict
+
+from api import CLI_SELECTOR_STATS, Scraper
+from job_queue import JobQueue, open_queue, worker_name
+from selector_stats import selector_stats
+
+
+class Heartbeat:
+    """Keeps a claimed job's lease alive while it is being scraped."""
+
+    def __init__(self, queue: JobQueue, job_id: int, worker: str, lease_s: float):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.lease_s = lease_s
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_s / 3):
+            try:
+                if not self.queue.heartbeat(self.job_id, self.worker, self.lease_s):
+                    self.lost = True
+                    return
+            except Exception as e:
+                print(f"Heartbeat for job {self.job_id} failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(
+    queue: JobQueue,
+    task,
+    name: str,
+    lease_s: float,
+    poll_s: float,
+    exit_when_empty: bool,
+    stop: threading.Event,
+) -> Dict[str, int]:
+    stats = {"completed": 0, "failed": 0, "lost": 0}
+    while not stop.is_set():
+        job = queue.claim(name, lease_s)
+        if job is None:
+            if exit_when_empty and queue.is_sealed():
+                counts = queue.counts()
+                if counts["queued"] == 0 and counts["leased"] == 0:
+                    break
+            stop.wait(poll_s)
+            continue
+        with Heartbeat(queue, job.id, name, lease_s) as hb:
+            try:
+                result = task(job.url)
+            except Exception as e:
+                queue.fail(job.id, name, f"{type(e).__name__}: {e}")
+                stats["failed"] += 1
+                print(f"ERROR scraping {job.url} (attempt {job.attempts}): {e}")
+                continue
+        if hb.lost or not queue.complete(job.id, name, result):
+            # The lease expired and the job was handed to another worker; its result wins
+            stats["lost"] += 1
+            print(f"Lease lost for {job.url}; result discarded")
+            continue
+        stats["completed"] += 1
+        print(f"✅ [{name}] {result.get('hotel_name') or job.url}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue", default="jobs.sqlite", help="SQLite queue path or http://host:port of a coordinator")
+    parser.add_argument("--token", help="the coordinator's shared secret for an http:// queue (default $JOB_QUEUE_TOKEN)")
+    parser.add_argument("--threads", type=int, help="concurrent scrapes in this process (default: workers from input.json)")
+    parser.add_argument("--lease", type=float, default=120, help="lease length in seconds, renewed every third of it")
+    parser.add_argument("--poll", type=float, default=2, help="seconds between claims while the queue is empty")
+    parser.add_argument("--exit-when-empty", action="store_true")
+    parser.add_argument("--config", default="input.json")
+    args = parser.parse_args()
+
+    data = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r") as f:
+            data = json.load(f)
+    threads = args.threads or data.get("workers", 4)
+    queue = open_queue(args.queue, token=args.token)
+    # A fixed number of threads claim jobs, so the autoscaler has nothing to resize. In-process
+    # retries (hotel_deadline_s, retries) come before the queue's max_attempts hand a job to another worker
+    scraper = Scraper(dict({"selector_stats": CLI_SELECTOR_STATS}, **data), workers=threads, autoscale=False)
+
+    stop = threading.Event()
+    base_name = worker_name()
+    totals = {"completed": 0, "failed": 0, "lost": 0}
+    lock = threading.Lock()
+
+    def thread_main(i):
+        stats = run_worker(queue, scraper.scrape_hotel, f"{base_name}/{i}", args.lease, args.poll, args.exit_when_empty, stop)
+        with lock:
+            for k, v in stats.items():
+                totals[k] += v
+
+    workers = [threading.Thread(target=thread_main, args=(i,), name=f"queue-worker-{i}") for i in range(threads)]
+    print(f"Worker {base_name}: {threads} threads on {args.queue}")
+    with scraper:
+        for t in workers:
+            t.start()
+        try:
+            for t in workers:
+                t.join()
+        except KeyboardInterrupt:
+            print("Stopping after the current hotels...")
+            stop.set()
+            for t in workers:
+                t.join()
+        stats = scraper.stats()
+    if stats["resilience"] is not None:
+        print(f"Resilience: {stats['resilience']}")
+    queue.close()
+    selector_stats.print_drift()
+    print(f"Worker {base_name} finished: {totals}")
+
+
+if __name__ == "__main__":
+    main()
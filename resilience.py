@@ -0,0 +1,286 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+from metrics import percentile, recorder
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+# ---------- Circuit breaker ----------
+
+class CircuitBreaker:
+    """Pauses dispatch while the recent error rate is too high.
+
+    Keeps the last ``window`` attempt outcomes. Once ``min_samples`` are in and
+    the error rate reaches ``threshold`` the breaker opens: ``wait`` blocks new
+    attempts for ``cooldown_s``, then lets them through on a cleared window. If
+    errors persist it opens again with twice the cooldown, up to ``max_cooldown_s``.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        threshold: float = 0.5,
+        min_samples: int = 10,
+        cooldown_s: float = 5,
+        max_cooldown_s: float = 60,
+    ):
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.base_cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        self._cooldown_s = cooldown_s
+        self._outcomes: deque = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.paused_s = 0.0
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._outcomes.append(ok)
+            if len(self._outcomes) < self.min_samples:
+                return
+            error_rate = self._outcomes.count(False) / len(self._outcomes)
+            if error_rate < self.threshold / 2:
+                self._cooldown_s = self.base_cooldown_s
+            if error_rate >= self.threshold and time.monotonic() >= self._open_until:
+                self._open_until = time.monotonic() + self._cooldown_s
+                self._outcomes.clear()
+                self.opened += 1
+                print(f"[breaker] error rate {error_rate:.0%}; pausing dispatch for {self._cooldown_s:.1f}s")
+                self._cooldown_s = min(self._cooldown_s * 2, self.max_cooldown_s)
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                pause = self._open_until - time.monotonic()
+                if pause <= 0:
+                    return
+                self.paused_s += pause
+            time.sleep(pause)
+
+
+# ---------- Deadline, hedging and retries ----------
+
+class ResilientTask:
+    """Wraps a per-hotel scrape ``task`` with a deadline, a hedged second attempt and retries.
+
+    Each call gets ``deadline_s`` seconds in total. Once enough attempts have
+    finished, an attempt still running past the ``hedge_percentile`` of their
+    latencies gets a second attempt (at most ``max_hedges`` at a time) and the first
+    success wins. A failed attempt is retried up to ``retries`` times with jittered
+    exponential backoff while the deadline allows. Attempts that lose the race
+    or outlive the deadline have their pooled driver aborted, so a wedged
+    Chrome is quit instead of being handed to the next hotel.
+
+    ``threads`` is the most callers expected at once (the autoscaler's ceiling,
+    not its starting point). Attempts beyond ``threads + max_hedges`` get a
+    thread of their own rather than queue while their deadline runs.
+    """
+
+    def __init__(
+        self,
+        task: Callable[[str], Dict],
+        pool=None,
+        deadline_s: Optional[float] = 120,
+        hedge_percentile: Optional[float] = 95,
+        hedge_min_samples: int = 20,
+        max_hedges: int = 1,
+        retries: int = 2,
+        backoff_s: float = 2,
+        breaker: Optional[CircuitBreaker] = None,
+        threads: int = 8,
+    ):
+        self.task = task
+        self.pool = pool
+        self.deadline_s = deadline_s
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.breaker = breaker or CircuitBreaker()
+        self._hedge_slots = threading.BoundedSemaphore(max(1, max_hedges))
+        self._hedging = max_hedges > 0 and hedge_percentile is not None
+        # Attempts run here so the calling worker can stop waiting on one that is stuck
+        self._size = threads + max_hedges
+        self._executor = ThreadPoolExecutor(max_workers=self._size, thread_name_prefix="attempt")
+        self._busy = 0
+        self._latencies: deque = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.aborted = 0
+        self.deadline_exceeded = 0
+        self.overflow = 0
+
+    def hedge_after(self) -> Optional[float]:
+        """Seconds after which a running attempt is hedged, or None until enough latencies are known."""
+        if not self._hedging:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            return percentile(list(self._latencies), self.hedge_percentile)
+
+    def _start(self, href: str, args: Tuple) -> Tuple[Future, Dict]:
+        owner: Dict = {}
+        hotel = recorder.current_hotel()
+
+        def attempt():
+            owner["thread"] = threading.get_ident()
+            started = time.monotonic()
+            with recorder.attributed_to(hotel):
+                result = self.task(href, *args)
+            with self._lock:
+                self._latencies.append(time.monotonic() - started)
+            return result
+
+        with self._lock:
+            self.attempts += 1
+            self._busy += 1
+            overflow = self._busy > self._size
+            if overflow:
+                self.overflow += 1
+        if overflow:
+            future: Future = Future()
+            threading.Thread(target=self._run_alone, args=(future, attempt), name="attempt-overflow", daemon=True).start()
+        else:
+            future = self._executor.submit(attempt)
+        future.add_done_callback(self._finished)
+        return future, owner
+
+    @staticmethod
+    def _run_alone(future: Future, attempt: Callable[[], Dict]) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(attempt())
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._busy -= 1
+
+    def _abort(self, future: Future, owner: Dict) -> None:
+        if future.cancel() or future.done():
+            return
+        if self.pool is not None and "thread" in owner and self.pool.abort(owner["thread"]):
+            with self._lock:
+                self.aborted += 1
+
+    def _race(self, href: str, args: Tuple, deadline: float):
+        running: List[Tuple[Future, Dict]] = [self._start(href, args)]
+        started = time.monotonic()
+        hedge_after = self.hedge_after()
+        hedge = None
+        error: Optional[BaseException] = None
+        try:
+            while running:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise DeadlineExceeded(f"no result within {self.deadline_s}s")
+                timeout = deadline - now
+                hedge_at = started + hedge_after if hedge_after is not None and hedge is None else None
+                if hedge_at is not None:
+                    timeout = max(0.0, min(timeout, hedge_at - now))
+                done, _ = wait([f for f, _ in running], timeout=timeout, return_when=FIRST_COMPLETED)
+                for entry in [e for e in running if e[0] in done]:
+                    running.remove(entry)
+                    if entry[0].exception() is None:
+                        if entry is hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return entry[0].result()
+                    error = entry[0].exception()
+                if running and hedge_at is not None and time.monotonic() >= hedge_at:
+                    if self._hedge_slots.acquire(blocking=False):
+                        hedge = self._start(href, args)
+                        running.append(hedge)
+                        with self._lock:
+                            self.hedged += 1
+                    else:
+                        # Every hedge slot is taken; this attempt runs on to the deadline alone
+                        hedge_after = None
+            raise error
+        finally:
+            for future, owner in running:
+                self._abort(future, owner)
+            if hedge is not None:
+                self._hedge_slots.release()
+
+    def __call__(self, href: str, *args) -> Dict:
+        """Scrape ``href``; extra ``args`` are passed on to ``task``."""
+        deadline = time.monotonic() + self.deadline_s if self.deadline_s else float("inf")
+        failures = 0
+        while True:
+            self.breaker.wait()
+            try:
+                result = self._race(href, args, deadline)
+            except DeadlineExceeded:
+                self.breaker.record(False)
+                with self._lock:
+                    self.deadline_exceeded += 1
+                raise
+            except Exception as e:
+                self.breaker.record(False)
+                failures += 1
+                delay = self.backoff_s * 2 ** (failures - 1) * random.uniform(0.5, 1.5)
+                if failures > self.retries or time.monotonic() + delay >= deadline:
+                    raise
+                with self._lock:
+                    self.retried += 1
+                print(f"Retrying {href} in {delay:.1f}s after {type(e).__name__}: {e}")
+                time.sleep(delay)
+                continue
+            self.breaker.record(True)
+            return result
+
+    def stats(self) -> Dict:
+        hedge_after = self.hedge_after()
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "retried": self.retried,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "aborted_drivers": self.aborted,
+                "deadline_exceeded": self.deadline_exceeded,
+                "overflow_attempts": self.overflow,
+                "hedge_after_s": None if hedge_after is None else round(hedge_after, 3),
+                "breaker_opened": self.breaker.opened,
+                "breaker_paused_s": round(self.breaker.paused_s, 3),
+            }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def from_config(task: Callable[[str], Dict], data: Dict, pool=None, threads: int = 8) -> Optional[ResilientTask]:
+    """``ResilientTask`` built from the input.json keys, or None when ``hotel_deadline_s`` is null."""
+    deadline_s = data.get("hotel_deadline_s", 120)
+    if not deadline_s:
+        return None
+    return ResilientTask(
+        task,
+        pool=pool,
+        deadline_s=deadline_s,
+        hedge_percentile=data.get("hedge_percentile", 95),
+        max_hedges=data.get("max_hedges", 1),
+        retries=data.get("retries", 2),
+        backoff_s=data.get("retry_backoff_s", 2),
+        breaker=CircuitBreaker(
+            threshold=data.get("breaker_error_rate", 0.5),
+            cooldown_s=data.get("breaker_cooldown_s", 5),
+        ),
+        threads=threads,
+    )
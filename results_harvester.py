@@ -0,0 +1,278 @@
+import re
+from datetime import date
+from typing import Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from hotel_urls import hotel_id, hotel_key
+from search_url import build_search_url, parse_price_range
+from scraping_utils import CALENDAR_SELECTOR, dismiss_consent, open_calendar, select_date
+from metrics import span
+from waits import skipped_sleep, wait_for_dom_quiet
+
+PROPERTY_CARD_SELECTOR = "div[data-testid='property-card']"
+
+# All card fields of the current results page in one round trip
+_CARDS_JS = """
+const txt = (root, sel) => {
+  const el = root.querySelector(sel);
+  return el ? ((el.innerText || el.textContent || '').trim() || null) : null;
+};
+// The score is the element of the review block holding just the number ("8.5"), not "Scored 8.5"
+const score = root => {
+  const block = root.querySelector("[data-testid='review-score']");
+  if (!block) return null;
+  const el = Array.from(block.querySelectorAll('*')).find(e =>
+    !e.children.length && /^\\d{1,2}([.,]\\d)?$/.test((e.textContent || '').trim()));
+  return el ? el.textContent.trim() : null;
+};
+return Array.from(document.querySelectorAll(arguments[0])).map(card => {
+  const a = card.querySelector('h3 > a') || card.querySelector("a[data-testid='title-link']");
+  const img = card.querySelector("img[data-testid='image']") || card.querySelector('img');
+  const idEl = card.hasAttribute('data-hotelid') ? card : card.querySelector('[data-hotelid]');
+  return {
+    hotel_id: idEl ? idEl.getAttribute('data-hotelid') : null,
+    href: a ? a.href : null,
+    name: txt(card, "[data-testid='title']"),
+    price: txt(card, "[data-testid='price-and-discounted-price']"),
+    review: txt(card, "[data-testid='review-score']"),
+    score: score(card),
+    distance: txt(card, "[data-testid='distance']"),
+    thumbnail: img ? (img.getAttribute('src') || img.getAttribute('data-src')) : null,
+  };
+});
+"""
+
+
+def parse_amount(text: Optional[str]) -> Optional[float]:
+    """'US$1,234' -> 1234.0. Booking shows whole amounts, so separators are dropped."""
+    if not text:
+        return None
+    m = re.search(r"\d[\d,.\s]*", text)
+    if not m:
+        return None
+    digits = re.sub(r"\D", "", m.group())
+    return float(digits) if digits else None
+
+
+# A standalone 1-2 digit number (optionally with one decimal) that is not a review count
+_SCORE_RE = re.compile(r"(?<![\d.,])(\d{1,2}(?:[.,]\d)?)(?![\d]|[.,]\d)(?!\s*reviews?\b)", re.IGNORECASE)
+
+
+def _score(text: str) -> Optional[float]:
+    value = float(text.replace(",", "."))
+    return value if value <= 10 else None
+
+
+def parse_review(text: Optional[str], score_text: Optional[str] = None) -> tuple:
+    """'Scored 8.5 8.5 Very good 1,234 reviews' -> (8.5, '1,234').
+
+    ``score_text`` is the text of the score element itself and is preferred;
+    without it the score is looked for in ``text``. A card with reviews but no
+    score ('1 review', 'New to Booking.com 12 reviews') has a score of None.
+    """
+    if not text:
+        return None, None
+    m_reviews = re.search(r"([\d,.]+)\s+reviews?", text, re.IGNORECASE)
+    review_count = m_reviews.group(1) if m_reviews else None
+    if score_text and re.fullmatch(r"\d{1,2}(?:[.,]\d)?", score_text.strip()):
+        return _score(score_text.strip()), review_count
+    for m in _SCORE_RE.finditer(text):
+        score = _score(m.group(1))
+        if score is not None:
+            return score, review_count
+    return None, review_count
+
+
+def page_url(url: str, offset: int) -> str:
+    parts = urlsplit(url)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "offset"]
+    if offset:
+        params.append(("offset", str(offset)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(params), ""))
+
+
+def _nights(data: Dict) -> int:
+    try:
+        span = date.fromisoformat(data["check_out"]) - date.fromisoformat(data["check_in"])
+        return max(1, span.days)
+    except (KeyError, ValueError):
+        return 1
+
+
+def card_filter(data: Dict):
+    """Predicate applying input.json ``minScore`` and ``minMaxPrice`` to a harvested card.
+
+    Card prices are for the whole stay; ``minMaxPrice`` is per night like Booking's own
+    price filter. Cards without a score or price are kept, since they cannot be judged.
+    """
+    min_score = data.get("minScore")
+    lo, hi = parse_price_range(data.get("minMaxPrice"))
+    nights = _nights(data)
+
+    def keep(card: Dict) -> bool:
+        if min_score and card["review_score"] is not None and card["review_score"] < float(min_score):
+            return False
+        if card["price"] is not None:
+            per_night = card["price"] / nights
+            if lo is not None and per_night < lo:
+                return False
+            if hi is not None and per_night > hi:
+                return False
+        return True
+
+    return keep
+
+
+def harvest_cards(
+    driver,
+    base_url: str,
+    max_items: int,
+    keep=None,
+    page_size: int = 25,
+    max_pages: int = 40,
+    page_timeout: float = 20,
+) -> Iterator[Dict]:
+    """Yield property cards page by page, moving through results by ``offset``.
+
+    Cards are deduped by ``hotel_key`` (the hotel slug) and filtered by ``keep`` before they are yielded,
+    so only hotels that can pass the filters get a detail scrape. Stops at
+    ``max_items`` cards, on an empty page, or when a page adds no new hotels.
+    """
+    seen = set()
+    yielded = 0
+    offset = 0
+    for page in range(max_pages):
+        with span("results_page"):
+            timeout = page_timeout
+            if page or driver.current_url != base_url:
+                driver.get(page_url(base_url, offset))
+            else:
+                # The caller opened this page and already waited for it; no cards means no results
+                timeout = min(page_timeout, 2)
+            try:
+                WebDriverWait(driver, timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, PROPERTY_CARD_SELECTOR))
+                )
+            except TimeoutException:
+                return
+            raw_cards = driver.execute_script(_CARDS_JS, PROPERTY_CARD_SELECTOR)
+        new_on_page = 0
+        for raw in raw_cards:
+            href = raw.get("href")
+            if not href:
+                continue
+            # The slug is the one key every card has; hotel ids are only recorded when the card carries one
+            key = hotel_key(href)
+            if key in seen:
+                continue
+            seen.add(key)
+            new_on_page += 1
+            score, review_count = parse_review(raw.get("review"), raw.get("score"))
+            card_id = raw.get("hotel_id")
+            card = {
+                "hotel_id": card_id if card_id and card_id.isdigit() else hotel_id(href),
+                "href": href,
+                "name": raw.get("name"),
+                "price": parse_amount(raw.get("price")),
+                "price_text": raw.get("price"),
+                "review_score": score,
+                "review_count": review_count,
+                "distance": raw.get("distance"),
+                "thumbnail_url": raw.get("thumbnail"),
+            }
+            if keep is not None and not keep(card):
+                continue
+            yield card
+            yielded += 1
+            if yielded >= max_items:
+                return
+        if new_on_page == 0 or len(raw_cards) < page_size:
+            return
+        offset += len(raw_cards)
+
+
+def open_search_results(driver, data: Dict, timeout: float = 20) -> bool:
+    """Open the direct results URL for an input.json-style spec.
+
+    False when the URL cannot be built or the results page does not load, which
+    is when callers fall back to ``ui_search``. A search that loads but finds no
+    hotels is still True; ``harvest_cards`` then yields nothing.
+    """
+    try:
+        url = build_search_url(data)
+    except ValueError as e:
+        print(f"Direct search unavailable for {data.get('search')!r}: {e}")
+        return False
+    try:
+        driver.get(url)
+    except WebDriverException as e:
+        print(f"Direct search page failed to load ({url}): {e}")
+        return False
+    dismiss_consent(driver, timeout=2)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, PROPERTY_CARD_SELECTOR))
+        )
+        return True
+    except TimeoutException:
+        pass
+    loaded = driver.execute_script("return document.readyState") == "complete"
+    if not loaded or "/searchresults" not in urlsplit(driver.current_url).path:
+        print(f"Direct search page for {data.get('search')!r} did not load ({driver.current_url})")
+        return False
+    print(f"No results for {data.get('search')!r} ({url})")
+    return True
+
+
+def ui_search(driver, data: Dict) -> None:
+    """Drive the homepage search form (text, calendar, property-type filter) for an input.json-style spec.
+
+    Used when the direct results URL cannot be built or does not load; ends on the
+    results page after opening the first hotel.
+    """
+    wait = WebDriverWait(driver, 25)
+    driver.get(f"https://www.booking.com/?selected_currency={data['currency']}")
+    dismiss_consent(driver)
+
+    search_box = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='ss']")))
+    search_box.click()
+    wait_for_dom_quiet(driver, "search_box_focus", replaces=1.0, timeout=2.0)
+
+    # Type the search text (no Enter); autocomplete suggestions render after typing
+    search_box.clear()
+    search_box.send_keys(data["search"])
+    wait_for_dom_quiet(driver, "search_autocomplete", quiet_ms=300, replaces=1.0, timeout=2.0)
+
+    if not open_calendar(driver, wait):
+        raise RuntimeError("Could not open calendar")
+    # open_calendar already waited for the calendar itself
+    skipped_sleep("calendar_settle", 0.8)
+    if not select_date(driver, wait, data["check_in"]):
+        raise RuntimeError(f"Could not select check-in date: {data['check_in']}")
+    if not select_date(driver, wait, data["check_out"]):
+        raise RuntimeError(f"Could not select check-out date: {data['check_out']}")
+    wait_for_dom_quiet(driver, "dates_selected", replaces=0.8, timeout=1.5, root=CALENDAR_SELECTOR)
+
+    search_button = wait.until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-testid='searchbox-submit-button'], button[type='submit']"))
+    )
+    search_button.click()
+
+    property_type = data["propertyType"]
+    property_filter = WebDriverWait(driver, 15).until(
+        EC.element_to_be_clickable(
+            (By.XPATH, f"//div[@data-testid='filters-group-label-content' and text()='{property_type}']/ancestor::label")
+        )
+    )
+    # click using JavaScript to avoid potential overlay issues
+    driver.execute_script("arguments[0].click();", property_filter)
+
+    WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, PROPERTY_CARD_SELECTOR)))
+    hotel_link = WebDriverWait(driver, 20).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, f"{PROPERTY_CARD_SELECTOR} h3 > a"))
+    )
+    driver.execute_script("arguments[0].scrollIntoView(true);", hotel_link)
+    driver.execute_script("arguments[0].click();", hotel_link)
@@ -1,13 +1,10 @@
 import json
 import re
-import time
-from typing import Dict
-from selenium import webdriver
+from typing import Dict, Union
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from scraping_utils import (
     first_text as su_first_text,
     get_address as su_get_address,
@@ -15,152 +12,160 @@ from scraping_utils import (
     open_gallery as su_open_gallery,
     collect_gallery_images as su_collect_gallery_images,
     close_gallery as su_close_gallery,
+    collect_gallery_fast as su_collect_gallery_fast,
     find_many_src as su_find_many_src,
+    NAME_SELECTORS,
+    NAME_FALLBACK_SELECTOR,
+    DESCRIPTION_SELECTORS,
+    SCORECARD_SELECTOR,
+    REVIEW_COMPONENT_SELECTOR,
+    IMAGE_FALLBACK_SELECTORS,
+)
+from driver_pool import make_driver
+from waits import wait_for_network_idle
+from metrics import span
+from page_extract import (
+    HOTEL_FIELD_SPEC,
+    TEXT_FIELD_SPEC,
+    extract_fields,
+    wait_ready,
 )
 
 
-def scrape_hotel(href: str, fast_images: bool = True) -> Dict:
-    options = Options()
-    # Keep the same behavior as main browser (do not change to headless to avoid behavioral diffs)
-    options.add_argument("--start-maximized")
-    driver = webdriver.Chrome(options=options)
-    wait = WebDriverWait(driver, 20)
-    try:
-        driver.get(href)
-        WebDriverWait(driver, 20).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
-
-        # Hotel name
-        name = su_first_text(
-            driver,
-            [
-                "h2.pp-header__title",
-                "h2.ddb12f4f86.pp-header__title",
-                "[data-testid='hp-hotel-name'] h2",
-                "header h2",
-            ],
-        )
-
-        # Address
-        address = su_get_address(driver)
-
-        # Description
-        description = su_first_text(
-            driver,
-            [
-                "p[data-testid='property-description']",
-                "[data-testid='property-description']",
-            ],
-        )
-
-        # Review score and total reviews
-        review_score = None
-        total_reviews = None
-        try:
-            scorecard = driver.find_elements(By.CSS_SELECTOR, "#js--hp-gallery-scorecard")
-            if scorecard:
-                review_score = scorecard[0].get_attribute("data-review-score") or None
-            comp = driver.find_elements(
-                By.CSS_SELECTOR, "[data-testid='review-score-right-component']"
-            )
-            if comp:
-                text_blob = comp[0].text
-                m_score = re.search(r"(\\d+(?:\\.\\d+)?)", text_blob)
-                if not review_score and m_score:
-                    review_score = m_score.group(1)
-                m_reviews = re.search(r"([\\d,]+)\\s+reviews", text_blob, re.IGNORECASE)
-                if m_reviews:
-                    total_reviews = m_reviews.group(1)
-            if not total_reviews:
-                any_reviews = driver.find_elements(
-                    By.XPATH,
-                    "//*[contains(translate(text(),'REVIEWS','reviews'),'reviews')]",
-                )
-                for el in any_reviews:
-                    m = re.search(r"([\\d,]+)\\s+reviews", el.text, re.IGNORECASE)
-                    if m:
-                        total_reviews = m.group(1)
-                        break
-        except Exception:
-            pass
+# "fast": images already on the page; "gallery": open the gallery and scroll it step by step;
+# "gallery_fast": the page's embedded photo list, or one in-page pass over the gallery grid
+IMAGE_MODES = ("fast", "gallery", "gallery_fast")
 
-        # Check-in/out
-        check_in_time = su_extract_time_for(driver, "Check-in")
-        check_out_time = su_extract_time_for(driver, "Check-out")
-
-        # Images
-        if fast_images:
-            # Fast path: do minimal scrolling and collect all bstatic image URLs from page without opening gallery
-            try:
-                # Trigger lazy-loads briefly
-                for _ in range(2):
-                    driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
-                    time.sleep(0.3)
-                    driver.execute_script("window.scrollTo(0, 0);")
-                    time.sleep(0.2)
-                urls = driver.execute_script(
-                    """
-                    const out = new Set();
-                    const imgs = Array.from(document.querySelectorAll('img'));
-                    for (const i of imgs) {
-                      const s = i.getAttribute('src') || i.getAttribute('data-src');
-                      if (s && s.includes('bstatic.com')) out.add(s);
-                    }
-                    // also pick picture > source
-                    const sources = Array.from(document.querySelectorAll('picture source'));
-                    for (const s of sources) {
-                      const srcset = s.getAttribute('srcset') || '';
-                      srcset.split(',').forEach(chunk => {
-                        const u = chunk.trim().split(' ')[0];
-                        if (u && u.includes('bstatic.com')) out.add(u);
-                      });
-                    }
-                    return Array.from(out);
-                    """
-                )
-                image_urls = [u for u in urls if '/images/hotel/' in u]
-            except Exception:
-                # Fallback to previous inline scrape in case JS fails
-                image_urls = su_find_many_src(
-                    driver,
-                    [
-                        "img[src*='bstatic.com']",
-                        "img[data-src*='bstatic.com']",
-                        "figure img",
-                    ],
-                )
-        else:
-            # Original behavior: open gallery and collect
-            gallery_urls = []
-            if su_open_gallery(driver):
-                gallery_urls = su_collect_gallery_images(driver)
-                su_close_gallery(driver)
-            if gallery_urls:
-                image_urls = gallery_urls
-            else:
-                image_urls = su_find_many_src(
-                    driver,
-                    [
-                        "img[src*='bstatic.com']",
-                        "img[data-src*='bstatic.com']",
-                        "figure img",
-                    ],
-                )
-
-        return {
-            "url": href,
-            "hotel_name": name,
-            "address": address,
-            "image_urls": image_urls,
-            "description": description,
-            "review_score": review_score,
-            "total_reviews": total_reviews,
-            "check_in": check_in_time,
-            "check_out": check_out_time,
-        }
+
+def image_mode(images: Union[bool, str]) -> str:
+    """Normalize an image mode; ``True``/``False`` are the old ``fast_images`` values."""
+    if images is True:
+        return "fast"
+    if images is False:
+        return "gallery"
+    if images not in IMAGE_MODES:
+        raise ValueError(f"Unknown image mode {images!r} (expected one of {', '.join(IMAGE_MODES)})")
+    return images
+
+
+def scrape_hotel(href: str, images: Union[bool, str] = "fast", pool=None) -> Dict:
+    # With a DriverPool the browser is borrowed and handed back; otherwise one is started for this page only
+    if pool is not None:
+        with pool.driver() as driver:
+            return scrape_hotel_with(driver, href, images)
+    with span("driver_start"):
+        driver = make_driver()
+    try:
+        return scrape_hotel_with(driver, href, images)
     finally:
         try:
             driver.quit()
         except Exception:
             pass
+
+
+def scrape_hotel_with(driver, href: str, images: Union[bool, str] = "fast") -> Dict:
+    mode = image_mode(images)
+    fast_images = mode == "fast"
+    with span("page_get"):
+        driver.get(href)
+    # Single readiness wait; the field reads below do not wait per selector
+    wait_ready(driver, 20)
+
+    if fast_images:
+        # Trigger lazy-loads so the image probe sees them; resume as soon as the requests settle
+        with span("lazy_images"):
+            driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
+            wait_for_network_idle(driver, "lazy_images_bottom", replaces=0.6)
+            driver.execute_script("window.scrollTo(0, 0);")
+            wait_for_network_idle(driver, "lazy_images_top", replaces=0.4)
+
+    try:
+        fields, _ = extract_fields(driver, HOTEL_FIELD_SPEC if fast_images else TEXT_FIELD_SPEC)
+    except WebDriverException:
+        # Fallback to per-field WebDriver lookups in case the in-page script fails
+        with span("stepwise_fallback"):
+            fields = scrape_fields_stepwise(driver, fast_images)
+
+    if mode == "gallery_fast":
+        with span("gallery_fast"):
+            fields["image_urls"] = su_collect_gallery_fast(driver) or su_find_many_src(driver, IMAGE_FALLBACK_SELECTORS)
+    elif mode == "gallery":
+        # Original behavior: open gallery and collect
+        gallery_urls = []
+        with span("gallery_open"):
+            opened = su_open_gallery(driver)
+        if opened:
+            with span("gallery_collect"):
+                gallery_urls = su_collect_gallery_images(driver)
+            su_close_gallery(driver)
+        fields["image_urls"] = gallery_urls or su_find_many_src(driver, IMAGE_FALLBACK_SELECTORS)
+
+    return {
+        "url": href,
+        "hotel_name": fields["hotel_name"],
+        "address": fields["address"],
+        "image_urls": fields["image_urls"],
+        "description": fields["description"],
+        "review_score": fields["review_score"],
+        "total_reviews": fields["total_reviews"],
+        "check_in": fields["check_in"],
+        "check_out": fields["check_out"],
+    }
+
+
+def scrape_fields_stepwise(driver, fast_images: bool = True) -> Dict:
+    # Hotel name
+    name = su_first_text(driver, NAME_SELECTORS, field="hotel_name", fallbacks=[NAME_FALLBACK_SELECTOR])
+
+    # Address
+    address = su_get_address(driver)
+
+    # Description
+    description = su_first_text(driver, DESCRIPTION_SELECTORS, field="description")
+
+    # Review score and total reviews
+    review_score = None
+    total_reviews = None
+    try:
+        scorecard = driver.find_elements(By.CSS_SELECTOR, SCORECARD_SELECTOR)
+        if scorecard:
+            review_score = scorecard[0].get_attribute("data-review-score") or None
+        comp = driver.find_elements(By.CSS_SELECTOR, REVIEW_COMPONENT_SELECTOR)
+        if comp:
+            text_blob = comp[0].text
+            m_score = re.search(r"(\d+(?:\.\d+)?)", text_blob)
+            if not review_score and m_score:
+                review_score = m_score.group(1)
+            m_reviews = re.search(r"([\d,]+)\s+reviews", text_blob, re.IGNORECASE)
+            if m_reviews:
+                total_reviews = m_reviews.group(1)
+        if not total_reviews:
+            any_reviews = driver.find_elements(
+                By.XPATH,
+                "//*[contains(translate(text(),'REVIEWS','reviews'),'reviews')]",
+            )
+            for el in any_reviews:
+                m = re.search(r"([\d,]+)\s+reviews", el.text, re.IGNORECASE)
+                if m:
+                    total_reviews = m.group(1)
+                    break
+    except Exception:
+        pass
+
+    # Check-in/out
+    check_in_time = su_extract_time_for(driver, "Check-in")
+    check_out_time = su_extract_time_for(driver, "Check-out")
+
+    image_urls = su_find_many_src(driver, IMAGE_FALLBACK_SELECTORS) if fast_images else []
+
+    return {
+        "hotel_name": name,
+        "address": address,
+        "image_urls": image_urls,
+        "description": description,
+        "review_score": review_score,
+        "total_reviews": total_reviews,
+        "check_in": check_in_time,
+        "check_out": check_out_time,
+    }
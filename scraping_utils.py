@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 import time
 import re
 from selenium.webdriver.common.by import By
@@ -6,6 +6,155 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from waits import run_in_page, wait_for, wait_for_dom_quiet
+from metrics import record, selector_hit
+from selector_stats import selector_stats
+
+# ---------- Hotel page selectors (fallback order matters) ----------
+#
+# The *_SELECTORS lists hold interchangeable selectors for one element and are tried in
+# hit-rate order; the broad *_FALLBACK_SELECTOR ones can match the wrong element, so they
+# always come last.
+
+NAME_SELECTORS = [
+    "h2.pp-header__title",
+    "h2.ddb12f4f86.pp-header__title",
+    "[data-testid='hp-hotel-name'] h2",
+]
+NAME_FALLBACK_SELECTOR = "header h2"
+DESCRIPTION_SELECTORS = [
+    "p[data-testid='property-description']",
+    "[data-testid='property-description']",
+]
+ADDRESS_SELECTORS = [
+    "[data-testid='address']",
+    "span[data-node_tt_id='address']",
+    "[data-node_tt_id='address']",
+]
+ADDRESS_FALLBACK_SELECTOR = "button.de576f5064 div.b99b6ef58f.cb4b7a25d9.b06461926f"
+SCORECARD_SELECTOR = "#js--hp-gallery-scorecard"
+REVIEW_COMPONENT_SELECTOR = "[data-testid='review-score-right-component']"
+IMAGE_FALLBACK_SELECTORS = [
+    "img[src*='bstatic.com']",
+    "img[data-src*='bstatic.com']",
+    "figure img",
+]
+TIME_VALUE_XPATH = (
+    "//div[contains(@class,'b0400e5749')][.//div[contains(@class,'e7addce19e') and normalize-space(text())='{label}']]"
+    "//div[contains(@class,'c92998be48')]//div[contains(@class,'b99b6ef58f')][1]"
+)
+
+CONSENT_BUTTON_SELECTOR = "button[id^='onetrust-accept-btn-handler'], button[aria-label*='Accept']"
+CALENDAR_SELECTOR = "[data-testid='searchbox-datepicker-calendar']"
+GALLERY_BUTTON_SELECTOR = "button[data-testid^='gallery-grid-photo-action-']"
+GALLERY_GRID_SELECTOR = "div.ff6e679a8f, div.f8e0b81a32"
+GALLERY_THUMB_SELECTORS = [
+    "img.f6c12c77eb.c0e44985a8.c09abd8a52.ca3dad4476",
+    "[data-testid='image-gallery-scroll-container'] img",
+    "figure img",
+]
+
+# Clicks the second hotel photo (the first if there is only one), skipping flags and design assets;
+# returns the index of the selector that found it, or -1
+_OPEN_GALLERY_JS = """
+const valid = [];
+const sels = arguments[0];
+for (let i = 0; i < sels.length; i++) {
+  for (const img of document.querySelectorAll(sels[i])) {
+    const src = (img.getAttribute('src') || img.getAttribute('data-src') || '').toLowerCase();
+    if (src.includes('bstatic.com') && src.includes('/images/hotel/') && !src.includes('images-flags')
+        && !src.includes('design-assets') && !src.includes('transparent')) valid.push([img, i]);
+  }
+}
+const target = valid.length >= 2 ? valid[1] : valid[0];
+if (!target) return -1;
+target[0].scrollIntoView({block: 'center'});
+target[0].click();
+return target[1];
+"""
+
+# Index and text of the first candidate selector with non-empty text, without waiting
+_FIRST_TEXT_JS = """
+const sels = arguments[0];
+for (let i = 0; i < sels.length; i++) {
+  let el = null;
+  try { el = document.querySelector(sels[i]); } catch (e) { continue; }
+  const txt = el ? (el.innerText || el.textContent || '').trim() : '';
+  if (txt) return [i, txt];
+}
+return null;
+"""
+
+# Photo list the hotel page embeds for its own gallery, largest size available per photo
+_EMBEDDED_PHOTOS_JS = """
+const photos = window.hotelPhotos;
+if (!Array.isArray(photos) || !photos.length) return null;
+const urls = photos.map(p => p && (p.highres_url || p.large_url || p.thumb_url)).filter(u => u);
+return urls.length ? urls : null;
+"""
+
+# Scrolls the open gallery grid and collects every thumbnail URL inside the page; finishes as soon
+# as a scroll followed by a quiet DOM adds no new grid buttons
+_GALLERY_GRID_JS = """
+const btnSel = arguments[0];
+const gridSel = arguments[1];
+const quietMs = arguments[2];
+const timeoutMs = arguments[3];
+const done = arguments[arguments.length - 1];
+const urls = [];
+const seen = new Set();
+const grab = () => {
+  const btns = document.querySelectorAll(btnSel);
+  for (const b of btns) {
+    const img = b.querySelector('img');
+    const s = img && (img.getAttribute('src') || img.getAttribute('data-src'));
+    if (s && s.includes('bstatic.com') && !seen.has(s)) { seen.add(s); urls.push(s); }
+  }
+  return btns.length;
+};
+const grid = document.querySelector(gridSel);
+let count = -1;
+let passes = 0;
+let finished = false;
+let quietTimer = null;
+const obs = new MutationObserver(() => { clearTimeout(quietTimer); quietTimer = setTimeout(step, quietMs); });
+const ceiling = setTimeout(() => finish(false), timeoutMs);
+function finish(ok) {
+  if (finished) return;
+  finished = true;
+  obs.disconnect();
+  clearTimeout(quietTimer);
+  clearTimeout(ceiling);
+  grab();
+  done({ok: ok, urls: urls, passes: passes});
+}
+function step() {
+  if (finished) return;
+  passes++;
+  const n = grab();
+  if (n === count) { finish(true); return; }
+  count = n;
+  if (grid) grid.scrollTop = grid.scrollTop + grid.clientHeight;
+  else window.scrollBy(0, Math.min(800, window.innerHeight));
+  quietTimer = setTimeout(step, quietMs);
+}
+obs.observe(grid || document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'data-src']});
+step();
+"""
+
+# ---------- Page helpers ----------
+
+def dismiss_consent(driver, timeout: float = 5) -> bool:
+    # Optional: dismiss cookie consent if present (non-fatal if not found)
+    try:
+        consent_btn = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, CONSENT_BUTTON_SELECTOR))
+        )
+        consent_btn.click()
+        wait_for(driver, {"absent": CONSENT_BUTTON_SELECTOR}, "consent_dismissed", replaces=0.5)
+        return True
+    except TimeoutException:
+        return False
 
 # ---------- Calendar helpers ----------
 
@@ -20,11 +169,8 @@ def open_calendar(driver, wait: WebDriverWait) -> bool:
                 EC.element_to_be_clickable((By.CSS_SELECTOR, sel))
             )
             driver.execute_script("arguments[0].click();", btn)
-            time.sleep(0.6)
-            WebDriverWait(driver, 8).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='searchbox-datepicker-calendar']"))
-            )
-            return True
+            if wait_for(driver, {"present": CALENDAR_SELECTOR}, "calendar_open", replaces=0.6, timeout=8):
+                return True
         except TimeoutException:
             continue
     # Fallback: click the start date display's parent button
@@ -33,11 +179,8 @@ def open_calendar(driver, wait: WebDriverWait) -> bool:
         parent_btn = driver.execute_script("return arguments[0].closest('button')", display)
         if parent_btn:
             driver.execute_script("arguments[0].click();", parent_btn)
-            time.sleep(0.6)
-            WebDriverWait(driver, 8).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='searchbox-datepicker-calendar']"))
-            )
-            return True
+            if wait_for(driver, {"present": CALENDAR_SELECTOR}, "calendar_open", replaces=0.6, timeout=8):
+                return True
     except Exception:
         pass
     return False
@@ -49,7 +192,7 @@ def select_date(driver, wait: WebDriverWait, date_str: str, max_hops: int = 24)
             el = driver.find_element(By.CSS_SELECTOR, f"span[data-date='{date_str}']")
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", el)
             driver.execute_script("arguments[0].click();", el)
-            time.sleep(0.4)
+            wait_for_dom_quiet(driver, "date_selected", replaces=0.4, timeout=1.0, root=CALENDAR_SELECTOR)
             return True
         except NoSuchElementException:
             try:
@@ -57,30 +200,48 @@ def select_date(driver, wait: WebDriverWait, date_str: str, max_hops: int = 24)
                     EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label="Next month"]'))
                 )
                 next_btn.click()
-                time.sleep(0.3)
+                wait_for_dom_quiet(driver, "calendar_next_month", replaces=0.3, timeout=1.0, root=CALENDAR_SELECTOR)
             except TimeoutException:
                 alt_next = driver.find_elements(By.CSS_SELECTOR, "button[aria-label*='Next']")
                 if alt_next:
                     driver.execute_script("arguments[0].click();", alt_next[0])
-                    time.sleep(0.3)
+                    wait_for_dom_quiet(driver, "calendar_next_month", replaces=0.3, timeout=1.0, root=CALENDAR_SELECTOR)
                 else:
                     break
     return False
 
 # ---------- Generic scraping helpers ----------
 
-def first_text(driver, selectors: List[str]) -> Optional[str]:
-    for sel in selectors:
+def first_text(
+    driver,
+    selectors: List[str],
+    field: Optional[str] = None,
+    timeout: float = 6,
+    fallbacks: Sequence[str] = (),
+) -> Optional[str]:
+    """Text of the first of ``selectors`` that has any, trying them in hit-rate order, then ``fallbacks`` as given.
+
+    All candidates are checked in one zero-wait probe; only when none matches is
+    the probe repeated for up to ``timeout`` seconds, once for the whole list.
+    """
+    field = field or selectors[0]
+    ordered = selector_stats.order(field, selectors) + list(fallbacks)
+    started = time.perf_counter()
+
+    def probe(d):
+        return d.execute_script(_FIRST_TEXT_JS, ordered)
+
+    found = probe(driver)
+    if found is None:
         try:
-            el = WebDriverWait(driver, 6).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, sel))
-            )
-            txt = el.text.strip()
-            if txt:
-                return txt
+            found = WebDriverWait(driver, timeout).until(probe)
         except TimeoutException:
-            continue
-    return None
+            record("first_text_miss", time.perf_counter() - started)
+            selector_hit(field, None)
+            return None
+    record("first_text_hit", time.perf_counter() - started)
+    selector_hit(field, ordered[found[0]])
+    return found[1]
 
 
 def find_many_src(driver, selectors: List[str], limit: int = 15) -> List[str]:
@@ -102,34 +263,13 @@ def find_many_src(driver, selectors: List[str], limit: int = 15) -> List[str]:
 
 
 def get_address(driver) -> Optional[str]:
-    raw = first_text(
-        driver,
-        [
-            "[data-testid='address']",
-            "span[data-node_tt_id='address']",
-            "[data-node_tt_id='address']",
-        ],
-    )
-    if raw:
-        return raw.split("\n", 1)[0].strip()
-    try:
-        el = driver.find_element(
-            By.CSS_SELECTOR, "button.de576f5064 div.b99b6ef58f.cb4b7a25d9.b06461926f"
-        )
-        return el.text.split("\n", 1)[0].strip()
-    except Exception:
-        return None
+    raw = first_text(driver, ADDRESS_SELECTORS, field="address", fallbacks=[ADDRESS_FALLBACK_SELECTOR])
+    return raw.split("\n", 1)[0].strip() if raw else None
 
 
 def extract_time_for(driver, label_text: str) -> Optional[str]:
     try:
-        val_el = driver.find_element(
-            By.XPATH,
-            (
-                f"//div[contains(@class,'b0400e5749')][.//div[contains(@class,'e7addce19e') and normalize-space(text())='{label_text}']]"
-                "//div[contains(@class,'c92998be48')]//div[contains(@class,'b99b6ef58f')][1]"
-            ),
-        )
+        val_el = driver.find_element(By.XPATH, TIME_VALUE_XPATH.format(label=label_text))
         return val_el.text.strip()
     except Exception:
         return None
@@ -138,52 +278,15 @@ def extract_time_for(driver, label_text: str) -> Optional[str]:
 
 def open_gallery(driver) -> bool:
     try:
-        selectors = [
-            "img.f6c12c77eb.c0e44985a8.c09abd8a52.ca3dad4476",
-            "[data-testid='image-gallery-scroll-container'] img",
-            "figure img",
-        ]
-        thumbs = []
-        for sel in selectors:
-            thumbs.extend(driver.find_elements(By.CSS_SELECTOR, sel))
-        valid = []
-        for t in thumbs:
-            try:
-                src = t.get_attribute("src") or t.get_attribute("data-src") or ""
-                src_l = src.lower()
-                if (
-                    "bstatic.com" in src_l
-                    and "/images/hotel/" in src_l
-                    and "images-flags" not in src_l
-                    and "design-assets" not in src_l
-                    and "transparent" not in src_l
-                ):
-                    valid.append(t)
-            except Exception:
-                continue
-        target = valid[1] if len(valid) >= 2 else (valid[0] if valid else None)
-        if target is None:
-            return False
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", target)
-        driver.execute_script("arguments[0].click();", target)
-        WebDriverWait(driver, 8).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "button[data-testid^='gallery-grid-photo-action-']")
-            )
-        )
-        return True
-    except TimeoutException:
-        try:
-            WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "button[data-testid^='gallery-grid-photo-action-']")
-                )
-            )
-            return True
-        except Exception:
-            return False
+        # One script call picks and clicks the thumbnail instead of an attribute round trip per image
+        thumbs = selector_stats.order("gallery_thumb", GALLERY_THUMB_SELECTORS)
+        clicked = driver.execute_script(_OPEN_GALLERY_JS, thumbs)
     except Exception:
         return False
+    selector_hit("gallery_thumb", thumbs[clicked] if clicked >= 0 else None)
+    if clicked < 0:
+        return False
+    return wait_for(driver, {"present": GALLERY_BUTTON_SELECTOR}, "gallery_open", timeout=11)
 
 
 def collect_gallery_images(driver, max_scrolls: int = 20) -> List[str]:
@@ -191,12 +294,12 @@ def collect_gallery_images(driver, max_scrolls: int = 20) -> List[str]:
     try:
         grid_container = None
         try:
-            grid_container = driver.find_element(By.CSS_SELECTOR, "div.ff6e679a8f, div.f8e0b81a32")
+            grid_container = driver.find_element(By.CSS_SELECTOR, GALLERY_GRID_SELECTOR)
         except Exception:
             grid_container = None
 
         def current_buttons():
-            return driver.find_elements(By.CSS_SELECTOR, "button[data-testid^='gallery-grid-photo-action-']")
+            return driver.find_elements(By.CSS_SELECTOR, GALLERY_BUTTON_SELECTOR)
 
         last_count = -1
         stagnate = 0
@@ -224,12 +327,36 @@ def collect_gallery_images(driver, max_scrolls: int = 20) -> List[str]:
                 )
             else:
                 driver.execute_script("window.scrollBy(0, Math.min(800, window.innerHeight));")
-            time.sleep(0.4)
+            wait_for_dom_quiet(driver, "gallery_scroll", replaces=0.4, timeout=1.0, root=GALLERY_GRID_SELECTOR)
         return list(urls)
     except Exception:
         return list(urls)
 
 
+def collect_gallery_fast(driver, quiet_ms: int = 250, timeout: float = 15) -> List[str]:
+    """Gallery image URLs from the page's embedded photo data, else from one in-page pass over the open grid."""
+    try:
+        urls = driver.execute_script(_EMBEDDED_PHOTOS_JS)
+    except Exception:
+        urls = None
+    if urls:
+        selector_hit("gallery_images", "window.hotelPhotos")
+        return urls
+    if not open_gallery(driver):
+        selector_hit("gallery_images", None)
+        return []
+    try:
+        out = run_in_page(
+            driver, "gallery_grid", _GALLERY_GRID_JS, GALLERY_BUTTON_SELECTOR, GALLERY_GRID_SELECTOR, quiet_ms,
+            timeout=timeout,
+        )
+    finally:
+        close_gallery(driver)
+    urls = (out or {}).get("urls") or []
+    selector_hit("gallery_images", GALLERY_BUTTON_SELECTOR if urls else None)
+    return urls
+
+
 def close_gallery(driver) -> None:
     try:
         close_btn = driver.find_elements(
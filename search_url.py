@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+BOOKING_BASE = "https://www.booking.com"
+
+# Booking.com "ht_id" filter values for the propertyType labels shown in the filter sidebar
+PROPERTY_TYPE_IDS = {
+    "apartments": 201,
+    "hostels": 203,
+    "hotels": 204,
+    "motels": 205,
+    "resorts": 206,
+    "bed and breakfasts": 208,
+    "villas": 213,
+    "guest houses": 216,
+    "vacation homes": 220,
+    "homestays": 222,
+}
+
+# The review_score values Booking.com's filter accepts (tenths of the 10-point scale)
+REVIEW_SCORE_BUCKETS = (60, 70, 80, 90)
+
+
+def parse_price_range(value) -> tuple:
+    """'200-300' -> (200, 300); either side may be empty ('-300', '200-')."""
+    if not value:
+        return None, None
+    lo, _, hi = str(value).partition("-")
+    return (float(lo) if lo.strip() else None), (float(hi) if hi.strip() else None)
+
+
+def review_score_bucket(min_score) -> Optional[int]:
+    """Booking.com ``review_score`` filter value for ``minScore``, rounded down to a supported bucket.
+
+    The filter only takes 60/70/80/90 ("Pleasant: 6+" ... "Wonderful: 9+"), so 7.5
+    becomes 70 and the card-level check drops the 7.0-7.4 hotels. Below 6 there is
+    no bucket and only the card-level check applies.
+    """
+    if not min_score:
+        return None
+    bucket = min(9, int(float(min_score))) * 10
+    return bucket if bucket in REVIEW_SCORE_BUCKETS else None
+
+
+def search_filters(data: Dict) -> List[str]:
+    """Booking.com ``nflt`` filter terms for the input.json search spec."""
+    filters = []
+    property_type = data.get("propertyType")
+    if property_type:
+        ht_id = PROPERTY_TYPE_IDS.get(property_type.strip().lower())
+        if ht_id is None:
+            raise ValueError(f"No ht_id known for propertyType {property_type!r}")
+        filters.append(f"ht_id={ht_id}")
+    lo, hi = parse_price_range(data.get("minMaxPrice"))
+    if lo is not None or hi is not None:
+        lo_s = str(int(lo)) if lo is not None else "min"
+        hi_s = str(int(hi)) if hi is not None else "max"
+        filters.append(f"price={data['currency']}-{lo_s}-{hi_s}-1")
+    bucket = review_score_bucket(data.get("minScore"))
+    if bucket:
+        filters.append(f"review_score={bucket}")
+    return filters
+
+
+def build_search_url(data: Dict, base: str = BOOKING_BASE, offset: int = 0) -> str:
+    """Search-results URL for an input.json spec, skipping the homepage form and calendar.
+
+    Raises ValueError for a propertyType without a known filter id, so callers can
+    fall back to clicking the filter in the UI.
+    """
+    params = [
+        ("ss", data["search"]),
+        ("checkin", data["check_in"]),
+        ("checkout", data["check_out"]),
+        ("group_adults", data.get("adults", 2)),
+        ("group_children", data.get("children", 0)),
+        ("no_rooms", data.get("rooms", 1)),
+        ("selected_currency", data["currency"]),
+    ]
+    for age in data.get("children_ages", []):
+        params.append(("age", age))
+    if data.get("sortBy"):
+        params.append(("order", data["sortBy"]))
+    filters = search_filters(data)
+    if filters:
+        params.append(("nflt", ";".join(filters)))
+    if offset:
+        params.append(("offset", offset))
+    return f"{base.rstrip('/')}/searchresults.html?{urlencode(params)}"
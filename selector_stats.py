@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+class SelectorStats:
+    """Which fallback selector matched each field, persisted across runs.
+
+    ``order`` puts a field's candidates in hit-rate order so the selector that
+    currently works is probed first. Hit scores are decayed on every lookup of
+    the field, so after a layout change the new winner moves to the front within
+    a few dozen pages instead of waiting for lifetime counts to catch up.
+
+    ``drift`` flags fields whose recent found rate has fallen well below their
+    lifetime rate: the page still loads, but the selectors stopped matching.
+    """
+
+    def __init__(self, path: Optional[str] = None, decay: float = 0.95, recent_alpha: float = 0.05):
+        self.path = None
+        self.decay = decay
+        self.recent_alpha = recent_alpha
+        self._lock = threading.Lock()
+        self._fields: Dict[str, Dict] = {}
+        if path:
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        """Continue from the stats saved at ``path`` (if any); ``save`` writes back there."""
+        fields = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                fields = json.load(f).get("fields", {})
+        with self._lock:
+            self.path = path
+            self._fields = fields
+
+    def _field(self, field: str) -> Dict:
+        entry = self._fields.get(field)
+        if entry is None:
+            entry = self._fields[field] = {"lookups": 0, "found": 0, "recent": None, "selectors": {}}
+        return entry
+
+    def hit(self, field: str, selector: Optional[str]) -> None:
+        """Record one lookup of ``field``; ``selector`` is the one that matched, or None on a miss."""
+        found = selector is not None
+        with self._lock:
+            entry = self._field(field)
+            entry["lookups"] += 1
+            entry["found"] += found
+            if entry["recent"] is None:
+                entry["recent"] = float(found)
+            else:
+                entry["recent"] += self.recent_alpha * (found - entry["recent"])
+            for stats in entry["selectors"].values():
+                stats["score"] *= self.decay
+            if found:
+                stats = entry["selectors"].setdefault(selector, {"hits": 0, "score": 0.0})
+                stats["hits"] += 1
+                stats["score"] += 1.0
+
+    def order(self, field: str, candidates: List[str]) -> List[str]:
+        """``candidates`` by decayed hit score, best first; unseen selectors keep their given order."""
+        with self._lock:
+            entry = self._fields.get(field)
+            if entry is None:
+                return list(candidates)
+            scores = {sel: s["score"] for sel, s in entry["selectors"].items()}
+        return sorted(candidates, key=lambda sel: -scores.get(sel, 0.0))
+
+    def drift(self, min_lookups: int = 20, drop: float = 0.2) -> List[Dict]:
+        """Fields whose recent found rate is at least ``drop`` below their lifetime rate."""
+        flagged = []
+        with self._lock:
+            for field, entry in sorted(self._fields.items()):
+                if entry["lookups"] < min_lookups or entry["recent"] is None:
+                    continue
+                lifetime = entry["found"] / entry["lookups"]
+                if lifetime - entry["recent"] >= drop:
+                    flagged.append(
+                        {"field": field, "lifetime_rate": round(lifetime, 3), "recent_rate": round(entry["recent"], 3)}
+                    )
+        return flagged
+
+    def print_drift(self) -> List[Dict]:
+        flagged = self.drift()
+        for flag in flagged:
+            print(
+                f"WARNING selector drift: {flag['field']} found on {flag['recent_rate']:.0%} of recent pages "
+                f"(lifetime {flag['lifetime_rate']:.0%})"
+            )
+        return flagged
+
+    def report(self) -> Dict:
+        fields = {}
+        with self._lock:
+            for field, entry in sorted(self._fields.items()):
+                ranked = sorted(entry["selectors"].items(), key=lambda kv: -kv[1]["score"])
+                fields[field] = {
+                    "lookups": entry["lookups"],
+                    "found_rate": round(entry["found"] / entry["lookups"], 3) if entry["lookups"] else None,
+                    "recent_rate": None if entry["recent"] is None else round(entry["recent"], 3),
+                    "order": [sel for sel, _ in ranked],
+                    "hits": {sel: s["hits"] for sel, s in ranked},
+                }
+        return {"fields": fields, "drift": self.drift()}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            payload = json.dumps({"fields": self._fields}, ensure_ascii=False, indent=2)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, self.path)
+
+
+# Process-wide store fed by metrics.selector_hit and read by the scraping helpers
+selector_stats = SelectorStats()
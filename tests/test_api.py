@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from api import Scraper  # noqa: E402
+from selector_stats import selector_stats  # noqa: E402
+
+
+def test_library_scraper_writes_no_selector_stats_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(selector_stats, "path", None)
+    monkeypatch.setattr(selector_stats, "_fields", {})
+    with Scraper(engine="http", hotel_deadline_s=None):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_selector_stats_file_when_configured(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(selector_stats, "path", None)
+    monkeypatch.setattr(selector_stats, "_fields", {})
+    with Scraper(engine="http", hotel_deadline_s=None, selector_stats="stats.json"):
+        pass
+    assert [p.name for p in tmp_path.iterdir()] == ["stats.json"]
@@ -0,0 +1,169 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from driver_pool import DriverPool  # noqa: E402
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.calls.append(("switch", handle))
+
+
+class FakeDriver:
+    """Records the WebDriver calls the pool makes, with the page it was on at the time."""
+
+    def __init__(self, cdp_cookies: bool = True):
+        self.calls = []
+        self.url = "https://www.booking.com/hotel/fr/example.html"
+        self.cdp_cookies = cdp_cookies
+        self.window_handles = ["main"]
+        self.current_window_handle = "main"
+        self.switch_to = FakeSwitchTo(self)
+        self.service = None
+
+    def find_elements(self, by, selector):
+        return []
+
+    def find_element(self, by, selector):
+        raise Exception("no body")
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Network.clearBrowserCookies" and not self.cdp_cookies:
+            raise Exception("CDP unavailable")
+        self.calls.append((cmd, self.url))
+
+    def delete_all_cookies(self):
+        self.calls.append(("delete_all_cookies", self.url))
+
+    def get(self, url):
+        self.calls.append(("get", url))
+        self.url = url
+
+    def get_cookies(self):
+        return []
+
+    def set_page_load_timeout(self, seconds):
+        self.calls.append(("set_page_load_timeout", seconds))
+
+    def quit(self):
+        self.calls.append(("quit", self.url))
+
+
+def _names(calls):
+    return [c[0] for c in calls]
+
+
+def _reset(driver, consent=None):
+    pool = DriverPool(max_size=1, max_pages=0, max_rss_mb=None, factory=lambda: driver)
+    if consent:
+        pool._consent_cookies = consent
+    pool.acquire()
+    # Only the calls made by the reset on release
+    del driver.calls[:]
+    pool.release(driver)
+    return driver.calls
+
+
+def test_reset_clears_cookies_before_leaving_the_site():
+    calls = _reset(FakeDriver(), consent=[{"name": "OptanonAlertBoxClosed", "value": "1", "domain": ".booking.com"}])
+    names = _names(calls)
+    assert names.index("Network.clearBrowserCookies") < names.index("get")
+    assert names.index("get") < names.index("Network.setCookies")
+    assert ("get", "about:blank") in calls
+
+
+def test_reset_falls_back_to_delete_all_cookies_on_the_hotel_origin():
+    calls = _reset(FakeDriver(cdp_cookies=False))
+    assert ("delete_all_cookies", "https://www.booking.com/hotel/fr/example.html") in calls
+    names = _names(calls)
+    assert names.index("delete_all_cookies") < names.index("get")
+
+
+def test_reset_without_consent_cookies_does_not_set_any():
+    assert "Network.setCookies" not in _names(_reset(FakeDriver()))
+
+
+def test_worker_takes_over_a_driver_still_loading_the_warm_url():
+    warm_url = "https://www.booking.com/"
+    loading = threading.Event()
+    loaded = threading.Event()
+
+    class SlowWarmUp(FakeDriver):
+        def get(self, url):
+            super().get(url)
+            if url == warm_url:
+                loading.set()
+                loaded.wait(5)
+
+    driver = SlowWarmUp()
+    pool = DriverPool(max_size=1, max_pages=0, max_rss_mb=None, factory=lambda: driver)
+    pool.prewarm(1, warm_url)
+    assert loading.wait(5)
+    acquired = []
+    worker = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    worker.start()
+    time.sleep(0.2)
+    # Claimed while the only slot is still held by the prewarm thread
+    assert pool.stats()["handoffs"] == 1
+    loaded.set()
+    worker.join(5)
+    assert acquired == [driver]
+    # The rest of the warm-up (cookie banner, about:blank) is left to the worker's own page
+    assert ("get", "about:blank") not in driver.calls
+    pool.release(driver)
+    pool.close()
+    assert pool.stats()["idle"] == 0
+
+
+def test_close_quits_a_driver_still_loading_the_warm_url():
+    warm_url = "https://www.booking.com/"
+    loading = threading.Event()
+    quit = threading.Event()
+
+    class HangingWarmUp(FakeDriver):
+        def get(self, url):
+            super().get(url)
+            if url == warm_url:
+                loading.set()
+                # Only quitting the browser ends the load
+                quit.wait(30)
+                raise Exception("chrome not reachable")
+
+        def quit(self):
+            super().quit()
+            quit.set()
+
+    driver = HangingWarmUp()
+    pool = DriverPool(max_size=1, max_pages=0, max_rss_mb=None, factory=lambda: driver)
+    pool.prewarm(1, warm_url, load_timeout=3)
+    assert loading.wait(5)
+    errors = []
+
+    def acquire():
+        try:
+            pool.acquire()
+        except RuntimeError as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=acquire)
+    worker.start()
+    time.sleep(0.2)
+    assert pool.stats()["handoffs"] == 1
+    started = time.monotonic()
+    pool.close()
+    worker.join(5)
+    assert time.monotonic() - started < 2
+    assert len(errors) == 1
+    # Short timeout for the warm-up load, the WebDriver default put back afterwards
+    timeouts = [c[1] for c in driver.calls if c[0] == "set_page_load_timeout"]
+    assert timeouts == [3, 300]
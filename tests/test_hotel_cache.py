@@ -0,0 +1,52 @@
+from hotel_cache import HotelCache, cached
+
+HOTEL = "https://www.booking.com/hotel/fr/lutetia.html?checkin=2025-11-01&checkout=2025-11-03"
+OTHER_DATES = "https://www.booking.com/hotel/fr/lutetia.html?checkin=2025-12-01&checkout=2025-12-03"
+RESULT = {
+    "url": HOTEL, "hotel_name": "Lutetia", "address": "45 Bd Raspail", "description": "Rive gauche",
+    "image_urls": ["a.jpg"], "check_in": "15:00", "check_out": "12:00", "review_score": "8.7", "total_reviews": "1,234",
+}
+
+
+def _cache(tmp_path, **ttls):
+    return HotelCache(str(tmp_path / "cache.sqlite"), ttls=ttls)
+
+
+def test_only_expired_fields_are_refreshed(tmp_path):
+    calls = []
+
+    def task(href):
+        calls.append("full")
+        return dict(RESULT)
+
+    def refresh(href, stale):
+        calls.append(sorted(stale))
+        return dict(RESULT, hotel_name="", description="changed", review_score="9.0", total_reviews="1,300")
+
+    # Review fields expire immediately; everything else stays fresh
+    with _cache(tmp_path, review_score=-1, total_reviews=-1) as cache:
+        run = cached(task, cache, refresh=refresh)
+        assert run(HOTEL)["review_score"] == "8.7"
+        result = run(HOTEL)
+        assert calls == ["full", ["review_score", "total_reviews"]]
+        assert result["review_score"] == "9.0" and result["total_reviews"] == "1,300"
+        # Fresh fields keep their cached values even when the refresh saw something else
+        assert result["description"] == "Rive gauche" and result["hotel_name"] == "Lutetia"
+        assert cache.stats()["partial"] == 1
+
+
+def test_fully_fresh_entry_skips_the_task(tmp_path):
+    with _cache(tmp_path) as cache:
+        run = cached(lambda href: dict(RESULT), cache)
+        run(HOTEL)
+        assert cache.get(HOTEL)["hotel_name"] == "Lutetia"
+        assert cache.get(OTHER_DATES) is None
+        assert cache.get(OTHER_DATES, any_dates=True)["hotel_name"] == "Lutetia"
+        assert cache.stats()["hits"] == 2
+
+
+def test_empty_value_does_not_blank_a_fresh_field(tmp_path):
+    with _cache(tmp_path) as cache:
+        cache.put(HOTEL, dict(RESULT))
+        merged = cache.put(HOTEL, dict(RESULT, address="", review_score="8.8"))
+        assert merged["address"] == "45 Bd Raspail" and merged["review_score"] == "8.8"
@@ -0,0 +1,29 @@
+from hotel_urls import canonical_url, hotel_id, hotel_key
+
+SEARCH_LINK = (
+    "https://www.booking.com/hotel/us/royalton.en-gb.html?aid=304142&label=gen173nr&ucfs=1"
+    "&checkin=2025-11-01&checkout=2025-11-03&group_adults=2&no_rooms=1&group_children=0"
+    "&highlighted_blocks=5616602_371662184_2_0_0&matching_block_id=5616602_371662184_2_0_0"
+)
+
+
+def test_block_parameters_are_not_taken_as_hotel_ids():
+    # highlighted_blocks and friends hold room ids; the hotel id is only known from a real hotel_id
+    assert hotel_id(SEARCH_LINK) is None
+    assert hotel_id("https://www.booking.com/hotel/us/royalton.html?hotel_id=5616602&aid=1") == "5616602"
+    assert hotel_id("https://www.booking.com/hotel/us/royalton.html?hotel_id=royalton") is None
+
+
+def test_hotel_key_is_the_same_for_every_language_and_date():
+    assert hotel_key(SEARCH_LINK) == "/hotel/us/royalton.html"
+    assert hotel_key("https://www.booking.com/hotel/us/Royalton.fr.html?checkin=2026-01-01") == "/hotel/us/royalton.html"
+
+
+def test_canonical_url_keeps_dates_and_occupancy_only():
+    assert canonical_url(SEARCH_LINK) == (
+        "https://www.booking.com/hotel/us/royalton.html"
+        "?checkin=2025-11-01&checkout=2025-11-03&group_adults=2&group_children=0&no_rooms=1"
+    )
+    reordered = "http://WWW.booking.com/hotel/us/royalton.html?no_rooms=1&group_children=0&group_adults=2" \
+        "&checkout=2025-11-03&checkin=2025-11-01&sid=xyz#map"
+    assert canonical_url(reordered) == canonical_url(SEARCH_LINK)
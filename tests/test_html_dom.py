@@ -0,0 +1,91 @@
+import pytest
+
+from html_dom import LxmlPage, TreePage, parse_html, select, select_many
+
+HTML = """
+<html><body>
+  <div id="main" class="pp-header hotel">
+    <h2 class="pp-header__title">Hôtel <b>Lutetia</b></h2>
+    <span data-testid="address" lang="en-gb">45 Boulevard Raspail,<br>75006 Paris</span>
+  </div>
+  <ul class="facilities">
+    <li class="item wifi">Free WiFi</li>
+    <li class="item pool">Pool <span>(indoor)</span></li>
+  </ul>
+  <div data-testid="review-score"><div>8.7</div><div>1,234 reviews</div></div>
+  <a href="/hotel/fr/lutetia.html" data-id="x">Lutetia</a>
+  <script>var reviews = "9,999 reviews";</script>
+</body></html>
+"""
+
+SELECTORS = [
+    "h2",
+    "#main h2",
+    "#main > h2 b",
+    "body > h2",
+    ".facilities > li.pool",
+    "li.item",
+    "ul li span",
+    "[data-testid='address']",
+    "[data-testid^=review] > div",
+    "span[lang|=en]",
+    "div[class~=hotel]",
+    "div[class*=header]",
+    "a[href$='lutetia.html']",
+    "a[data-id]",
+    "h2, li.wifi",
+    "*[data-testid]",
+]
+
+
+def _tags(nodes):
+    return [(n.tag, n.get("class") or n.get("data-testid")) for n in nodes]
+
+
+@pytest.fixture(scope="module")
+def root():
+    return parse_html(HTML)
+
+
+def test_combinators_and_attribute_operators(root):
+    assert [n.inner_text for n in select(root, "#main > h2 b")] == ["Lutetia"]
+    assert select(root, "body > h2") == []
+    assert [n.inner_text for n in select(root, ".facilities > li.pool")] == ["Pool (indoor)"]
+    assert [n.get("lang") for n in select(root, "span[lang|=en]")] == ["en-gb"]
+    assert [n.get("href") for n in select(root, "a[href$='lutetia.html']")] == ["/hotel/fr/lutetia.html"]
+    assert [n.inner_text for n in select(root, "[data-testid^=review] > div")] == ["8.7", "1,234 reviews"]
+    assert _tags(select(root, "h2, li.wifi")) == [("h2", "pp-header__title"), ("li", "item wifi")]
+
+
+def test_unsupported_selectors_raise(root):
+    with pytest.raises(ValueError):
+        select(root, "li:first-child")
+
+
+def test_select_many_matches_select_for_every_selector(root):
+    found = select_many(root, SELECTORS)
+    for selector in SELECTORS:
+        assert found[selector] == select(root, selector), selector
+
+
+def test_inner_text_breaks_lines_at_blocks_and_br(root):
+    assert select(root, "[data-testid='address']")[0].inner_text == "45 Boulevard Raspail,\n75006 Paris"
+    # Whitespace between two blocks leaves one empty line, never more
+    assert root.select_one("ul").inner_text == "Free WiFi\n\nPool (indoor)"
+
+
+def test_page_texts_skip_scripts():
+    texts = TreePage(HTML).texts()
+    assert "1,234 reviews" in texts
+    assert not any("9,999" in t for t in texts)
+
+
+def test_lxml_page_matches_the_tree_page():
+    pytest.importorskip("lxml")
+    tree, lxml_page = TreePage(HTML), LxmlPage(HTML)
+    tree.prefetch(SELECTORS)
+    for selector in SELECTORS:
+        expected = [tree.inner_text(n) for n in tree.select(selector)]
+        assert [lxml_page.inner_text(el) for el in lxml_page.select(selector)] == expected, selector
+    assert lxml_page.attr(lxml_page.select_one("a[data-id]"), "href") == "/hotel/fr/lutetia.html"
+    assert lxml_page.own_text(lxml_page.select_one("h2")) == tree.own_text(tree.select_one("h2"))
@@ -0,0 +1,83 @@
+import threading
+
+from image_store import ImageDownloader, ImageStore, largest_variants
+
+SMALL = "https://cf.bstatic.com/xdata/images/hotel/max300/111.jpg?k=a"
+LARGE = "https://cf.bstatic.com/xdata/images/hotel/max1024x768/111.jpg?k=b"
+
+
+class FakeResponse:
+    def __init__(self, body: bytes):
+        self.status = 200
+        self.body = body
+        self.headers = {"content-type": "image/jpeg"}
+
+
+class FakeClient:
+    """Serves the URL itself as the image body; requests block until ``release`` is set."""
+
+    def __init__(self):
+        self.requested = []
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None):
+        with self._lock:
+            self.requested.append(url)
+        self.release.wait(5)
+        return FakeResponse(url.encode("utf-8"))
+
+    def close(self):
+        pass
+
+
+def _downloader(tmp_path, client):
+    return ImageDownloader(ImageStore(str(tmp_path / "images")), concurrency=4, client=client)
+
+
+def _body(tmp_path, entry):
+    return (tmp_path / "images" / entry["path"]).read_bytes().decode("utf-8")
+
+
+def test_small_request_reuses_a_pending_larger_variant(tmp_path):
+    client = FakeClient()
+    with _downloader(tmp_path, client) as downloader:
+        large = downloader._submit(LARGE)
+        small = downloader._submit(SMALL)
+        client.release.set()
+        assert small is large
+        assert _body(tmp_path, small.result()) == LARGE
+        assert client.requested == [LARGE]
+
+
+def test_large_request_is_not_served_a_pending_smaller_variant(tmp_path):
+    client = FakeClient()
+    with _downloader(tmp_path, client) as downloader:
+        small = downloader._submit(SMALL)
+        large = downloader._submit(LARGE)
+        client.release.set()
+        assert small is not large
+        assert _body(tmp_path, large.result()) == LARGE
+        small.result()
+        # The smaller file finishing later does not replace the larger one in the index
+        assert downloader.store.lookup(LARGE)["sha256"] == large.result()["sha256"]
+
+
+def test_download_is_blocking_and_reuses_stored_photos(tmp_path):
+    client = FakeClient()
+    client.release.set()
+    with _downloader(tmp_path, client) as downloader:
+        first = downloader.download([SMALL, LARGE])
+        second = downloader.download([SMALL])
+        assert [img["url"] for img in first] == [LARGE]
+        assert second[0]["sha256"] == first[0]["sha256"]
+        assert client.requested == [LARGE]
+        assert downloader.stats()["reused"] == 1
+
+
+def test_largest_variants_keeps_one_url_per_photo_in_first_seen_order():
+    other = "https://cf.bstatic.com/xdata/images/hotel/square60/222.jpg?k=c"
+    other_large = "https://cf.bstatic.com/xdata/images/hotel/max500/222.jpg?k=d"
+    logo = "https://cf.bstatic.com/static/img/logo.png"
+    urls = [SMALL, other, logo, LARGE, other_large, logo]
+    assert largest_variants(urls) == [LARGE, other_large, logo]
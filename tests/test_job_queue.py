@@ -0,0 +1,100 @@
+import pytest
+
+from job_queue import HttpJobQueue, JobQueue, JobQueueServer, SqliteJobQueue
+
+HOTEL = "https://www.booking.com/hotel/fr/example.html"
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = SqliteJobQueue(str(tmp_path / "jobs.sqlite"), max_attempts=2)
+    yield q
+    q.close()
+
+
+@pytest.fixture
+def server(queue):
+    srv = JobQueueServer(queue, port=0, token="s3cret").start()
+    yield srv
+    srv.stop()
+
+
+def test_incomplete_backend_fails_on_creation():
+    class PutOnly(JobQueue):
+        def put(self, url, payload=None):
+            return True
+
+    with pytest.raises(TypeError):
+        PutOnly()
+
+
+def test_server_listens_on_localhost_and_needs_a_token(queue, monkeypatch):
+    monkeypatch.delenv("JOB_QUEUE_TOKEN", raising=False)
+    with pytest.raises(ValueError):
+        JobQueueServer(queue, port=0)
+    srv = JobQueueServer(queue, port=0, token="t")
+    try:
+        assert srv.address.startswith("http://127.0.0.1:")
+    finally:
+        srv.stop()
+
+
+def test_remote_calls_with_the_token(server):
+    client = HttpJobQueue(server.address, token="s3cret")
+    assert client.put(HOTEL, {"search_card": {"price": 10}})
+    job = client.claim("w1")
+    assert job.url == HOTEL and job.payload == {"search_card": {"price": 10}}
+    assert client.complete(job.id, "w1", {"hotel_name": "X"})
+    assert client.counts()["done"] == 1
+
+
+def test_remote_calls_without_the_right_token_are_refused(server, queue):
+    with pytest.raises(RuntimeError, match="token"):
+        HttpJobQueue(server.address, token="wrong").put(HOTEL)
+    assert queue.counts()["queued"] == 0
+
+
+def test_token_from_environment(server, monkeypatch):
+    monkeypatch.setenv("JOB_QUEUE_TOKEN", "s3cret")
+    assert HttpJobQueue(server.address).counts()["queued"] == 0
+
+
+def test_expired_lease_is_handed_to_another_worker(queue):
+    queue.put(HOTEL)
+    first = queue.claim("w1", lease_s=-1)
+    second = queue.claim("w2", lease_s=60)
+    assert second.id == first.id and second.attempts == 2
+    # The first worker's late result is refused; the new lease holder's wins
+    assert not queue.complete(first.id, "w1", {"hotel_name": "stale"})
+    assert not queue.heartbeat(first.id, "w1")
+    assert queue.complete(second.id, "w2", {"hotel_name": "X"})
+    (job,) = queue.take_results()
+    assert job.result == {"hotel_name": "X"}
+
+
+def test_job_fails_for_good_after_max_attempts(queue):
+    queue.put(HOTEL)
+    job = queue.claim("w1")
+    assert queue.fail(job.id, "w1", "TimeoutException")
+    assert queue.counts()["queued"] == 1
+    job = queue.claim("w1")
+    assert job.attempts == 2
+    queue.fail(job.id, "w1", "TimeoutException")
+    assert queue.claim("w1") is None
+    (failed,) = queue.take_results()
+    assert failed.error == "TimeoutException"
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(queue):
+    queue.put(HOTEL)
+    queue.claim("w1", lease_s=-1)
+    queue.claim("w2", lease_s=-1)
+    assert queue.requeue_expired() == 1
+    assert queue.counts()["failed"] == 1
+    assert queue.take_results()[0].error == "lease expired"
+
+
+def test_duplicate_urls_are_queued_once(queue):
+    assert queue.put(HOTEL + "?aid=1&checkin=2025-11-01")
+    assert not queue.put(HOTEL + "?checkin=2025-11-01&sid=xyz")
+    assert queue.put_many([(HOTEL + "?checkin=2025-11-02", None), (HOTEL + "?checkin=2025-11-01", None)]) == 1
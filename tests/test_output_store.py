@@ -0,0 +1,131 @@
+import json
+import sqlite3
+
+import pytest
+
+from output_store import (
+    JsonlWriter, SqliteStore, export_json, export_jsonl, iter_jsonl, iter_sqlite, load_done_keys, search_sqlite,
+)
+
+PARIS = "https://www.booking.com/hotel/fr/lutetia.en-gb.html?checkin=2025-11-01&checkout=2025-11-03&aid=304142&sid=abc"
+ROME = "https://www.booking.com/hotel/it/roma.html?checkin=2025-11-01&checkout=2025-11-03"
+
+
+def _record(url, name, description, score="8,7", reviews="1,234"):
+    return {"url": url, "hotel_name": name, "description": description, "review_score": score, "total_reviews": reviews}
+
+
+def _fts5_available() -> bool:
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def test_append_after_a_truncated_line_starts_a_fresh_record(tmp_path):
+    path = tmp_path / "output.jsonl"
+    path.write_text(json.dumps(_record(PARIS, "Lutetia", "")) + "\n" + '{"url": "https://www.booking.com/ho', "utf-8")
+    with JsonlWriter(str(path), fsync_every=1) as writer:
+        writer.write(_record(ROME, "Roma", ""))
+    assert [rec["hotel_name"] for rec in iter_jsonl(str(path))] == ["Lutetia", "Roma"]
+
+
+def test_done_keys_ignore_tracking_parameters_and_language(tmp_path):
+    path = tmp_path / "output.jsonl"
+    with JsonlWriter(str(path)) as writer:
+        writer.write(_record(PARIS, "Lutetia", ""))
+    same_hotel = "https://www.booking.com/hotel/fr/lutetia.html?aid=1&checkout=2025-11-03&checkin=2025-11-01"
+    assert load_done_keys(str(path)) == {
+        "https://www.booking.com/hotel/fr/lutetia.html?checkin=2025-11-01&checkout=2025-11-03"
+    }
+    with JsonlWriter(str(path)) as writer:
+        writer.write(_record(same_hotel, "Lutetia", ""))
+    assert len(load_done_keys(str(path))) == 1
+
+
+def test_export_json_writes_a_valid_array(tmp_path):
+    jsonl, out = tmp_path / "output.jsonl", tmp_path / "output.json"
+    assert export_json(str(jsonl), str(out)) == 0
+    assert json.loads(out.read_text("utf-8")) == []
+    with JsonlWriter(str(jsonl)) as writer:
+        writer.write(_record(PARIS, "Lutetia", "Rive gauche"))
+        writer.write(_record(ROME, "Roma", "Centro\nstorico"))
+    assert export_json(str(jsonl), str(out)) == 2
+    assert [rec["hotel_name"] for rec in json.loads(out.read_text("utf-8"))] == ["Lutetia", "Roma"]
+
+
+def test_sqlite_store_replaces_rewritten_hotels_and_converts_numbers(tmp_path):
+    path = str(tmp_path / "hotels.sqlite")
+    with SqliteStore(path, city="Paris", batch_size=1) as store:
+        store.write(_record(PARIS, "Lutetia", "old"))
+        store.write(_record(PARIS, "Lutetia", "new"))
+        store.write(_record(ROME, "Roma", "", score="7.9", reviews="87"), city="Rome")
+    rows = list(iter_sqlite(path))
+    assert [r["description"] for r in rows if r["hotel_name"] == "Lutetia"] == ["new"]
+    assert [r["hotel_name"] for r in iter_sqlite(path, "city = ? AND review_score >= ?", ("Paris", 8))] == ["Lutetia"]
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT review_score, total_reviews FROM hotels WHERE city = 'Paris'").fetchone() == (8.7, 1234)
+    finally:
+        conn.close()
+
+
+@pytest.mark.skipif(not _fts5_available(), reason="SQLite built without FTS5")
+def test_full_text_search_follows_replaced_rows(tmp_path):
+    path = str(tmp_path / "hotels.sqlite")
+    with SqliteStore(path) as store:
+        store.write(_record(PARIS, "Lutetia", "Spa and indoor pool"))
+        store.write(_record(ROME, "Roma", "Rooftop terrace"))
+    assert [r["hotel_name"] for r in search_sqlite(path, "pool")] == ["Lutetia"]
+    with SqliteStore(path) as store:
+        store.write(_record(PARIS, "Lutetia", "Spa and garden"))
+    assert list(search_sqlite(path, "pool")) == []
+    assert sorted(r["hotel_name"] for r in search_sqlite(path, "garden OR terrace")) == ["Lutetia", "Roma"]
+
+
+def test_export_jsonl_by_extension(tmp_path):
+    jsonl = tmp_path / "output.jsonl"
+    with JsonlWriter(str(jsonl)) as writer:
+        writer.write(_record(PARIS, "Lutetia", ""))
+        writer.write(_record(ROME, "Roma", ""))
+    assert export_jsonl(str(jsonl), str(tmp_path / "out.sqlite")) == 2
+    assert [r["hotel_name"] for r in iter_sqlite(str(tmp_path / "out.sqlite"))] == ["Lutetia", "Roma"]
+    with pytest.raises(ValueError):
+        export_jsonl(str(jsonl), str(tmp_path / "out.csv"))
+
+
+def test_export_jsonl_to_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    from output_store import iter_parquet
+
+    jsonl = tmp_path / "output.jsonl"
+    with JsonlWriter(str(jsonl)) as writer:
+        writer.write(dict(_record(PARIS, "Lutetia", ""), search_card={"price": 310}))
+    assert export_jsonl(str(jsonl), str(tmp_path / "out.parquet")) == 1
+    (row,) = iter_parquet(str(tmp_path / "out.parquet"))
+    assert row["hotel_name"] == "Lutetia" and row["total_reviews"] == 1234
+    assert row["search_card"] == {"price": 310}
+
+
+def test_fresh_store_ignores_a_crashed_runs_wal(tmp_path):
+    path = str(tmp_path / "hotels.sqlite")
+    with SqliteStore(path, batch_size=1) as store:
+        store.write(_record(PARIS, "Lutetia", ""))
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    conn.execute("INSERT INTO hotels (key, record) VALUES ('stale', '{\"hotel_name\": \"Stale\"}')")
+    conn.commit()
+    # Left behind as after a crash: the insert only lives in the -wal file
+    leftover = {ext: open(path + ext, "rb").read() for ext in ("-wal", "-shm")}
+    conn.close()
+    for ext, data in leftover.items():
+        with open(path + ext, "wb") as f:
+            f.write(data)
+    with SqliteStore(path, append=False) as store:
+        store.write(_record(ROME, "Roma", ""))
+    assert [r["hotel_name"] for r in iter_sqlite(path)] == ["Roma"]
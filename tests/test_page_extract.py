@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+import page_extract  # noqa: E402
+from page_extract import HOTEL_FIELD_SPEC, ordered_spec, probe_label  # noqa: E402
+from selector_stats import SelectorStats  # noqa: E402
+from scraping_utils import ADDRESS_FALLBACK_SELECTOR, NAME_FALLBACK_SELECTOR  # noqa: E402
+
+
+def _labels(spec, name):
+    field = next(f for f in spec if f["name"] == name)
+    return [probe_label(p) for p in field["probes"]]
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = SelectorStats()
+    monkeypatch.setattr(page_extract, "selector_stats", stats)
+    return stats
+
+
+def test_interchangeable_selectors_move_to_the_front(stats):
+    for _ in range(5):
+        stats.hit("hotel_name", "[data-testid='hp-hotel-name'] h2")
+    assert _labels(ordered_spec(HOTEL_FIELD_SPEC), "hotel_name")[0] == "[data-testid='hp-hotel-name'] h2"
+
+
+def test_broad_fallbacks_stay_last_whatever_their_hit_rate(stats):
+    for _ in range(50):
+        stats.hit("hotel_name", NAME_FALLBACK_SELECTOR)
+        stats.hit("address", ADDRESS_FALLBACK_SELECTOR)
+        stats.hit("total_reviews", r"([\d,]+)\s+reviews")
+    spec = ordered_spec(HOTEL_FIELD_SPEC)
+    assert _labels(spec, "hotel_name")[-1] == NAME_FALLBACK_SELECTOR
+    assert _labels(spec, "address")[-1] == ADDRESS_FALLBACK_SELECTOR
+    assert _labels(spec, "total_reviews") == _labels(HOTEL_FIELD_SPEC, "total_reviews")
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from pipeline import run_pipeline
+
+
+def test_producer_stops_once_the_queue_is_full():
+    release = threading.Event()
+    produced = []
+
+    def hrefs():
+        for i in range(20):
+            produced.append(i)
+            yield f"https://www.booking.com/hotel/fr/h{i}.html"
+
+    def task(href):
+        release.wait(5)
+        return {"url": href}
+
+    results = []
+    runner = threading.Thread(
+        target=lambda: results.append(run_pipeline(hrefs(), task, workers=1, queue_size=2)), daemon=True
+    )
+    runner.start()
+    time.sleep(0.3)
+    # One href in the blocked worker, two queued and one held by the producer while it waits for space
+    assert len(produced) <= 4
+    release.set()
+    runner.join(5)
+    assert len(produced) == 20
+    assert results[0]["queued"] == 20 and results[0]["completed"] == 20
+
+
+def test_results_and_errors_reach_their_callbacks():
+    def task(href):
+        if href.endswith("bad"):
+            raise ValueError(href)
+        return {"url": href}
+
+    ok, failed = [], []
+    stats = run_pipeline(
+        ["a", "bad", "b"], task, workers=2,
+        on_result=lambda href, data: ok.append(href), on_error=lambda href, e: failed.append(href),
+    )
+    assert sorted(ok) == ["a", "b"] and failed == ["bad"]
+    assert stats["completed"] == 2 and stats["failed"] == 1 and stats["first_result_s"] is not None
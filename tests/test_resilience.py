@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, DeadlineExceeded, ResilientTask
+
+HOTEL = "https://www.booking.com/hotel/fr/example.html"
+
+
+class FakePool:
+    """Records which attempt threads had their driver aborted."""
+
+    def __init__(self):
+        self.aborted = []
+
+    def abort(self, thread_id):
+        self.aborted.append(thread_id)
+        return True
+
+
+def _slow_task(seconds):
+    def task(href):
+        time.sleep(seconds)
+        return {"url": href}
+
+    return task
+
+
+def _call_concurrently(resilient, n):
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def call(i):
+        try:
+            result = resilient(f"https://www.booking.com/hotel/fr/h{i}.html")
+            with lock:
+                results.append(result)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+
+    callers = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    return results, errors
+
+
+def test_more_callers_than_threads_do_not_queue_past_their_deadline():
+    # Two threads sized, six callers (an autoscaler above its starting worker count):
+    # queued behind each other the last attempts would start after 0.6s and miss the 0.5s deadline
+    resilient = ResilientTask(_slow_task(0.3), deadline_s=0.5, hedge_percentile=None, max_hedges=0, retries=0, threads=2)
+    try:
+        results, errors = _call_concurrently(resilient, 6)
+        assert errors == []
+        assert len(results) == 6
+        stats = resilient.stats()
+        assert stats["deadline_exceeded"] == 0
+        assert stats["overflow_attempts"] == 4
+    finally:
+        resilient.close()
+
+
+def test_deadline_aborts_the_stuck_attempt():
+    release = threading.Event()
+
+    def stuck(href):
+        release.wait(5)
+        return {"url": href}
+
+    pool = FakePool()
+    resilient = ResilientTask(stuck, pool=pool, deadline_s=0.2, hedge_percentile=None, retries=2, threads=1)
+    try:
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            resilient(HOTEL)
+        assert time.monotonic() - started < 1
+        assert len(pool.aborted) == 1
+        assert resilient.stats()["deadline_exceeded"] == 1
+        assert resilient.stats()["aborted_drivers"] == 1
+    finally:
+        release.set()
+        resilient.close()
+
+
+def test_slow_attempt_is_hedged_and_the_faster_one_wins():
+    release = threading.Event()
+    calls = []
+
+    def task(href):
+        calls.append(href)
+        if href == HOTEL and calls.count(HOTEL) == 1:
+            release.wait(5)
+            return {"url": href, "attempt": "first"}
+        time.sleep(0.01)
+        return {"url": href, "attempt": "hedge"}
+
+    resilient = ResilientTask(task, pool=FakePool(), deadline_s=5, hedge_percentile=50, hedge_min_samples=3, threads=2)
+    try:
+        for i in range(3):
+            resilient(f"https://www.booking.com/hotel/fr/warm{i}.html")
+        started = time.monotonic()
+        assert resilient(HOTEL)["attempt"] == "hedge"
+        assert time.monotonic() - started < 1
+        stats = resilient.stats()
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    finally:
+        release.set()
+        resilient.close()
+
+
+def test_failed_attempt_is_retried_with_backoff():
+    failures = [RuntimeError("net::ERR_CONNECTION_RESET")]
+
+    def flaky(href):
+        if failures:
+            raise failures.pop()
+        return {"url": href}
+
+    resilient = ResilientTask(flaky, deadline_s=5, hedge_percentile=None, retries=1, backoff_s=0.01, threads=1)
+    try:
+        assert resilient(HOTEL) == {"url": HOTEL}
+        assert resilient.stats()["retried"] == 1
+    finally:
+        resilient.close()
+
+
+def test_breaker_pauses_dispatch_and_backs_off():
+    breaker = CircuitBreaker(window=4, threshold=0.5, min_samples=4, cooldown_s=0.1, max_cooldown_s=0.15)
+    for _ in range(4):
+        breaker.record(False)
+    assert breaker.opened == 1
+    started = time.monotonic()
+    breaker.wait()
+    assert 0.05 < time.monotonic() - started < 1
+    for _ in range(4):
+        breaker.record(False)
+    assert breaker.opened == 2
+    started = time.monotonic()
+    breaker.wait()
+    # Twice the cooldown, capped at max_cooldown_s
+    assert 0.12 < time.monotonic() - started < 1
+    breaker.wait()
+    assert breaker.paused_s > 0.2
+
+
+def test_breaker_stays_closed_below_the_error_rate():
+    breaker = CircuitBreaker(window=10, threshold=0.5, min_samples=4, cooldown_s=5)
+    for ok in (True, False, True, True, False, True, True, True):
+        breaker.record(ok)
+    started = time.monotonic()
+    breaker.wait()
+    assert breaker.opened == 0 and time.monotonic() - started < 0.05
@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from results_harvester import card_filter, harvest_cards, parse_review  # noqa: E402
+
+
+def test_review_score_and_count():
+    assert parse_review("Scored 8.5 8.5 Very good 1,234 reviews") == (8.5, "1,234")
+    assert parse_review("Scored 9,2 Superb 87 reviews", "9,2") == (9.2, "87")
+
+
+def test_card_with_reviews_but_no_score_has_no_score():
+    assert parse_review("1 review") == (None, "1")
+    assert parse_review("New to Booking.com 12 reviews") == (None, "12")
+    assert parse_review("New to Booking.com 12 reviews", score_text=None) == (None, "12")
+
+
+def test_unscored_card_is_kept_by_the_score_filter():
+    keep = card_filter({"minScore": 8, "check_in": "2025-11-01", "check_out": "2025-11-03"})
+    score, _ = parse_review("New to Booking.com 12 reviews")
+    assert keep({"review_score": score, "price": None})
+    score, _ = parse_review("1 review")
+    assert keep({"review_score": score, "price": None})
+
+
+class FakeResultsDriver:
+    """Serves one page of raw cards as returned by the card script."""
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.current_url = "https://www.booking.com/searchresults.html?ss=Paris"
+
+    def find_element(self, by, selector):
+        return object()
+
+    def execute_script(self, script, *args):
+        return self.cards
+
+    def get(self, url):
+        self.current_url = url
+
+
+def _raw(href, hotel_id=None, review="Scored 8.0 8.0 Very good 10 reviews", score="8.0"):
+    return {"href": href, "hotel_id": hotel_id, "name": "X", "price": "US$200", "review": review, "score": score,
+            "distance": None, "thumbnail": None}
+
+
+def test_cards_are_deduped_by_slug_and_keep_only_real_hotel_ids():
+    lutetia = "https://www.booking.com/hotel/fr/lutetia.html?highlighted_blocks=5616602_371662184_2_0_0"
+    driver = FakeResultsDriver([
+        _raw(lutetia, hotel_id="5616602"),
+        # Same hotel, other language and block parameters
+        _raw("https://www.booking.com/hotel/fr/lutetia.fr.html?highlighted_blocks=5616602_99_1_0_0"),
+        _raw("https://www.booking.com/hotel/fr/roma.html?all_sr_blocks=777_1_2_0_0"),
+    ])
+    cards = list(harvest_cards(driver, driver.current_url, max_items=10))
+    assert [c["href"] for c in cards] == [lutetia, "https://www.booking.com/hotel/fr/roma.html?all_sr_blocks=777_1_2_0_0"]
+    assert [c["hotel_id"] for c in cards] == ["5616602", None]
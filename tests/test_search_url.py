@@ -0,0 +1,66 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from search_url import build_search_url, parse_price_range, search_filters
+
+SPEC = {
+    "search": "Paris",
+    "check_in": "2025-11-01",
+    "check_out": "2025-11-03",
+    "currency": "EUR",
+    "adults": 3,
+    "children": 2,
+    "children_ages": [4, 9],
+    "propertyType": "Hotels",
+    "minMaxPrice": "100-250",
+    "minScore": 8,
+    "sortBy": "price",
+}
+
+
+def _query(url):
+    return parse_qs(urlsplit(url).query)
+
+
+def test_search_url_carries_dates_occupancy_and_sort():
+    url = build_search_url(SPEC)
+    assert url.startswith("https://www.booking.com/searchresults.html?")
+    q = _query(url)
+    assert q["ss"] == ["Paris"]
+    assert q["checkin"] == ["2025-11-01"] and q["checkout"] == ["2025-11-03"]
+    assert q["group_adults"] == ["3"] and q["group_children"] == ["2"] and q["no_rooms"] == ["1"]
+    assert q["age"] == ["4", "9"]
+    assert q["selected_currency"] == ["EUR"]
+    assert q["order"] == ["price"]
+    assert "offset" not in q
+
+
+def test_filters_go_into_nflt():
+    assert _query(build_search_url(SPEC))["nflt"] == ["ht_id=204;price=EUR-100-250-1;review_score=80"]
+
+
+def test_offset_and_base_for_later_pages():
+    q = _query(build_search_url(SPEC, base="http://localhost:8000/", offset=25))
+    assert q["offset"] == ["25"]
+    assert build_search_url(SPEC, base="http://localhost:8000/").startswith("http://localhost:8000/searchresults.html?")
+
+
+def test_open_ended_price_ranges():
+    assert parse_price_range("-300") == (None, 300.0)
+    assert parse_price_range("200-") == (200.0, None)
+    assert parse_price_range(None) == (None, None)
+    assert search_filters({"minMaxPrice": "200-", "currency": "USD"}) == ["price=USD-200-max-1"]
+
+
+def test_unknown_property_type_is_rejected():
+    with pytest.raises(ValueError):
+        build_search_url(dict(SPEC, propertyType="Treehouses"))
+
+
+def test_min_score_is_sent_as_a_supported_bucket():
+    assert search_filters({"minScore": 7.5}) == ["review_score=70"]
+    assert search_filters({"minScore": "8"}) == ["review_score=80"]
+    assert search_filters({"minScore": 9.6}) == ["review_score=90"]
+    # No bucket below 6; the card-level check is the only filter
+    assert search_filters({"minScore": 5}) == []
@@ -0,0 +1,214 @@
+import threading
+import time
+from typing import Dict, Optional
+from metrics import record
+
+# ---------- In-page waits ----------
+#
+# Each wait runs as one execute_async_script call and resolves from inside the page
+# (MutationObserver / PerformanceObserver) as soon as its condition holds, instead
+# of sleeping a fixed time. ``timeout`` is the ceiling; it defaults to CEILING.
+
+CEILING = 5.0
+
+# Conditions are declarative (no eval) so they also run under a strict page CSP:
+#   {"present": sel}                   -> at least one match
+#   {"absent": sel}                    -> no match
+#   {"count_gt": sel, "count": n}      -> more than n matches
+#   {"selected": sel, "attr": a, "value": v} -> first match has attribute a == v
+_CONDITION_JS = """
+const cond = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+const check = () => {
+  try {
+    if (cond.present) return !!document.querySelector(cond.present);
+    if (cond.absent) return !document.querySelector(cond.absent);
+    if (cond.count_gt) return document.querySelectorAll(cond.count_gt).length > cond.count;
+    if (cond.selected) {
+      const el = document.querySelector(cond.selected);
+      return !!el && el.getAttribute(cond.attr) === cond.value;
+    }
+  } catch (e) {}
+  return false;
+};
+if (check()) { done({ok: true, waited_ms: 0}); return; }
+let finished = false;
+let timer = null;
+const obs = new MutationObserver(() => { if (check()) finish(true); });
+function finish(ok) {
+  if (finished) return;
+  finished = true;
+  obs.disconnect();
+  clearTimeout(timer);
+  done({ok: ok, waited_ms: performance.now() - started});
+}
+obs.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(() => finish(check()), timeoutMs);
+"""
+
+# Resolves once no DOM mutation was seen for quietMs under the root selector's first match
+# (the whole document without one), or at the ceiling
+_DOM_QUIET_JS = """
+const quietMs = arguments[0];
+const root = (arguments[1] && document.querySelector(arguments[1])) || document.documentElement;
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+let finished = false;
+let quietTimer = null;
+let ceilingTimer = null;
+const obs = new MutationObserver(() => { clearTimeout(quietTimer); quietTimer = setTimeout(() => finish(true), quietMs); });
+function finish(ok) {
+  if (finished) return;
+  finished = true;
+  obs.disconnect();
+  clearTimeout(quietTimer);
+  clearTimeout(ceilingTimer);
+  done({ok: ok, waited_ms: performance.now() - started});
+}
+// Structural and content changes only: class/style churn from animations would never go quiet
+obs.observe(root, {
+  childList: true, subtree: true, characterData: true,
+  attributes: true, attributeFilter: ['src', 'srcset', 'data-src', 'href', 'aria-checked', 'aria-selected', 'disabled', 'value'],
+});
+quietTimer = setTimeout(() => finish(true), quietMs);
+ceilingTimer = setTimeout(() => finish(false), timeoutMs);
+"""
+
+# Resolves once no new content resource (image, stylesheet, script) started for idleMs and all
+# <img> elements in the viewport have finished loading (or at the ceiling)
+_NETWORK_IDLE_JS = """
+const idleMs = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+let last = performance.now();
+let finished = false;
+// Only page content counts; analytics beacons and XHR polling would keep the page "busy" forever
+const CONTENT = new Set(['img', 'image', 'css', 'link', 'script', 'video']);
+const po = new PerformanceObserver(list => {
+  if (list.getEntries().some(e => CONTENT.has(e.initiatorType))) last = performance.now();
+});
+try { po.observe({type: 'resource', buffered: false}); } catch (e) {}
+const pendingImages = () => Array.from(document.images).some(img => {
+  if (img.complete) return false;
+  const r = img.getBoundingClientRect();
+  return r.bottom > 0 && r.top < window.innerHeight;
+});
+function finish(ok) {
+  if (finished) return;
+  finished = true;
+  po.disconnect();
+  clearInterval(poll);
+  done({ok: ok, waited_ms: performance.now() - started});
+}
+const poll = setInterval(() => {
+  const now = performance.now();
+  if (now - started >= timeoutMs) finish(false);
+  else if (now - last >= idleMs && !pendingImages()) finish(true);
+}, Math.min(50, idleMs));
+"""
+
+
+# ---------- Sleep budget accounting ----------
+
+class SleepBudget:
+    """Tallies fixed sleeps that waits replaced against the time actually waited."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, replaced_s: float, waited_s: float) -> None:
+        with self._lock:
+            e = self._entries.setdefault(name, {"calls": 0, "replaced_s": 0.0, "waited_s": 0.0})
+            e["calls"] += 1
+            e["replaced_s"] += replaced_s
+            e["waited_s"] += waited_s
+
+    def report(self) -> Dict:
+        with self._lock:
+            per_wait = {
+                name: {
+                    "calls": e["calls"],
+                    "replaced_s": round(e["replaced_s"], 3),
+                    "waited_s": round(e["waited_s"], 3),
+                    "saved_s": round(e["replaced_s"] - e["waited_s"], 3),
+                }
+                for name, e in sorted(self._entries.items())
+            }
+        return {
+            "saved_s": round(sum(e["saved_s"] for e in per_wait.values()), 3),
+            "replaced_s": round(sum(e["replaced_s"] for e in per_wait.values()), 3),
+            "waited_s": round(sum(e["waited_s"] for e in per_wait.values()), 3),
+            "waits": per_wait,
+        }
+
+
+budget = SleepBudget()
+
+
+def configure(ceiling: Optional[float] = None) -> None:
+    global CEILING
+    if ceiling is not None:
+        CEILING = float(ceiling)
+
+
+def run_in_page(driver, name: str, script: str, *args, replaces: float = 0.0, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Run an async in-page script that receives ``args`` plus the ceiling in ms, and return what it resolves with.
+
+    Time spent is recorded as ``wait:<name>`` and in the sleep budget; None if the script failed.
+    """
+    timeout = CEILING if timeout is None else timeout
+    # The WebDriver script timeout must outlast the in-page ceiling; only raise it when needed
+    needed = timeout + 5
+    if getattr(driver, "_waits_script_timeout", 0) < needed:
+        driver.set_script_timeout(needed)
+        driver._waits_script_timeout = needed
+    started = time.monotonic()
+    try:
+        out = driver.execute_async_script(script, *args, int(timeout * 1000))
+    except Exception:
+        out = None
+    waited = time.monotonic() - started
+    budget.record(name, replaces, waited)
+    record(f"wait:{name}", waited)
+    return out
+
+
+def _run(driver, name: str, replaces: float, script: str, *args, timeout: Optional[float] = None) -> bool:
+    out = run_in_page(driver, name, script, *args, replaces=replaces, timeout=timeout)
+    return bool(out and out.get("ok"))
+
+
+def wait_for(driver, condition: Dict, name: str, replaces: float = 0.0, timeout: Optional[float] = None) -> bool:
+    """Wait until ``condition`` holds in the page; see _CONDITION_JS for the condition kinds."""
+    return _run(driver, name, replaces, _CONDITION_JS, condition, timeout=timeout)
+
+
+def wait_for_dom_quiet(
+    driver,
+    name: str,
+    quiet_ms: int = 150,
+    replaces: float = 0.0,
+    timeout: Optional[float] = None,
+    root: Optional[str] = None,
+) -> bool:
+    """Wait until the DOM (only the subtree of ``root``, a selector, if given) has not changed for ``quiet_ms``.
+
+    Pages with carousels and ads rarely go quiet as a whole: scope the wait to the
+    widget that changed and keep ``timeout`` close to the sleep it replaces.
+    """
+    return _run(driver, name, replaces, _DOM_QUIET_JS, quiet_ms, root, timeout=timeout)
+
+
+def wait_for_network_idle(driver, name: str, idle_ms: int = 250, replaces: float = 0.0, timeout: Optional[float] = None) -> bool:
+    """Wait until no new content request started for ``idle_ms`` and visible images have loaded."""
+    return _run(driver, name, replaces, _NETWORK_IDLE_JS, idle_ms, timeout=timeout)
+
+
+def skipped_sleep(name: str, seconds: float) -> None:
+    """Record a fixed sleep that was removed outright, with nothing waited in its place."""
+    budget.record(name, seconds, 0.0)